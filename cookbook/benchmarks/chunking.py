@@ -0,0 +1,84 @@
+"""Compares the throughput of Reader.chunk_document with the previous chunking implementation.
+
+Usage: python cookbook/benchmarks/chunking.py [size in MB, default 200]
+"""
+
+import re
+import sys
+import time
+from random import Random
+from typing import List
+
+from micro.document import Document
+from micro.document.reader.base import Reader
+
+
+class PreviousReader(Reader):
+    """The chunking implementation before the streaming chunker, kept for comparison"""
+
+    def clean_text(self, text: str) -> str:
+        cleaned_text = re.sub(r"\n+", "\n", text)
+        cleaned_text = re.sub(r"\s+", " ", cleaned_text)
+        cleaned_text = re.sub(r"\t+", "\t", cleaned_text)
+        cleaned_text = re.sub(r"\r+", "\r", cleaned_text)
+        cleaned_text = re.sub(r"\f+", "\f", cleaned_text)
+        cleaned_text = re.sub(r"\v+", "\v", cleaned_text)
+        return cleaned_text
+
+    def chunk_document(self, document: Document) -> List[Document]:
+        cleaned_content = self.clean_text(document.content)
+        content_length = len(cleaned_content)
+        chunked_documents: List[Document] = []
+        chunk_number = 1
+        start = 0
+        while start < content_length:
+            end = start + self.chunk_size
+            if end < content_length:
+                while end > start and cleaned_content[end] not in [" ", "\n", "\r", "\t"]:
+                    end -= 1
+            if end == start:
+                end = start + self.chunk_size
+            if end > content_length:
+                end = content_length
+            chunk = cleaned_content[start:end]
+            meta_data = document.meta_data.copy()
+            meta_data["chunk"] = chunk_number
+            meta_data["chunk_size"] = len(chunk)
+            chunked_documents.append(
+                Document(id=f"{document.name}_{chunk_number}", name=document.name, meta_data=meta_data, content=chunk)
+            )
+            chunk_number += 1
+            start = end
+        return chunked_documents
+
+
+def generate_text(size_mb: int, seed: int = 0) -> str:
+    """Returns text of about size_mb megabytes with words, sentences, line breaks and paragraphs"""
+    rng = Random(seed)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do"]
+    paragraphs = []
+    for _ in range(200):
+        lines = []
+        for _ in range(rng.randint(3, 12)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(6, 14)))
+            lines.append(sentence.capitalize() + ".  " + ("\t" if rng.random() < 0.1 else ""))
+        paragraphs.append("\n".join(lines))
+    sample = "\n\n\n".join(paragraphs) + "\n\n"
+    return sample * (size_mb * 1024 * 1024 // len(sample) + 1)
+
+
+def run(reader: Reader, document: Document) -> None:
+    start = time.perf_counter()
+    num_chunks = sum(1 for _ in reader.chunk_document(document))
+    elapsed = time.perf_counter() - start
+    throughput = len(document.content) / 1024 / 1024 / elapsed
+    print(f"{reader.__class__.__name__:>16}: {num_chunks:>8} chunks in {elapsed:6.2f}s ({throughput:6.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    document = Document(name="benchmark", content=generate_text(size_mb))
+    print(f"Chunking {len(document.content) / 1024 / 1024:.0f} MB of text")
+    run(PreviousReader(), document)
+    run(Reader(), document)
+    run(Reader(chunk_overlap=200), document)
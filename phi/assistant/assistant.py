@@ -78,6 +78,8 @@ class Assistant(BaseModel):
     knowledge_base: Optional[AssistantKnowledge] = None
     # Enable RAG by adding references from the knowledge base to the prompt.
     add_references_to_prompt: bool = False
+    # Maximum number of tokens of references added to the prompt, less relevant references are left out.
+    references_max_tokens: Optional[int] = None
 
     # -*- Assistant Storage
     storage: Optional[AssistantStorage] = None
@@ -718,6 +720,8 @@ class Assistant(BaseModel):
             return None
 
         relevant_docs: List[Document] = self.knowledge_base.search(query=query, num_documents=num_documents)
+        if self.references_max_tokens is not None:
+            relevant_docs = self.knowledge_base.trim_documents(relevant_docs, self.references_max_tokens)
         if len(relevant_docs) == 0:
             return None
 
@@ -1,6 +1,6 @@
 from typing import Optional, Dict, Any, List
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from micro.embedder import Embedder
 
@@ -18,6 +18,9 @@ class Document(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    # Embedder which produced the embedding, so documents embedded by another embedder are embedded again
+    _embedded_by: Optional[Embedder] = PrivateAttr(default=None)
+
     def embed(self, embedder: Optional[Embedder] = None) -> None:
         """Embed the document using the provided embedder"""
 
@@ -26,6 +29,30 @@ class Document(BaseModel):
             raise ValueError("No embedder provided")
 
         self.embedding, self.usage = _embedder.get_embedding_and_usage(self.content)
+        self._embedded_by = _embedder
+
+    @staticmethod
+    def embed_documents(documents: List["Document"], embedder: Embedder) -> None:
+        """Embed a list of documents using batched requests to the embedder.
+        Documents which were already embedded by the same embedder, e.g. by the ingestion pipeline
+        before they are inserted, are not embedded again.
+        """
+
+        documents_to_embed = [
+            document for document in documents if document.embedding is None or document._embedded_by is not embedder
+        ]
+        if len(documents_to_embed) == 0:
+            return
+
+        # Token counts from the reader save tokenizing the documents again to split batches
+        token_counts = embedder.get_known_token_counts([document.meta_data for document in documents_to_embed])
+        embeddings, usage = embedder.get_embeddings_and_usage(
+            [document.content for document in documents_to_embed], token_counts
+        )
+        for document, embedding, document_usage in zip(documents_to_embed, embeddings, usage):
+            document.embedding = embedding
+            document.usage = document_usage
+            document._embedded_by = embedder
 
     def to_dict(self) -> Dict[str, Any]:
         """Returns a dictionary representation of the document"""
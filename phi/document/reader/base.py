@@ -1,64 +1,200 @@
-from typing import Any, List
+import re
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 from pydantic import BaseModel
 
 from micro.document.base import Document
+from micro.tokenizer.base import Tokenizer
+
+_WHITESPACE = re.compile(r"\s")
+# Number of texts passed to the tokenizer at once
+_TOKENIZE_BATCH_SIZE = 256
 
 
 class Reader(BaseModel):
     chunk: bool = True
     chunk_size: int = 3000
-    separators: List[str] = ["\n", "\n\n", "\r", "\r\n", "\n\r", "\t", " ", "  "]
+    # Number of characters repeated at the start of the next chunk
+    chunk_overlap: int = 0
+    # Chunks are split at the last occurrence of the first separator found in the chunk:
+    # paragraph, line, sentence, then word. Text without any separator is split at chunk_size.
+    separators: List[str] = ["\n\n", "\n", ". ", " "]
+    # If set, chunk_size and chunk_overlap are measured in tokens of this tokenizer and the number of tokens
+    # in each chunk is added to its meta_data as "chunk_tokens", with the tokenizer name as "chunk_tokenizer".
+    # Embedders with the same tokenizer use the count to batch requests instead of tokenizing the chunk again.
+    tokenizer: Optional[Tokenizer] = None
 
     def read(self, obj: Any) -> List[Document]:
         raise NotImplementedError
 
     def clean_text(self, text: str) -> str:
-        """Clean the text by replacing multiple newlines with a single newline"""
-        import re
-
-        # Replace multiple newlines with a single newline
-        cleaned_text = re.sub(r"\n+", "\n", text)
-        # Replace multiple spaces with a single space
-        cleaned_text = re.sub(r"\s+", " ", cleaned_text)
-        # Replace multiple tabs with a single tab
-        cleaned_text = re.sub(r"\t+", "\t", cleaned_text)
-        # Replace multiple carriage returns with a single carriage return
-        cleaned_text = re.sub(r"\r+", "\r", cleaned_text)
-        # Replace multiple form feeds with a single form feed
-        cleaned_text = re.sub(r"\f+", "\f", cleaned_text)
-        # Replace multiple vertical tabs with a single vertical tab
-        cleaned_text = re.sub(r"\v+", "\v", cleaned_text)
-
-        return cleaned_text
+        """Clean the text in a single pass over its lines: paragraph breaks become a blank line, other line breaks
+        a newline and any other run of whitespace a single space.
+        Uses str methods rather than regular expressions, which are several times slower on large texts.
+        """
+        parts: List[str] = []
+        append = parts.append
+        blank = False
+        for line in text.split("\n"):
+            line = line.strip()
+            if not line:
+                blank = True
+                continue
+            if "  " in line or "\t" in line or "\r" in line or "\f" in line or "\v" in line:
+                line = " ".join(line.split())
+            if len(parts) > 0:
+                append("\n\n" if blank else "\n")
+            append(line)
+            blank = False
+        return "".join(parts)
 
-    def chunk_document(self, document: Document) -> List[Document]:
-        """Chunk the document content into smaller documents"""
-        content = document.content
-        cleaned_content = self.clean_text(content)
-        content_length = len(cleaned_content)
-        chunked_documents: List[Document] = []
-        chunk_number = 1
-        chunk_meta_data = document.meta_data
+    def find_split(self, text: str, start: int, end: int) -> Tuple[int, int]:
+        """Returns where the chunk starting at `start` ends and where the next chunk starts.
+        Searches back from `end` for each separator, so each chunk costs O(chunk_size) at most per separator.
+        """
+        for separator in self.separators:
+            # The separator may extend past `end` only by its trailing whitespace, which is not kept in the chunk
+            position = text.rfind(separator, start + 1, end - len(separator.rstrip()) + len(separator))
+            if position > start:
+                # Keep the non-whitespace part of the separator, e.g. the period of ". ", in the chunk
+                return position + len(separator.rstrip()), position + len(separator)
+        return end, end
+
+    def split_text(self, text: str) -> Iterator[str]:
+        """Yields chunks of at most `chunk_size` characters, split at the highest priority separator.
+        Consecutive chunks share up to `chunk_overlap` characters, starting at a word boundary.
+        """
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
 
+        text_length = len(text)
         start = 0
-        while start < content_length:
+        while start < text_length:
             end = start + self.chunk_size
+            if end >= text_length:
+                split, next_start = text_length, text_length
+            else:
+                split, next_start = self.find_split(text, start, end)
+
+            chunk = text[start:split]
+            if chunk.strip():
+                yield chunk
+
+            if self.chunk_overlap > 0 and split < text_length and split - start > self.chunk_overlap:
+                overlap_start = split - self.chunk_overlap
+                # Do not start the overlap in the middle of a word
+                boundary = _WHITESPACE.search(text, overlap_start, split)
+                next_start = boundary.end() if boundary is not None else overlap_start
+            start = next_start
+
+    @staticmethod
+    def iter_segments(text: str, separator: str) -> Iterator[str]:
+        """Yields the text split after each occurrence of the separator, keeping the separator"""
+        start = 0
+        while start < len(text):
+            position = text.find(separator, start)
+            end = len(text) if position == -1 else position + len(separator)
+            yield text[start:end]
+            start = end
+
+    def count_segments(self, segments: Iterable[str], level: int) -> Iterator[Tuple[str, int]]:
+        """Yields segments with their number of tokens, counted in batches.
+        Segments longer than chunk_size are split at the separator at `level`, or evenly if none is left.
+        """
+        assert self.tokenizer is not None
+        segments = iter(segments)
+        while True:
+            batch = list(islice(segments, _TOKENIZE_BATCH_SIZE))
+            if len(batch) == 0:
+                return
+            for segment, num_tokens in zip(batch, self.tokenizer.count_tokens_batch(batch)):
+                if num_tokens <= self.chunk_size or len(segment) == 1:
+                    yield segment, num_tokens
+                elif level < len(self.separators):
+                    yield from self.count_segments(self.iter_segments(segment, self.separators[level]), level + 1)
+                else:
+                    # Text without separators, e.g. Chinese or Japanese, is split into pieces of equal length
+                    num_pieces = -(-num_tokens // self.chunk_size)
+                    step = -(-len(segment) // num_pieces)
+                    pieces = (segment[i : i + step] for i in range(0, len(segment), step))
+                    yield from self.count_segments(pieces, level)
+
+    def get_overlap(self, text: str, num_tokens: int) -> Tuple[str, int]:
+        """Returns the end of the text with at most `chunk_overlap` tokens, starting at a word boundary"""
+        assert self.tokenizer is not None
+        content = text.rstrip()
+        # Keep the separator between the overlap and the next segment
+        separator = text[len(content) :]
+        # Estimate the number of characters from the average number of characters per token of the text
+        num_chars = len(content) * self.chunk_overlap // max(num_tokens, 1)
+        while num_chars > 0:
+            start = len(content) - num_chars
+            boundary = _WHITESPACE.search(content, start)
+            overlap = (content[boundary.end() :] if boundary is not None else content[start:]) + separator
+            overlap_tokens = self.tokenizer.count_tokens(overlap)
+            if overlap_tokens <= self.chunk_overlap:
+                return overlap, overlap_tokens
+            num_chars = min(num_chars - 1, num_chars * self.chunk_overlap // overlap_tokens)
+        return "", 0
 
-            # Ensure we're not splitting a word in half
-            if end < content_length:
-                while end > start and cleaned_content[end] not in [" ", "\n", "\r", "\t"]:
-                    end -= 1
+    def count_chunks(self, groups: List[List[str]]) -> Iterator[Tuple[str, int]]:
+        """Joins each group of segments into a chunk and counts its tokens exactly.
+        Tokens rarely merge across segments, a chunk that still exceeds chunk_size is split in two.
+        """
+        assert self.tokenizer is not None
+        chunks = ["".join(group).strip() for group in groups]
+        for group, chunk, num_tokens in zip(groups, chunks, self.tokenizer.count_tokens_batch(chunks)):
+            if num_tokens > self.chunk_size and len(group) > 1:
+                middle = len(group) // 2
+                yield from self.count_chunks([group[:middle], group[middle:]])
+            elif chunk:
+                yield chunk, num_tokens
 
-            # If the entire chunk is a word, then just split it at self.chunk_size
-            if end == start:
-                end = start + self.chunk_size
+    def split_text_tokens(self, text: str) -> Iterator[Tuple[str, int]]:
+        """Yields chunks of at most `chunk_size` tokens with their number of tokens.
+        The text is split into the largest segments (paragraphs, lines, sentences, words) that fit in a chunk,
+        which are counted in batches and packed into chunks. Consecutive chunks share up to `chunk_overlap` tokens.
+        """
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
 
-            # If the end is greater than the content length, then set it to the content length
-            if end > content_length:
-                end = content_length
+        if len(self.separators) > 0:
+            segments = self.count_segments(self.iter_segments(text, self.separators[0]), 1)
+        else:
+            segments = self.count_segments([text], 0)
 
-            chunk = cleaned_content[start:end]
+        groups: List[List[str]] = []
+        group: List[str] = []
+        group_tokens = 0
+        for segment, num_tokens in segments:
+            if len(group) > 0 and group_tokens + num_tokens > self.chunk_size:
+                groups.append(group)
+                overlap, overlap_tokens = "", 0
+                if self.chunk_overlap > 0:
+                    overlap, overlap_tokens = self.get_overlap("".join(group), group_tokens)
+                if overlap.strip() and overlap_tokens + num_tokens <= self.chunk_size:
+                    group, group_tokens = [overlap], overlap_tokens
+                else:
+                    group, group_tokens = [], 0
+                if len(groups) >= _TOKENIZE_BATCH_SIZE:
+                    yield from self.count_chunks(groups)
+                    groups = []
+            group.append(segment)
+            group_tokens += num_tokens
+        if len(group) > 0:
+            groups.append(group)
+        yield from self.count_chunks(groups)
+
+    def iter_chunks(self, document: Document) -> Iterator[Document]:
+        """Yields the chunks of the document content as documents, without building them all at once"""
+        cleaned_content = self.clean_text(document.content)
+        chunk_meta_data = document.meta_data
+        if self.tokenizer is not None:
+            chunks: Iterator[Tuple[str, Optional[int]]] = self.split_text_tokens(cleaned_content)
+        else:
+            chunks = ((chunk, None) for chunk in self.split_text(cleaned_content))
+        for chunk_number, (chunk, num_tokens) in enumerate(chunks, start=1):
             meta_data = chunk_meta_data.copy()
             meta_data["chunk"] = chunk_number
             chunk_id = None
@@ -67,14 +203,16 @@ class Reader(BaseModel):
             elif document.name:
                 chunk_id = f"{document.name}_{chunk_number}"
             meta_data["chunk_size"] = len(chunk)
-            chunked_documents.append(
-                Document(
-                    id=chunk_id,
-                    name=document.name,
-                    meta_data=meta_data,
-                    content=chunk,
-                )
+            if num_tokens is not None and self.tokenizer is not None:
+                meta_data["chunk_tokens"] = num_tokens
+                meta_data["chunk_tokenizer"] = self.tokenizer.name
+            yield Document(
+                id=chunk_id,
+                name=document.name,
+                meta_data=meta_data,
+                content=chunk,
             )
-            chunk_number += 1
-            start = end
-        return chunked_documents
+
+    def chunk_document(self, document: Document) -> List[Document]:
+        """Chunk the document content into smaller documents"""
+        return list(self.iter_chunks(document))
@@ -1,86 +1,320 @@
+import mmap
+import os
+import shutil
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from hashlib import sha256
+from io import BytesIO
 from pathlib import Path
-from typing import List, Union, IO, Any
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
 
 from micro.document.base import Document
 from micro.document.reader.base import Reader
+from micro.utils.download import DownloadedFile, Downloader
 from micro.utils.log import logger
 
-
-class PDFReader(Reader):
-    """Reader for PDF files"""
-
-    def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
-        if not pdf:
-            raise ValueError("No pdf provided")
-
+# A PDF as passed to a worker process: a file path or the file contents
+PDFSource = Union[str, bytes]
+# A PDF returned by get_source
+PDFInput = Union[PDFSource, IO[Any], DownloadedFile]
+
+# Process pools shared by all PDF readers, by number of workers and worker initializer
+_pools: Dict[Tuple[int, Optional[Callable[[], Any]]], ProcessPoolExecutor] = {}
+_pools_lock = Lock()
+# PDF opened by the last task in a worker process, consecutive tasks usually extract pages of the same file
+_worker_pdf: Dict[Tuple[str, int], Any] = {}
+# OCR engine of the process, loading the models takes longer than reading most PDFs
+_ocr_engine: Optional[Any] = None
+_ocr_engine_lock = Lock()
+
+
+def _reset_worker_state() -> None:
+    # Worker processes forked from a process using OCR load their own engine, ONNX Runtime sessions do not survive
+    # a fork, and the lock may have been held by another thread of the parent
+    global _ocr_engine, _ocr_engine_lock
+    _ocr_engine = None
+    _ocr_engine_lock = Lock()
+    _worker_pdf.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_worker_state)
+
+
+def get_process_pool(num_workers: int, initializer: Optional[Callable[[], Any]] = None) -> ProcessPoolExecutor:
+    """Returns the process pool shared by PDF readers with this number of workers.
+    `initializer` is called once in every worker process when it starts.
+    """
+    with _pools_lock:
+        key = (num_workers, initializer)
+        if key not in _pools:
+            _pools[key] = ProcessPoolExecutor(max_workers=num_workers, initializer=initializer)
+        return _pools[key]
+
+
+def reset_process_pool(pool: ProcessPoolExecutor) -> None:
+    """Replaces a broken process pool, e.g. after a worker process crashed, on the next call to get_process_pool"""
+    with _pools_lock:
+        for key in [k for k, _pool in _pools.items() if _pool is pool]:
+            del _pools[key]
+    pool.shutdown(wait=False)
+
+
+def open_pdf(source: Union[PDFSource, IO[Any]]) -> Any:
+    from pypdf import PdfReader as DocumentReader
+
+    if isinstance(source, bytes):
+        return DocumentReader(BytesIO(source))
+    if isinstance(source, str):
+        # Memory-map files instead of reading them into memory, pages are read from the page cache when needed
+        with open(source, "rb") as f:
+            return DocumentReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))  # type: ignore
+    return DocumentReader(source)
+
+
+def extract_pages(pdf: Any, first_page: int, last_page: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """Extracts the text of pages first_page to last_page of an open PDF.
+
+    Returns:
+        A (page number, text, error) tuple for each page, so a page that fails does not fail the others.
+    """
+    pages: List[Tuple[int, Optional[str], Optional[str]]] = []
+    for page_number in range(first_page, last_page + 1):
         try:
-            from pypdf import PdfReader as DocumentReader  # noqa: F401
-        except ImportError:
-            raise ImportError("`pypdf` not installed")
-
-        doc_name = ""
-        try:
-            if isinstance(pdf, str):
-                doc_name = pdf.split("/")[-1].split(".")[0].replace(" ", "_")
-            else:
-                doc_name = pdf.name.split(".")[0]
-        except Exception:
-            doc_name = "pdf"
-
-        logger.info(f"Reading: {doc_name}")
-        doc_reader = DocumentReader(pdf)
-
-        documents = [
-            Document(
-                name=doc_name,
-                id=f"{doc_name}_{page_number}",
-                meta_data={"page": page_number},
-                content=page.extract_text(),
-            )
-            for page_number, page in enumerate(doc_reader.pages, start=1)
-        ]
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-        return documents
-
+            pages.append((page_number, pdf.pages[page_number - 1].extract_text(), None))
+        except Exception as e:
+            pages.append((page_number, None, f"{e.__class__.__name__}: {e}"))
+    return pages
+
+
+def extract_pages_task(
+    source: PDFSource, first_page: int, last_page: int
+) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """Runs in a worker process, see extract_pages"""
+    if isinstance(source, str):
+        key = (source, os.stat(source).st_mtime_ns)
+        if key not in _worker_pdf:
+            _worker_pdf.clear()
+            _worker_pdf[key] = open_pdf(source)
+        pdf = _worker_pdf[key]
+    else:
+        pdf = open_pdf(source)
+    return extract_pages(pdf, first_page, last_page)
+
+
+def get_ocr_engine() -> Any:
+    """Returns the OCR engine of the process, loading its models on first use"""
+    global _ocr_engine
+    with _ocr_engine_lock:
+        if _ocr_engine is None:
+            import rapidocr_onnxruntime as rapidocr
 
-class PDFUrlReader(Reader):
-    """Reader for PDF files from URL"""
+            _ocr_engine = rapidocr.RapidOCR()
+        return _ocr_engine
 
-    def read(self, url: str) -> List[Document]:
-        if not url:
-            raise ValueError("No url provided")
 
-        from io import BytesIO
+def ocr_images(images: List[bytes]) -> List[Tuple[Optional[List[str]], Optional[str]]]:
+    """Runs OCR on images, in the calling process or in a worker of an OCR pool.
 
+    Returns:
+        The lines of text found in each image and an error, for each image.
+    """
+    ocr = get_ocr_engine()
+    results: List[Tuple[Optional[List[str]], Optional[str]]] = []
+    for image in images:
         try:
-            import httpx
-        except ImportError:
-            raise ImportError("`httpx` not installed")
-
+            with _ocr_engine_lock:
+                ocr_result, elapse = ocr(image)
+            results.append(([item[1] for item in ocr_result] if ocr_result else [], None))
+        except Exception as e:
+            results.append((None, f"{e.__class__.__name__}: {e}"))
+    return results
+
+
+class OCRCache:
+    """Text found by OCR in images, by hash of the image data. Shared by all PDF image readers of the process."""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries: int = max_entries
+        self._lock = Lock()
+        self._lines: "OrderedDict[str, List[str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            lines = self._lines.get(key)
+            if lines is not None:
+                self._lines.move_to_end(key)
+            return lines
+
+    def set(self, key: str, lines: List[str]) -> None:
+        with self._lock:
+            self._lines[key] = lines
+            self._lines.move_to_end(key)
+            while len(self._lines) > self.max_entries:
+                self._lines.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lines.clear()
+
+
+ocr_cache = OCRCache()
+
+
+def spool_pdf(source: Union[bytes, IO[Any]]) -> DownloadedFile:
+    """Returns the PDF contents or file object as a temporary file, copying file objects in blocks"""
+    if isinstance(source, bytes):
+        file = DownloadedFile(data=source)
+        file.get_path(suffix=".pdf")
+        return file
+    source.seek(0)
+    with NamedTemporaryFile(suffix=".pdf", delete=False) as f:
         try:
-            from pypdf import PdfReader as DocumentReader  # noqa: F401
-        except ImportError:
-            raise ImportError("`pypdf` not installed")
-
-        logger.info(f"Reading: {url}")
-        response = httpx.get(url)
+            shutil.copyfileobj(source, f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    return DownloadedFile(path=f.name, temporary=True)
+
+
+class PendingPDF:
+    """Pages of a PDF being extracted in a process pool"""
+
+    def __init__(self, name: str, pool: ProcessPoolExecutor, file: Optional[DownloadedFile] = None):
+        self.name: str = name
+        self.pool: ProcessPoolExecutor = pool
+        # Downloaded file closed once all pages are extracted
+        self.file: Optional[DownloadedFile] = file
+        # First page, last page and the task extracting them
+        self.tasks: List[Tuple[int, int, "Future[List[Tuple[int, Optional[str], Optional[str]]]]"]] = []
+
+    def result(self) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        pages: List[Tuple[int, Optional[str], Optional[str]]] = []
+        try:
+            for first_page, last_page, task in self.tasks:
+                try:
+                    pages.extend(task.result())
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        reset_process_pool(self.pool)
+                    error = f"{e.__class__.__name__}: {e}"
+                    pages.extend((page_number, None, error) for page_number in range(first_page, last_page + 1))
+        finally:
+            if self.file is not None:
+                self.file.close()
+        return pages
+
+
+class BasePDFReader(Reader):
+    """Base class for PDF readers extracting the text of each page"""
+
+    # Extract pages in a pool of this many processes shared by all PDF readers.
+    # Pages are extracted in the calling thread if None.
+    num_workers: Optional[int] = None
+    # Number of pages extracted by a worker process per task
+    pages_per_task: int = 8
+
+    def get_source(self, pdf: Any) -> Tuple[str, PDFInput]:
+        """Returns the document name and the PDF to read"""
+        raise NotImplementedError
+
+    def get_fetch_concurrency(self) -> int:
+        """Returns the number of sources fetched at the same time by read_many, e.g. downloads"""
+        return 1
+
+    def iter_sources(
+        self, pdfs: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Optional[Tuple[str, PDFInput]], Optional[Exception]]]:
+        """Yields each PDF with its name and source or the error fetching it, in order.
+        Fetches up to get_fetch_concurrency() sources ahead, while the previous PDFs are read.
+        """
+        concurrency = self.get_fetch_concurrency()
+        if concurrency <= 1:
+            for pdf in pdfs:
+                fetched: Optional[Tuple[str, PDFInput]] = None
+                error: Optional[Exception] = None
+                try:
+                    fetched = self.get_source(pdf)
+                except Exception as e:
+                    error = e
+                yield pdf, fetched, error
+            return
+
+        def get_fetched(pdf: Any, task: "Future[Tuple[str, PDFInput]]") -> Tuple[Any, Any, Optional[Exception]]:
+            try:
+                return pdf, task.result(), None
+            except Exception as e:
+                return pdf, None, e
+
+        pending: Deque[Tuple[Any, "Future[Tuple[str, PDFInput]]"]] = deque()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                for pdf in pdfs:
+                    pending.append((pdf, executor.submit(self.get_source, pdf)))
+                    if len(pending) > concurrency:
+                        yield get_fetched(*pending.popleft())
+                while len(pending) > 0:
+                    yield get_fetched(*pending.popleft())
+            finally:
+                # Remove the temporary files of sources fetched ahead which are not read
+                for _, task in pending:
+                    if not task.cancel() and task.exception() is None:
+                        _, source = task.result()
+                        if isinstance(source, DownloadedFile):
+                            source.close()
+
+    def submit(self, name: str, source: PDFInput) -> PendingPDF:
+        """Extracts the pages of a PDF in the process pool, without waiting for the result"""
+        file: Optional[DownloadedFile] = None
+        if isinstance(source, DownloadedFile):
+            # Downloads held in memory are written to a temporary file, so they are not sent to every task either
+            file, source = source, source.get_path(suffix=".pdf")
+        elif not isinstance(source, str):
+            # File objects and contents are written to a temporary file once, instead of being sent to every task.
+            # Workers memory-map the file and keep it open across the tasks of the PDF.
+            file = spool_pdf(source)
+            source = file.get_path(suffix=".pdf")
 
-        doc_name = url.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
-        doc_reader = DocumentReader(BytesIO(response.content))
-
-        documents = [
-            Document(
-                name=doc_name,
-                id=f"{doc_name}_{page_number}",
-                meta_data={"page": page_number},
-                content=page.extract_text(),
+        try:
+            pool = get_process_pool(self.num_workers or 1)
+            pending = PendingPDF(name=name, pool=pool, file=file)
+            num_pages = len(open_pdf(source).pages)
+            for first_page in range(1, num_pages + 1, self.pages_per_task):
+                last_page = min(first_page + self.pages_per_task - 1, num_pages)
+                try:
+                    task = pool.submit(extract_pages_task, source, first_page, last_page)
+                except BrokenProcessPool:
+                    reset_process_pool(pool)
+                    raise
+                pending.tasks.append((first_page, last_page, task))
+        except BaseException:
+            if file is not None:
+                file.close()
+            raise
+        return pending
+
+    def get_documents(self, name: str, pages: List[Tuple[int, Optional[str], Optional[str]]]) -> List[Document]:
+        """Returns a document for each page, in page order. Pages that failed are logged and skipped."""
+        documents: List[Document] = []
+        for page_number, content, error in pages:
+            if error is not None:
+                logger.warning(f"Could not extract page {page_number} of {name}: {error}")
+                continue
+            documents.append(
+                Document(
+                    name=name,
+                    id=f"{name}_{page_number}",
+                    meta_data={"page": page_number},
+                    content=content or "",
+                )
             )
-            for page_number, page in enumerate(doc_reader.pages, start=1)
-        ]
         if self.chunk:
             chunked_documents = []
             for document in documents:
@@ -88,132 +322,255 @@ class PDFUrlReader(Reader):
             return chunked_documents
         return documents
 
-
-class PDFImageReader(Reader):
-    """Reader for PDF files with text and images extraction"""
-
-    def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
+    def read_pdf(self, name: str, source: Union[PDFSource, IO[Any]]) -> List[Document]:
+        logger.info(f"Reading: {name}")
+        if self.num_workers is None:
+            pdf = open_pdf(source)
+            return self.get_documents(name, extract_pages(pdf, 1, len(pdf.pages)))
+        return self.get_documents(name, self.submit(name, source).result())
+
+    def read_source(self, name: str, source: PDFInput) -> List[Document]:
+        """Reads a PDF returned by get_source, removing it afterwards if it is a temporary file"""
+        if not isinstance(source, DownloadedFile):
+            return self.read_pdf(name, source)
+        if self.num_workers is not None:
+            logger.info(f"Reading: {name}")
+            # The file is closed once the pages are extracted
+            return self.get_documents(name, self.submit(name, source).result())
+        with source:
+            return self.read_pdf(name, source.source)
+
+    def read(self, pdf: Any) -> List[Document]:
         if not pdf:
             raise ValueError("No pdf provided")
 
         try:
-            import rapidocr_onnxruntime as rapidocr
             from pypdf import PdfReader as DocumentReader  # noqa: F401
         except ImportError:
-            raise ImportError("`pypdf` or `rapidocr_onnxruntime` not installed")
-
-        doc_name = ""
-        try:
-            if isinstance(pdf, str):
-                doc_name = pdf.split("/")[-1].split(".")[0].replace(" ", "_")
-            else:
-                doc_name = pdf.name.split(".")[0]
-        except Exception:
-            doc_name = "pdf"
-
-        logger.info(f"Reading: {doc_name}")
-        doc_reader = DocumentReader(pdf)
-
-        # Initialize RapidOCR
-        ocr = rapidocr.RapidOCR()
-
-        documents = []
-        for page_number, page in enumerate(doc_reader.pages, start=1):
-            page_text = page.extract_text() or ""
-            images_text_list: List = []
+            raise ImportError("`pypdf` not installed")
 
-            for image_object in page.images:
-                image_data = image_object.data
+        return self.read_source(*self.get_source(pdf))
 
-                # Perform OCR on the image
-                ocr_result, elapse = ocr(image_data)
+    def read_many(self, pdfs: Iterable[Any]) -> Iterator[List[Document]]:
+        """Reads PDFs and yields the documents of each PDF, in order.
+        With a process pool, the pages of up to 2 * num_workers PDFs are extracted at the same time.
+        """
+        try:
+            from pypdf import PdfReader as DocumentReader  # noqa: F401
+        except ImportError:
+            raise ImportError("`pypdf` not installed")
 
-                # Extract text from OCR result
-                if ocr_result:
-                    images_text_list += [item[1] for item in ocr_result]
+        if self.num_workers is None:
+            for pdf, fetched, error in self.iter_sources(pdfs):
+                if fetched is None:
+                    raise error or ValueError(f"Could not read {pdf}")
+                yield self.read_source(*fetched)
+            return
+
+        pending: Deque[PendingPDF] = deque()
+        for pdf, fetched, error in self.iter_sources(pdfs):
+            if fetched is None:
+                logger.warning(f"Could not read {pdf}: {error}")
+                continue
+            name, source = fetched
+            try:
+                logger.info(f"Reading: {name}")
+                pending.append(self.submit(name, source))
+            except Exception as e:
+                logger.warning(f"Could not read {name}: {e}")
+                if isinstance(source, DownloadedFile):
+                    source.close()
+            while len(pending) > 2 * self.num_workers:
+                _pending = pending.popleft()
+                yield self.get_documents(_pending.name, _pending.result())
+        while len(pending) > 0:
+            _pending = pending.popleft()
+            yield self.get_documents(_pending.name, _pending.result())
+
+
+def get_file_source(pdf: Union[str, Path, IO[Any]]) -> Tuple[str, PDFInput]:
+    """Returns the document name and the PDF to read for a file path or file object"""
+    doc_name = ""
+    try:
+        if isinstance(pdf, str):
+            doc_name = pdf.split("/")[-1].split(".")[0].replace(" ", "_")
+        else:
+            doc_name = pdf.name.split(".")[0]
+    except Exception:
+        doc_name = "pdf"
+    return doc_name, str(pdf) if isinstance(pdf, Path) else pdf
+
+
+class PDFReader(BasePDFReader):
+    """Reader for PDF files"""
 
-            images_text: str = "\n".join(images_text_list)
-            content = page_text + "\n" + images_text
+    def get_source(self, pdf: Union[str, Path, IO[Any]]) -> Tuple[str, PDFInput]:
+        return get_file_source(pdf)
 
-            documents.append(
-                Document(
-                    name=doc_name,
-                    id=f"{doc_name}_{page_number}",
-                    meta_data={"page": page_number},
-                    content=content,
-                )
-            )
 
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
+class PDFUrlReader(BasePDFReader):
+    """Reader for PDF files from URL"""
 
-        return documents
+    # Streams downloads to memory or a temporary file, optionally cached on disk
+    downloader: Downloader = Downloader()
 
+    def get_fetch_concurrency(self) -> int:
+        return self.downloader.max_concurrency
 
-class PDFUrlImageReader(Reader):
-    """Reader for PDF files from URL with text and images extraction"""
+    def get_source(self, url: str) -> Tuple[str, DownloadedFile]:
+        logger.debug(f"Downloading: {url}")
+        doc_name = url.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
+        return doc_name, self.downloader.get(url, suffix=".pdf")
 
     def read(self, url: str) -> List[Document]:
         if not url:
             raise ValueError("No url provided")
 
-        from io import BytesIO
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise ImportError("`httpx` not installed")
 
+        return super().read(url)
+
+
+class BasePDFImageReader(BasePDFReader):
+    """Base class for PDF readers extracting the text of each page and of the images on it.
+    num_workers sets the number of OCR worker processes, which load the OCR models once and are shared
+    by all PDF image readers. Images are processed in the calling process if None.
+    """
+
+    # Number of images sent to an OCR worker per task
+    ocr_batch_size: int = 8
+    # Number of pages whose images are kept in memory and processed at the same time
+    ocr_pages: int = 32
+    # Reuse the text of images seen before, e.g. logos repeated on every page, found by hash of the image data
+    cache_ocr: bool = True
+
+    def ocr(self, name: str, images: List[bytes]) -> List[List[str]]:
+        """Returns the lines of text found in each image"""
+        keys = [sha256(image).hexdigest() for image in images]
+        lines: Dict[str, List[str]] = {}
+        if self.cache_ocr:
+            for key in keys:
+                cached_lines = ocr_cache.get(key)
+                if cached_lines is not None:
+                    lines[key] = cached_lines
+
+        # Images to process, each image once
+        missing: Dict[str, bytes] = {}
+        for key, image in zip(keys, images):
+            if key not in lines and key not in missing:
+                missing[key] = image
+        missing_keys = list(missing)
+        batches = [missing_keys[i : i + self.ocr_batch_size] for i in range(0, len(missing_keys), self.ocr_batch_size)]
+
+        results: List[List[Tuple[Optional[List[str]], Optional[str]]]] = []
+        if self.num_workers is None:
+            results = [ocr_images([missing[key] for key in batch]) for batch in batches]
+        elif len(batches) > 0:
+            pool = get_process_pool(self.num_workers, initializer=get_ocr_engine)
+            try:
+                tasks = [pool.submit(ocr_images, [missing[key] for key in batch]) for batch in batches]
+            except BrokenProcessPool:
+                reset_process_pool(pool)
+                raise
+            for batch, task in zip(batches, tasks):
+                try:
+                    results.append(task.result())
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        reset_process_pool(pool)
+                    results.append([(None, f"{e.__class__.__name__}: {e}")] * len(batch))
+
+        for batch, batch_results in zip(batches, results):
+            for key, (image_lines, error) in zip(batch, batch_results):
+                if image_lines is None:
+                    logger.warning(f"Could not read an image in {name}: {error}")
+                    continue
+                lines[key] = image_lines
+                if self.cache_ocr:
+                    ocr_cache.set(key, image_lines)
+        return [lines.get(key, []) for key in keys]
+
+    def read_pdf(self, name: str, source: Union[PDFSource, IO[Any]]) -> List[Document]:
+        logger.info(f"Reading: {name}")
+        pdf = open_pdf(source)
+        num_pages = len(pdf.pages)
+
+        pages: List[Tuple[int, Optional[str], Optional[str]]] = []
+        for first_page in range(1, num_pages + 1, self.ocr_pages):
+            last_page = min(first_page + self.ocr_pages - 1, num_pages)
+            page_texts = extract_pages(pdf, first_page, last_page)
+            page_images: List[List[bytes]] = []
+            for page_number in range(first_page, last_page + 1):
+                try:
+                    page_images.append([image_object.data for image_object in pdf.pages[page_number - 1].images])
+                except Exception as e:
+                    logger.warning(f"Could not extract the images of page {page_number} of {name}: {e}")
+                    page_images.append([])
+
+            # Process the images of several pages at the same time, so every OCR worker is busy
+            images_lines = iter(self.ocr(name, [image for images in page_images for image in images]))
+            for (page_number, page_text, error), images in zip(page_texts, page_images):
+                images_text = "\n".join(line for _ in images for line in next(images_lines))
+                if error is not None and len(images) == 0:
+                    pages.append((page_number, None, error))
+                else:
+                    pages.append((page_number, (page_text or "") + "\n" + images_text, None))
+        return self.get_documents(name, pages)
+
+    def read_source(self, name: str, source: PDFInput) -> List[Document]:
+        """Reads a PDF returned by get_source with read_pdf, as the text extraction pool does not run OCR"""
+        if not isinstance(source, DownloadedFile):
+            return self.read_pdf(name, source)
+        with source:
+            return self.read_pdf(name, source.source)
+
+    def read(self, pdf: Any) -> List[Document]:
         try:
-            import httpx
-            from pypdf import PdfReader as DocumentReader
-            import rapidocr_onnxruntime as rapidocr
+            import rapidocr_onnxruntime as rapidocr  # noqa: F401
         except ImportError:
-            raise ImportError("`httpx`, `pypdf` or `rapidocr_onnxruntime` not installed")
+            raise ImportError("`rapidocr_onnxruntime` not installed")
 
-        # Read the PDF from the URL
-        logger.info(f"Reading: {url}")
-        response = httpx.get(url)
+        return super().read(pdf)
 
-        doc_name = url.split("/")[-1].split(".")[0].replace(" ", "_")
-        doc_reader = DocumentReader(BytesIO(response.content))
+    def read_many(self, pdfs: Iterable[Any]) -> Iterator[List[Document]]:
+        """Reads PDFs and yields the documents of each PDF, in order. The OCR pool processes one PDF at a time."""
+        for pdf, fetched, error in self.iter_sources(pdfs):
+            if fetched is None:
+                raise error or ValueError(f"Could not read {pdf}")
+            yield self.read_source(*fetched)
 
-        # Initialize RapidOCR
-        ocr = rapidocr.RapidOCR()
 
-        # Process each page of the PDF
-        documents = []
-        for page_number, page in enumerate(doc_reader.pages, start=1):
-            page_text = page.extract_text() or ""
-            images_text_list = []
+class PDFImageReader(BasePDFImageReader):
+    """Reader for PDF files with text and images extraction"""
 
-            # Extract and process images
-            for image_object in page.images:
-                image_data = image_object.data
+    def get_source(self, pdf: Union[str, Path, IO[Any]]) -> Tuple[str, PDFInput]:
+        return get_file_source(pdf)
 
-                # Perform OCR on the image
-                ocr_result, elapse = ocr(image_data)
 
-                # Extract text from OCR result
-                if ocr_result:
-                    images_text_list += [item[1] for item in ocr_result]
+class PDFUrlImageReader(BasePDFImageReader):
+    """Reader for PDF files from URL with text and images extraction"""
 
-            images_text = "\n".join(images_text_list)
-            content = page_text + "\n" + images_text
+    # Streams downloads to memory or a temporary file, optionally cached on disk
+    downloader: Downloader = Downloader()
 
-            # Append the document
-            documents.append(
-                Document(
-                    name=doc_name,
-                    id=f"{doc_name}_{page_number}",
-                    meta_data={"page": page_number},
-                    content=content,
-                )
-            )
+    def get_fetch_concurrency(self) -> int:
+        return self.downloader.max_concurrency
 
-        # Optionally chunk documents
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
+    def get_source(self, url: str) -> Tuple[str, DownloadedFile]:
+        logger.debug(f"Downloading: {url}")
+        doc_name = url.split("/")[-1].split(".")[0].replace(" ", "_")
+        return doc_name, self.downloader.get(url, suffix=".pdf")
 
-        return documents
+    def read(self, url: str) -> List[Document]:
+        if not url:
+            raise ValueError("No url provided")
+
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise ImportError("`httpx` not installed")
+
+        return super().read(url)
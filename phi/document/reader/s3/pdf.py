@@ -1,46 +1,27 @@
-from typing import List
+from typing import List, Tuple
 
 from micro.document.base import Document
-from micro.document.reader.base import Reader
+from micro.document.reader.pdf import BasePDFReader
 from phi.aws.resource.s3.object import S3Object
+from micro.utils.download import DownloadedFile, Downloader
 from micro.utils.log import logger
 
 
-class S3PDFReader(Reader):
+class S3PDFReader(BasePDFReader):
     """Reader for PDF files on S3"""
 
-    def read(self, s3_object: S3Object) -> List[Document]:
-        from io import BytesIO
-
-        if not s3_object:
-            raise ValueError("No s3_object provided")
+    # Streams objects to memory or a temporary file, optionally cached on disk
+    downloader: Downloader = Downloader()
 
-        try:
-            from pypdf import PdfReader as DocumentReader  # noqa: F401
-        except ImportError:
-            raise ImportError("`pypdf` not installed")
+    def get_fetch_concurrency(self) -> int:
+        return self.downloader.max_concurrency
 
-        try:
-            logger.info(f"Reading: {s3_object.uri}")
+    def get_source(self, s3_object: S3Object) -> Tuple[str, DownloadedFile]:
+        logger.debug(f"Downloading: {s3_object.uri}")
+        doc_name = s3_object.name.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
+        return doc_name, self.downloader.get_s3_object(s3_object, suffix=".pdf")
 
-            object_resource = s3_object.get_resource()
-            object_body = object_resource.get()["Body"]
-            doc_name = s3_object.name.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
-            doc_reader = DocumentReader(BytesIO(object_body.read()))
-            documents = [
-                Document(
-                    name=doc_name,
-                    id=f"{doc_name}_{page_number}",
-                    meta_data={"page": page_number},
-                    content=page.extract_text(),
-                )
-                for page_number, page in enumerate(doc_reader.pages, start=1)
-            ]
-            if self.chunk:
-                chunked_documents = []
-                for document in documents:
-                    chunked_documents.extend(self.chunk_document(document))
-                return chunked_documents
-            return documents
-        except Exception:
-            raise
+    def read(self, s3_object: S3Object) -> List[Document]:
+        if not s3_object:
+            raise ValueError("No s3_object provided")
+        return super().read(s3_object)
@@ -4,12 +4,16 @@ from typing import List
 from micro.document.base import Document
 from micro.document.reader.base import Reader
 from phi.aws.resource.s3.object import S3Object
+from micro.utils.download import Downloader
 from micro.utils.log import logger
 
 
 class S3TextReader(Reader):
     """Reader for text files on S3"""
 
+    # Streams objects to memory or a temporary file, optionally cached on disk
+    downloader: Downloader = Downloader()
+
     def read(self, s3_object: S3Object) -> List[Document]:
         if not s3_object:
             raise ValueError("No s3_object provided")
@@ -23,12 +27,14 @@ class S3TextReader(Reader):
             logger.info(f"Reading: {s3_object.uri}")
 
             obj_name = s3_object.name.split("/")[-1]
-            temporary_file = Path("storage").joinpath(obj_name)
-            s3_object.download(temporary_file)
+            # textract detects the file type from the extension
+            suffix = Path(obj_name).suffix
+            with self.downloader.get_s3_object(s3_object, suffix=suffix) as file:
+                file_path = file.get_path(suffix=suffix)
+                logger.info(f"Parsing: {file_path}")
+                doc_content = textract.process(file_path)
 
-            logger.info(f"Parsing: {temporary_file}")
             doc_name = s3_object.name.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
-            doc_content = textract.process(temporary_file)
             documents = [
                 Document(
                     name=doc_name,
@@ -41,9 +47,6 @@ class S3TextReader(Reader):
                 for document in documents:
                     chunked_documents.extend(self.chunk_document(document))
                 return chunked_documents
-
-            logger.debug(f"Deleting: {temporary_file}")
-            temporary_file.unlink()
             return documents
         except Exception as e:
             logger.error(f"Error reading: {s3_object.uri}: {e}")
@@ -1,12 +1,36 @@
-from typing import Optional, Dict, List, Tuple
+import asyncio
+from random import random
+from typing import Optional, Dict, List, Tuple, Iterator
 
 from pydantic import BaseModel, ConfigDict
 
+from micro.tokenizer.base import Tokenizer
+from micro.utils.log import logger
+
 
 class Embedder(BaseModel):
     """Base class for managing embedders"""
 
     dimensions: int = 1536
+    # -*- Batch parameters
+    # Maximum number of texts sent to the provider in a single request
+    batch_size: int = 100
+    # Maximum number of (estimated) tokens sent to the provider in a single request
+    batch_max_tokens: Optional[int] = None
+    # Tokenizer of the embedding model, used to count tokens exactly instead of estimating them
+    tokenizer: Optional[Tokenizer] = None
+    # -*- Async parameters
+    # Maximum number of concurrent requests to the provider
+    max_concurrency: int = 8
+    # Number of times a failed request is retried
+    retry_attempts: int = 3
+    # Initial delay between retries in seconds, doubled on every retry
+    retry_backoff: float = 1.0
+    # Maximum delay between retries in seconds
+    retry_max_backoff: float = 30.0
+
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -15,3 +39,180 @@ class Embedder(BaseModel):
 
     def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
         raise NotImplementedError
+
+    def get_known_token_counts(self, meta_data: List[Dict]) -> Optional[List[Optional[int]]]:
+        """Returns the "chunk_tokens" counted by a reader with the same tokenizer as this embedder, for each document"""
+        if self.batch_max_tokens is None or self.tokenizer is None:
+            return None
+        tokenizer_name = self.tokenizer.name
+        return [m.get("chunk_tokens") if m.get("chunk_tokenizer") == tokenizer_name else None for m in meta_data]
+
+    def count_tokens(self, text: str) -> int:
+        """Returns the number of tokens in the text, estimated unless a tokenizer is set, used to split batches"""
+        if self.tokenizer is not None:
+            return self.tokenizer.count_tokens(text)
+        return len(text) // 4 + 1
+
+    def get_batches(self, texts: List[str], token_counts: Optional[List[Optional[int]]] = None) -> Iterator[List[str]]:
+        """Split texts into batches bounded by `batch_size` and `batch_max_tokens`
+
+        Args:
+            texts (List[str]): Texts to split into batches
+            token_counts (Optional[List[Optional[int]]]): Known number of tokens of each text for the tokenizer
+                of this embedder, e.g. counted by the reader when chunking. Texts without a count are tokenized.
+        """
+        if self.batch_max_tokens is None or self.tokenizer is None:
+            token_counts = None
+        else:
+            _token_counts = list(token_counts) if token_counts is not None else [None] * len(texts)
+            to_count = [i for i, num_tokens in enumerate(_token_counts) if num_tokens is None]
+            if len(to_count) > 0:
+                counted = self.tokenizer.count_tokens_batch([texts[i] for i in to_count])
+                for i, num_tokens in zip(to_count, counted):
+                    _token_counts[i] = num_tokens
+            token_counts = _token_counts
+
+        batch: List[str] = []
+        batch_tokens = 0
+        for i, text in enumerate(texts):
+            num_tokens = 0
+            if token_counts is not None:
+                num_tokens = token_counts[i] or 0
+            elif self.batch_max_tokens is not None:
+                num_tokens = self.count_tokens(text)
+            if len(batch) > 0 and (
+                len(batch) >= self.batch_size
+                or (self.batch_max_tokens is not None and batch_tokens + num_tokens > self.batch_max_tokens)
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += num_tokens
+        if len(batch) > 0:
+            yield batch
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        """Embed a single batch of texts, returning the embeddings and the usage for the whole batch.
+        Embedders that support multiple inputs per request should override this method.
+        """
+        embeddings: List[List[float]] = []
+        usage: Optional[Dict] = None
+        for text in texts:
+            embedding, text_usage = self.get_embedding_and_usage(text)
+            embeddings.append(embedding)
+            if text_usage is not None:
+                usage = usage or {}
+                for key, value in text_usage.items():
+                    if isinstance(value, (int, float)):
+                        usage[key] = usage.get(key, 0) + value
+        return embeddings, usage
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embeddings, _ = self.get_embeddings_and_usage(texts)
+        return embeddings
+
+    def get_embeddings_and_usage(
+        self, texts: List[str], token_counts: Optional[List[Optional[int]]] = None
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Embed a list of texts in as few requests as possible.
+        Known token counts of the texts are used to split batches, see `get_batches`.
+
+        Returns:
+            The embeddings and the usage for each text, in the same order as `texts`.
+            Providers only report usage per request, so it is split across the texts in a batch by length.
+        """
+        embeddings: List[List[float]] = []
+        usage: List[Optional[Dict]] = []
+        for batch in self.get_batches(texts, token_counts):
+            batch_embeddings, batch_usage = self._embed_batch(batch)
+            embeddings.extend(batch_embeddings)
+            usage.extend(self._split_usage(batch_usage, batch))
+        return embeddings, usage
+
+    @staticmethod
+    def _split_usage(usage: Optional[Dict], texts: List[str]) -> List[Optional[Dict]]:
+        if usage is None:
+            return [None] * len(texts)
+        if len(texts) == 1:
+            return [usage]
+
+        total_length = sum(len(text) or 1 for text in texts)
+        split_usage: List[Optional[Dict]] = []
+        for text in texts:
+            share = (len(text) or 1) / total_length
+            split_usage.append(
+                {
+                    key: round(value * share) if isinstance(value, int) else value
+                    for key, value in usage.items()
+                    if isinstance(value, (int, float))
+                }
+            )
+        return split_usage
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore shared by all async requests made by this embedder on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Returns True if a request that failed with this error should be retried"""
+        return True
+
+    async def _aembed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        """Embed a single batch of texts asynchronously.
+        Embedders with an async client should override this method, the default runs `_embed_batch` in a thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._embed_batch, texts)
+
+    async def _aembed_batch_with_retries(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        attempt = 0
+        while True:
+            try:
+                async with self.semaphore:
+                    return await self._aembed_batch(texts)
+            except Exception as e:
+                if attempt >= self.retry_attempts or not self._is_retryable(e):
+                    raise
+                # Exponential backoff with jitter
+                delay = min(self.retry_backoff * (2**attempt), self.retry_max_backoff) * (0.5 + random() / 2)
+                attempt += 1
+                logger.warning(
+                    f"Embedding request failed: {e}. Retrying in {delay:.2f}s ({attempt}/{self.retry_attempts})"
+                )
+                await asyncio.sleep(delay)
+
+    async def aget_embedding(self, text: str) -> List[float]:
+        embeddings = await self.aget_embeddings([text])
+        return embeddings[0]
+
+    async def aget_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        embeddings, usage = await self.aget_embeddings_and_usage([text])
+        return embeddings[0], usage[0]
+
+    async def aget_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embeddings, _ = await self.aget_embeddings_and_usage(texts)
+        return embeddings
+
+    async def aget_embeddings_and_usage(
+        self, texts: List[str], token_counts: Optional[List[Optional[int]]] = None
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Embed a list of texts asynchronously, sending up to `max_concurrency` batches at a time.
+
+        Returns:
+            The embeddings and the usage for each text, in the same order as `texts`.
+        """
+        batches = list(self.get_batches(texts, token_counts))
+        results = await asyncio.gather(*[self._aembed_batch_with_retries(batch) for batch in batches])
+
+        embeddings: List[List[float]] = []
+        usage: List[Optional[Dict]] = []
+        for batch, (batch_embeddings, batch_usage) in zip(batches, results):
+            embeddings.extend(batch_embeddings)
+            usage.extend(self._split_usage(batch_usage, batch))
+        return embeddings, usage
@@ -0,0 +1,301 @@
+import mmap
+import sqlite3
+import threading
+from array import array
+from hashlib import md5
+from pathlib import Path
+from time import time
+from typing import Optional, Dict, List, Tuple, Any
+
+from pydantic import PrivateAttr, model_validator
+
+from micro.embedder.base import Embedder
+from micro.utils.log import logger
+
+# Guards opening the cache files, each cache then has its own lock
+_open_lock = threading.Lock()
+
+
+class CachedEmbedder(Embedder):
+    """Embedder that caches the embeddings of another embedder on local disk.
+
+    Embeddings are keyed by (model, dimensions, content hash) and stored as float32 records in a
+    memory-mapped file, with an sqlite index mapping content hashes to records.
+    """
+
+    # The embedder to cache
+    embedder: Embedder
+    # Directory to store the cache in
+    cache_dir: Path = Path.home().resolve().joinpath(".phi", "embeddings")
+    # Maximum size of the vector file in MB, least recently used embeddings are evicted beyond this size
+    max_size_mb: Optional[float] = 1024
+    # Number of records to grow the vector file by
+    grow_by: int = 4096
+
+    # -*- Cache statistics, counted per text
+    hits: int = 0
+    misses: int = 0
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _index: Optional[sqlite3.Connection] = None
+    _file: Optional[Any] = None
+    _mmap: Optional[mmap.mmap] = None
+    _capacity: int = 0
+    _next_slot: int = 0
+
+    @model_validator(mode="after")
+    def set_dimensions(self) -> "CachedEmbedder":
+        self.dimensions = self.embedder.dimensions
+        return self
+
+    @property
+    def model(self) -> str:
+        return getattr(self.embedder, "model", None) or self.embedder.__class__.__name__
+
+    @property
+    def record_size(self) -> int:
+        return self.dimensions * 4
+
+    @property
+    def max_entries(self) -> Optional[int]:
+        if self.max_size_mb is None:
+            return None
+        return max(int(self.max_size_mb * 1024 * 1024) // self.record_size, 1)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    @property
+    def cache_path(self) -> Path:
+        _model = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.model)
+        return self.cache_dir.joinpath(f"{_model}-{self.dimensions}")
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        cleaned_content = text.replace("\x00", "\ufffd")
+        return md5(cleaned_content.encode()).hexdigest()
+
+    def _open(self) -> sqlite3.Connection:
+        if self._index is not None:
+            return self._index
+
+        with _open_lock:
+            if self._index is None:
+                self._index = self._create_index()
+        return self._index
+
+    def _create_index(self) -> sqlite3.Connection:
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"Opening embedding cache: {self.cache_path}")
+
+        index = sqlite3.connect(str(self.cache_path.joinpath("index.db")), check_same_thread=False)
+        index.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(hash TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        index.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        index.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+        index.commit()
+
+        max_slot = index.execute(
+            "SELECT MAX(slot) FROM (SELECT slot FROM embeddings UNION ALL SELECT slot FROM free_slots)"
+        ).fetchone()[0]
+        self._next_slot = max_slot + 1 if max_slot is not None else 0
+
+        vectors_path = self.cache_path.joinpath("vectors.f32")
+        if not vectors_path.exists():
+            vectors_path.touch()
+        self._file = vectors_path.open("r+b")
+        self._capacity = vectors_path.stat().st_size // self.record_size
+        if self._capacity == 0:
+            self._grow(self.grow_by)
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+        return index
+
+    def _grow(self, min_capacity: int) -> None:
+        if self._file is None:
+            return
+        new_capacity = max(min_capacity, self._capacity + self.grow_by)
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+        self._file.truncate(new_capacity * self.record_size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._capacity = new_capacity
+
+    def _read(self, slot: int) -> List[float]:
+        assert self._mmap is not None
+        offset = slot * self.record_size
+        record = array("f")
+        record.frombytes(self._mmap[offset : offset + self.record_size])
+        return record.tolist()
+
+    def _write(self, slot: int, embedding: List[float]) -> None:
+        if slot >= self._capacity:
+            self._grow(slot + 1)
+        assert self._mmap is not None
+        offset = slot * self.record_size
+        self._mmap[offset : offset + self.record_size] = array("f", embedding).tobytes()
+
+    def _allocate_slot(self, index: sqlite3.Connection) -> int:
+        row = index.execute("SELECT slot FROM free_slots LIMIT 1").fetchone()
+        if row is not None:
+            index.execute("DELETE FROM free_slots WHERE slot = ?", (row[0],))
+            return row[0]
+        slot = self._next_slot
+        self._next_slot += 1
+        return slot
+
+    def _evict(self, index: sqlite3.Connection) -> None:
+        max_entries = self.max_entries
+        if max_entries is None:
+            return
+        count = index.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= max_entries:
+            return
+
+        logger.debug(f"Evicting {count - max_entries} embeddings from cache")
+        evicted = index.execute(
+            "SELECT hash, slot FROM embeddings ORDER BY last_used LIMIT ?", (count - max_entries,)
+        ).fetchall()
+        index.executemany("DELETE FROM embeddings WHERE hash = ?", [(row[0],) for row in evicted])
+        index.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", [(row[1],) for row in evicted])
+
+    def _lookup(self, index: sqlite3.Connection, hashes: List[str]) -> Dict[str, int]:
+        slots: Dict[str, int] = {}
+        unique_hashes = list(set(hashes))
+        # Stay below the sqlite limit on the number of host parameters
+        for i in range(0, len(unique_hashes), 500):
+            chunk = unique_hashes[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for _hash, slot in index.execute(
+                f"SELECT hash, slot FROM embeddings WHERE hash IN ({placeholders})", chunk
+            ).fetchall():
+                slots[_hash] = slot
+        return slots
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embeddings([text])[0]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        embeddings, usage = self.get_embeddings_and_usage([text])
+        return embeddings[0], usage[0]
+
+    def _get_cached(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]], Dict[str, List[int]]]:
+        """Returns the cached embeddings for the texts and the positions of the texts that are not cached,
+        grouped by content hash so that duplicate texts are only embedded once.
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        embeddings: List[List[float]] = [[] for _ in texts]
+        usage: List[Optional[Dict]] = [None] * len(texts)
+
+        index = self._open()
+        with self._lock:
+            slots = self._lookup(index, hashes)
+            for i, _hash in enumerate(hashes):
+                if _hash in slots:
+                    embeddings[i] = self._read(slots[_hash])
+            if len(slots) > 0:
+                now = time()
+                index.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE hash = ?", [(now, _hash) for _hash in slots]
+                )
+                index.commit()
+
+        missing: Dict[str, List[int]] = {}
+        for i, _hash in enumerate(hashes):
+            if _hash not in slots:
+                missing.setdefault(_hash, []).append(i)
+        # Duplicate texts count once per text for both hits and misses, although they are only embedded once
+        num_missing = sum(len(positions) for positions in missing.values())
+        self.hits += len(texts) - num_missing
+        self.misses += num_missing
+        return embeddings, usage, missing
+
+    def _set_cached(
+        self,
+        missing: Dict[str, List[int]],
+        new_embeddings: List[List[float]],
+        new_usage: List[Optional[Dict]],
+        embeddings: List[List[float]],
+        usage: List[Optional[Dict]],
+    ) -> None:
+        """Stores newly created embeddings in the cache and fills them in at the positions of their texts"""
+        index = self._open()
+        with self._lock:
+            now = time()
+            for (_hash, positions), embedding, embedding_usage in zip(missing.items(), new_embeddings, new_usage):
+                for i in positions:
+                    embeddings[i] = embedding
+                usage[positions[0]] = embedding_usage
+                # Do not cache failed embeddings
+                if len(embedding) != self.dimensions:
+                    continue
+                slot = self._allocate_slot(index)
+                self._write(slot, embedding)
+                index.execute(
+                    "INSERT OR REPLACE INTO embeddings (hash, slot, last_used) VALUES (?, ?, ?)", (_hash, slot, now)
+                )
+            self._evict(index)
+            if self._mmap is not None:
+                self._mmap.flush()
+            index.commit()
+
+    def get_known_token_counts(self, meta_data: List[Dict]) -> Optional[List[Optional[int]]]:
+        return self.embedder.get_known_token_counts(meta_data)
+
+    def get_embeddings_and_usage(
+        self, texts: List[str], token_counts: Optional[List[Optional[int]]] = None
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Returns cached embeddings and only calls the wrapped embedder for texts that are not cached.
+        Cached embeddings have no usage.
+        """
+        embeddings, usage, missing = self._get_cached(texts)
+        if len(missing) > 0:
+            missing_texts = [texts[positions[0]] for positions in missing.values()]
+            missing_token_counts = (
+                [token_counts[positions[0]] for positions in missing.values()] if token_counts is not None else None
+            )
+            new_embeddings, new_usage = self.embedder.get_embeddings_and_usage(missing_texts, missing_token_counts)
+            self._set_cached(missing, new_embeddings, new_usage, embeddings, usage)
+        return embeddings, usage
+
+    async def aget_embeddings_and_usage(
+        self, texts: List[str], token_counts: Optional[List[Optional[int]]] = None
+    ) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        embeddings, usage, missing = self._get_cached(texts)
+        if len(missing) > 0:
+            missing_texts = [texts[positions[0]] for positions in missing.values()]
+            missing_token_counts = (
+                [token_counts[positions[0]] for positions in missing.values()] if token_counts is not None else None
+            )
+            new_embeddings, new_usage = await self.embedder.aget_embeddings_and_usage(
+                missing_texts, missing_token_counts
+            )
+            self._set_cached(missing, new_embeddings, new_usage, embeddings, usage)
+        return embeddings, usage
+
+    def clear_cache(self) -> None:
+        """Removes all embeddings from the cache"""
+        index = self._open()
+        with self._lock:
+            index.execute("DELETE FROM embeddings")
+            index.execute("DELETE FROM free_slots")
+            index.commit()
+            self._next_slot = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.flush()
+                self._mmap.close()
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
@@ -1,10 +1,12 @@
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Union
 
 from micro.embedder.base import Embedder
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 
 try:
     from mistralai.client import MistralClient
+    from mistralai.async_client import MistralAsyncClient
     from mistralai.models.embeddings import EmbeddingResponse
 except ImportError:
     raise ImportError("`openai` not installed")
@@ -13,6 +15,9 @@ except ImportError:
 class MistralEmbedder(Embedder):
     model: str = "mistral-embed"
     dimensions: int = 1024
+    # -*- Batch parameters, the API accepts up to 16k tokens per request
+    batch_size: int = 128
+    batch_max_tokens: Optional[int] = 16000
     # -*- Request parameters
     request_params: Optional[Dict[str, Any]] = None
     # -*- Client parameters
@@ -23,12 +28,11 @@ class MistralEmbedder(Embedder):
     client_params: Optional[Dict[str, Any]] = None
     # -*- Provide the MistralClient manually
     mistral_client: Optional[MistralClient] = None
+    async_client: Optional[MistralAsyncClient] = None
 
-    @property
-    def client(self) -> MistralClient:
-        if self.mistral_client:
-            return self.mistral_client
+    _client: Optional[MistralClient] = None
 
+    def get_client_params(self) -> Dict[str, Any]:
         _client_params: Dict[str, Any] = {}
         if self.api_key:
             _client_params["api_key"] = self.api_key
@@ -40,16 +44,41 @@ class MistralEmbedder(Embedder):
             _client_params["timeout"] = self.timeout
         if self.client_params:
             _client_params.update(self.client_params)
-        return MistralClient(**_client_params)
+        return _client_params
+
+    @property
+    def client(self) -> MistralClient:
+        if self.mistral_client:
+            return self.mistral_client
 
-    def _response(self, text: str) -> EmbeddingResponse:
+        if self._client is None:
+            self._client = client_registry.get_client(
+                "mistral", MistralClient, self.get_client_params(), http_client_param=None
+            )
+        return self._client
+
+    def get_async_client(self) -> MistralAsyncClient:
+        if self.async_client:
+            return self.async_client
+
+        return client_registry.get_async_client(
+            "mistral",
+            MistralAsyncClient,
+            {"max_concurrent_requests": self.max_concurrency, **self.get_client_params()},
+            http_client_param=None,
+        )
+
+    def _request_params(self, text: Union[str, List[str]]) -> Dict[str, Any]:
         _request_params: Dict[str, Any] = {
             "input": text,
             "model": self.model,
         }
         if self.request_params:
             _request_params.update(self.request_params)
-        return self.client.embeddings(**_request_params)
+        return _request_params
+
+    def _response(self, text: Union[str, List[str]]) -> EmbeddingResponse:
+        return self.client.embeddings(**self._request_params(text))
 
     def get_embedding(self, text: str) -> List[float]:
         response: EmbeddingResponse = self._response(text=text)
@@ -65,3 +94,16 @@ class MistralEmbedder(Embedder):
         embedding = response.data[0].embedding
         usage = response.usage
         return embedding, usage.model_dump()
+
+    @staticmethod
+    def _parse_batch(response: EmbeddingResponse) -> Tuple[List[List[float]], Optional[Dict]]:
+        embeddings = [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+        usage = response.usage
+        return embeddings, usage.model_dump() if usage is not None else None
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        return self._parse_batch(self._response(text=texts))
+
+    async def _aembed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        response = await self.get_async_client().embeddings(**self._request_params(texts))
+        return self._parse_batch(response)
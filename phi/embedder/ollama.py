@@ -1,10 +1,12 @@
+import asyncio
 from typing import Optional, Dict, List, Tuple, Any
 
 from micro.embedder.base import Embedder
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 
 try:
-    from ollama import Client as OllamaClient
+    from ollama import Client as OllamaClient, AsyncClient as AsyncOllamaClient
 except ImportError:
     logger.error("`ollama` not installed")
     raise
@@ -13,32 +15,56 @@ except ImportError:
 class OllamaEmbedder(Embedder):
     model: str = "openhermes"
     dimensions: int = 4096
+    # -*- Batch parameters, only used with servers that support the `embed` endpoint
+    batch_size: int = 64
     host: Optional[str] = None
     timeout: Optional[Any] = None
     options: Optional[Any] = None
     client_kwargs: Optional[Dict[str, Any]] = None
     ollama_client: Optional[OllamaClient] = None
+    async_client: Optional[AsyncOllamaClient] = None
 
-    @property
-    def client(self) -> OllamaClient:
-        if self.ollama_client:
-            return self.ollama_client
+    _client: Optional[OllamaClient] = None
 
-        _ollama_params: Dict[str, Any] = {}
+    def get_client_params(self) -> Dict[str, Any]:
+        # The ollama clients pass extra arguments to their httpx client
+        _ollama_params: Dict[str, Any] = client_registry.get_http_client_kwargs()
         if self.host:
             _ollama_params["host"] = self.host
         if self.timeout:
             _ollama_params["timeout"] = self.timeout
         if self.client_kwargs:
             _ollama_params.update(self.client_kwargs)
-        return OllamaClient(**_ollama_params)
+        return _ollama_params
 
-    def _response(self, text: str) -> Dict[str, Any]:
+    @property
+    def client(self) -> OllamaClient:
+        if self.ollama_client:
+            return self.ollama_client
+
+        if self._client is None:
+            self._client = client_registry.get_client(
+                "ollama", OllamaClient, self.get_client_params(), http_client_param=None
+            )
+        return self._client
+
+    def get_async_client(self) -> AsyncOllamaClient:
+        if self.async_client:
+            return self.async_client
+
+        return client_registry.get_async_client(
+            "ollama", AsyncOllamaClient, self.get_client_params(), http_client_param=None
+        )
+
+    @property
+    def _request_kwargs(self) -> Dict[str, Any]:
         kwargs: Dict[str, Any] = {}
         if self.options is not None:
             kwargs["options"] = self.options
+        return kwargs
 
-        return self.client.embeddings(prompt=text, model=self.model, **kwargs)  # type: ignore
+    def _response(self, text: str) -> Dict[str, Any]:
+        return self.client.embeddings(prompt=text, model=self.model, **self._request_kwargs)  # type: ignore
 
     def get_embedding(self, text: str) -> List[float]:
         try:
@@ -60,3 +86,43 @@ class OllamaEmbedder(Embedder):
         except Exception as e:
             logger.warning(e)
         return embedding, usage
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        client = self.client
+        # Older versions of the ollama client only support embedding one prompt per request
+        if not hasattr(client, "embed"):
+            return super()._embed_batch(texts)
+
+        embeddings: List[List[float]] = []
+        usage = None
+        try:
+            response = client.embed(input=texts, model=self.model, **self._request_kwargs)  # type: ignore
+            embeddings, usage = self._parse_batch(response)
+        except Exception as e:
+            logger.warning(e)
+        if len(embeddings) != len(texts):
+            embeddings = [[] for _ in texts]
+        return embeddings, usage
+
+    @staticmethod
+    def _parse_batch(response: Optional[Dict[str, Any]]) -> Tuple[List[List[float]], Optional[Dict]]:
+        if response is None:
+            return [], None
+        usage = None
+        if response.get("prompt_eval_count") is not None:
+            usage = {"prompt_tokens": response.get("prompt_eval_count")}
+        return response.get("embeddings", []), usage
+
+    async def _aembed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        client = self.get_async_client()
+        if not hasattr(client, "embed"):
+            responses = await asyncio.gather(
+                *[client.embeddings(prompt=text, model=self.model, **self._request_kwargs) for text in texts]  # type: ignore
+            )
+            return [response.get("embedding", []) if response else [] for response in responses], None
+
+        response = await client.embed(input=texts, model=self.model, **self._request_kwargs)  # type: ignore
+        embeddings, usage = self._parse_batch(response)
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        return embeddings, usage
@@ -1,11 +1,20 @@
-from typing import Optional, Dict, List, Tuple, Any
+import httpx
+from typing import Optional, Dict, List, Tuple, Any, Union
 from typing_extensions import Literal
 
 from micro.embedder.base import Embedder
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 
 try:
-    from openai import OpenAI as OpenAIClient
+    from openai import (
+        OpenAI as OpenAIClient,
+        AsyncOpenAI as AsyncOpenAIClient,
+        APIConnectionError,
+        APITimeoutError,
+        InternalServerError,
+        RateLimitError,
+    )
     from openai.types.create_embedding_response import CreateEmbeddingResponse
 except ImportError:
     raise ImportError("`openai` not installed")
@@ -15,19 +24,22 @@ class OpenAIEmbedder(Embedder):
     model: str = "text-embedding-ada-002"
     dimensions: int = 1536
     encoding_format: Literal["float", "base64"] = "float"
+    # -*- Batch parameters, the API accepts up to 2048 inputs and 300k tokens per request
+    batch_size: int = 512
+    batch_max_tokens: Optional[int] = 250000
     user: Optional[str] = None
     api_key: Optional[str] = None
     organization: Optional[str] = None
     base_url: Optional[str] = None
     request_params: Optional[Dict[str, Any]] = None
     client_params: Optional[Dict[str, Any]] = None
+    # -*- Provide the OpenAI clients manually
     openai_client: Optional[OpenAIClient] = None
+    async_client: Optional[AsyncOpenAIClient] = None
 
-    @property
-    def client(self) -> OpenAIClient:
-        if self.openai_client:
-            return self.openai_client
+    _client: Optional[OpenAIClient] = None
 
+    def get_client_params(self) -> Dict[str, Any]:
         _client_params: Dict[str, Any] = {}
         if self.api_key:
             _client_params["api_key"] = self.api_key
@@ -37,9 +49,35 @@ class OpenAIEmbedder(Embedder):
             _client_params["base_url"] = self.base_url
         if self.client_params:
             _client_params.update(self.client_params)
-        return OpenAIClient(**_client_params)
+        return _client_params
+
+    @property
+    def client(self) -> OpenAIClient:
+        if self.openai_client:
+            return self.openai_client
 
-    def _response(self, text: str) -> CreateEmbeddingResponse:
+        # Reuse the client, and its connection pool, across requests and embedders
+        if self._client is None:
+            self._client = client_registry.get_client("openai", OpenAIClient, self.get_client_params())
+        return self._client
+
+    def get_async_client(self) -> AsyncOpenAIClient:
+        if self.async_client:
+            return self.async_client
+
+        _client_params = self.get_client_params()
+        # Retries are handled by the embedder, see `retry_attempts`
+        _client_params.setdefault("max_retries", 0)
+        return client_registry.get_async_client(
+            "openai",
+            AsyncOpenAIClient,
+            _client_params,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency * 2, max_keepalive_connections=self.max_concurrency
+            ),
+        )
+
+    def _request_params(self, text: Union[str, List[str]]) -> Dict[str, Any]:
         _request_params: Dict[str, Any] = {
             "input": text,
             "model": self.model,
@@ -51,7 +89,10 @@ class OpenAIEmbedder(Embedder):
             _request_params["dimensions"] = self.dimensions
         if self.request_params:
             _request_params.update(self.request_params)
-        return self.client.embeddings.create(**_request_params)
+        return _request_params
+
+    def _response(self, text: Union[str, List[str]]) -> CreateEmbeddingResponse:
+        return self.client.embeddings.create(**self._request_params(text))
 
     def get_embedding(self, text: str) -> List[float]:
         response: CreateEmbeddingResponse = self._response(text=text)
@@ -67,3 +108,20 @@ class OpenAIEmbedder(Embedder):
         embedding = response.data[0].embedding
         usage = response.usage
         return embedding, usage.model_dump()
+
+    @staticmethod
+    def _parse_batch(response: CreateEmbeddingResponse) -> Tuple[List[List[float]], Optional[Dict]]:
+        # The API does not guarantee the order of the embeddings, so sort by index
+        embeddings = [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+        usage = response.usage
+        return embeddings, usage.model_dump() if usage is not None else None
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        return self._parse_batch(self._response(text=texts))
+
+    async def _aembed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        response = await self.get_async_client().embeddings.create(**self._request_params(texts))
+        return self._parse_batch(response)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError))
@@ -1,10 +1,11 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from micro.embedder.base import Embedder
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 
 try:
-    from voyageai import Client
+    from voyageai import Client, AsyncClient
     from voyageai.object import EmbeddingsObject
 except ImportError:
     raise ImportError("`voyageai` not installed")
@@ -13,6 +14,9 @@ except ImportError:
 class VoyageAIEmbedder(Embedder):
     model: str = "voyage-2"
     dimensions: int = 1024
+    # -*- Batch parameters, the API accepts up to 128 inputs and 120k tokens per request
+    batch_size: int = 128
+    batch_max_tokens: Optional[int] = 120000
     request_params: Optional[Dict[str, Any]] = None
     api_key: Optional[str] = None
     base_url: str = "https://api.voyageai.com/v1/embeddings"
@@ -20,12 +24,11 @@ class VoyageAIEmbedder(Embedder):
     timeout: Optional[float] = None
     client_params: Optional[Dict[str, Any]] = None
     voyage_client: Optional[Client] = None
+    async_client: Optional[AsyncClient] = None
 
-    @property
-    def client(self) -> Client:
-        if self.voyage_client:
-            return self.voyage_client
+    _client: Optional[Client] = None
 
+    def get_client_params(self) -> Dict[str, Any]:
         _client_params: Dict[str, Any] = {}
         if self.api_key:
             _client_params["api_key"] = self.api_key
@@ -35,16 +38,38 @@ class VoyageAIEmbedder(Embedder):
             _client_params["timeout"] = self.timeout
         if self.client_params:
             _client_params.update(self.client_params)
-        return Client(**_client_params)
+        return _client_params
+
+    @property
+    def client(self) -> Client:
+        if self.voyage_client:
+            return self.voyage_client
+
+        if self._client is None:
+            self._client = client_registry.get_client(
+                "voyageai", Client, self.get_client_params(), http_client_param=None
+            )
+        return self._client
 
-    def _response(self, text: str) -> EmbeddingsObject:
+    def get_async_client(self) -> AsyncClient:
+        if self.async_client:
+            return self.async_client
+
+        return client_registry.get_async_client(
+            "voyageai", AsyncClient, self.get_client_params(), http_client_param=None
+        )
+
+    def _request_params(self, text: Union[str, List[str]]) -> Dict[str, Any]:
         _request_params: Dict[str, Any] = {
-            "texts": [text],
+            "texts": [text] if isinstance(text, str) else text,
             "model": self.model,
         }
         if self.request_params:
             _request_params.update(self.request_params)
-        return self.client.embed(**_request_params)
+        return _request_params
+
+    def _response(self, text: Union[str, List[str]]) -> EmbeddingsObject:
+        return self.client.embed(**self._request_params(text))
 
     def get_embedding(self, text: str) -> List[float]:
         response: EmbeddingsObject = self._response(text=text)
@@ -60,3 +85,15 @@ class VoyageAIEmbedder(Embedder):
         embedding = response.embeddings[0]
         usage = {"total_tokens": response.total_tokens}
         return embedding, usage
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        response: EmbeddingsObject = self._response(text=texts)
+
+        usage = {"total_tokens": response.total_tokens}
+        return response.embeddings, usage
+
+    async def _aembed_batch(self, texts: List[str]) -> Tuple[List[List[float]], Optional[Dict]]:
+        response: EmbeddingsObject = await self.get_async_client().embed(**self._request_params(texts))
+
+        usage = {"total_tokens": response.total_tokens}
+        return response.embeddings, usage
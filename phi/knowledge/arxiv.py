@@ -1,6 +1,7 @@
-from typing import Iterator, List
+from typing import Iterator, List, Any, Optional
 
 from micro.document import Document
+from micro.document.reader.base import Reader
 from micro.document.reader.arxiv import ArxivReader
 from micro.knowledge.base import AssistantKnowledge
 
@@ -18,5 +19,12 @@ class ArxivKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
-        for _query in self.queries:
-            yield self.reader.read(query=_query)
+        for _query in self.get_sources():
+            yield self.read_source(_query)
+
+    def get_sources(self) -> Iterator[str]:
+        yield from self.queries
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, ArxivReader) else self.reader
+        return _reader.read(query=source)
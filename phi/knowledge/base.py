@@ -1,9 +1,12 @@
+from pathlib import Path
 from typing import List, Optional, Iterator, Dict, Any
 
 from pydantic import BaseModel, ConfigDict
 
 from micro.document import Document
 from micro.document.reader.base import Reader
+from micro.knowledge.manifest import SourceManifest, SourceRecord
+from micro.knowledge.pipeline import IngestionPipeline
 from micro.vectordb import VectorDb
 from micro.utils.log import logger
 
@@ -19,6 +22,14 @@ class AssistantKnowledge(BaseModel):
     num_documents: int = 2
     # Number of documents to optimize the vector db on
     optimize_on: Optional[int] = 1000
+    # Pipeline to load the knowledge base with concurrent read, chunk, embed and write stages
+    pipeline: Optional[IngestionPipeline] = None
+    # Manifest of loaded sources, used to only load sources which changed since the last load
+    manifest: Optional[SourceManifest] = None
+    # Semantic cache of search results (micro.knowledge.cache.SemanticCache), cleared when the knowledge base changes
+    semantic_cache: Optional[Any] = None
+    # Fetch the embedding and usage of search results, which are not needed to answer questions
+    include_embeddings: bool = False
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -29,7 +40,40 @@ class AssistantKnowledge(BaseModel):
         """
         raise NotImplementedError
 
-    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
+    def get_sources(self) -> Iterator[Any]:
+        """Iterator that yields the sources (files, urls, objects) in the knowledge base.
+        Each source is read into a list of documents using `read_source`.
+        """
+        raise NotImplementedError
+
+    def get_source_reader(self, source: Any) -> Optional[Reader]:
+        """Returns the reader used to read a source"""
+        return self.reader
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        """Read a source into a list of documents
+
+        Args:
+            source (Any): Source yielded by `get_sources`
+            reader (Optional[Reader]): Reader to use instead of the knowledge base reader
+        """
+        raise NotImplementedError
+
+    def get_source_key(self, source: Any) -> Optional[str]:
+        """Returns the key identifying a source in the manifest, or None if the source cannot be tracked"""
+        if isinstance(source, Path):
+            return str(source.resolve())
+        if isinstance(source, str):
+            return source
+        return getattr(source, "uri", None)
+
+    def get_source_path(self, source: Any) -> Optional[Path]:
+        """Returns the local path of a source, used to detect unchanged files without reading them"""
+        return source if isinstance(source, Path) else None
+
+    def search(
+        self, query: str, num_documents: Optional[int] = None, include_embeddings: Optional[bool] = None
+    ) -> List[Document]:
         """Returns relevant documents matching the query"""
         try:
             if self.vector_db is None:
@@ -37,12 +81,131 @@ class AssistantKnowledge(BaseModel):
                 return []
 
             _num_documents = num_documents or self.num_documents
+            _include_embeddings = include_embeddings if include_embeddings is not None else self.include_embeddings
             logger.debug(f"Getting {_num_documents} relevant documents for query: {query}")
-            return self.vector_db.search(query=query, limit=_num_documents)
+            # Cached documents do not have embeddings
+            if self.semantic_cache is not None and not _include_embeddings:
+                return self.search_with_cache(query=query, num_documents=_num_documents)
+            return self.vector_db.search(query=query, limit=_num_documents, include_embeddings=_include_embeddings)
         except Exception as e:
             logger.error(f"Error searching for documents: {e}")
             return []
 
+    def trim_documents(self, documents: List[Document], max_tokens: int) -> List[Document]:
+        """Returns the documents, in order, which fit in `max_tokens`. Documents are measured by the "chunk_tokens"
+        counted by the reader when chunking them, or estimated from their length if the reader did not count them.
+        """
+        trimmed_documents: List[Document] = []
+        num_tokens = 0
+        for document in documents:
+            document_tokens = document.meta_data.get("chunk_tokens")
+            if not isinstance(document_tokens, int):
+                document_tokens = len(document.content) // 4 + 1
+            if num_tokens + document_tokens > max_tokens:
+                continue
+            trimmed_documents.append(document)
+            num_tokens += document_tokens
+        return trimmed_documents
+
+    def search_batch(
+        self,
+        queries: List[str],
+        num_documents: Optional[int] = None,
+        include_embeddings: Optional[bool] = None,
+    ) -> List[List[Document]]:
+        """Returns relevant documents for each query, in the same order as `queries`.
+        The queries are embedded in a single batched request and searched using the vector db batch search.
+        """
+        try:
+            if self.vector_db is None:
+                logger.warning("No vector db provided")
+                return [[] for _ in queries]
+
+            _num_documents = num_documents or self.num_documents
+            _include_embeddings = include_embeddings if include_embeddings is not None else self.include_embeddings
+            logger.debug(f"Getting {_num_documents} relevant documents for {len(queries)} queries")
+            if self.semantic_cache is None or _include_embeddings:
+                return self.vector_db.search_batch(
+                    queries=queries, limit=_num_documents, include_embeddings=_include_embeddings
+                )
+            return self.search_batch_with_cache(queries=queries, num_documents=_num_documents)
+        except Exception as e:
+            logger.error(f"Error searching for documents: {e}")
+            return [[] for _ in queries]
+
+    def search_batch_with_cache(self, queries: List[str], num_documents: int) -> List[List[Document]]:
+        """Returns relevant documents for each query from the semantic cache, searching the vector db for the misses"""
+        assert self.vector_db is not None and self.semantic_cache is not None
+        results: List[Optional[List[Document]]] = [
+            self.semantic_cache.get_by_query(query, num_documents) for query in queries
+        ]
+
+        # Embed the queries which are not cached by text and have no memoized embedding, in a single request
+        query_embeddings: Dict[int, List[float]] = {}
+        for i, query in enumerate(queries):
+            if results[i] is None:
+                query_embedding = self.semantic_cache.get_query_embedding(query)
+                if query_embedding is not None:
+                    query_embeddings[i] = query_embedding
+        to_embed = [i for i, result in enumerate(results) if result is None and i not in query_embeddings]
+        if len(to_embed) > 0:
+            embeddings = self.vector_db.get_query_embeddings([queries[i] for i in to_embed])
+            query_embeddings.update(zip(to_embed, embeddings))
+
+        misses: List[int] = []
+        for i, query_embedding in query_embeddings.items():
+            results[i] = self.semantic_cache.get(queries[i], query_embedding, num_documents)
+            if results[i] is None:
+                misses.append(i)
+
+        if len(misses) > 0:
+            miss_results = self.vector_db.search_batch(
+                queries=[queries[i] for i in misses],
+                limit=num_documents,
+                query_embeddings=[query_embeddings[i] for i in misses],
+                include_embeddings=False,
+            )
+            for i, documents in zip(misses, miss_results):
+                results[i] = documents
+                # Empty results may come from a failed search
+                if len(documents) > 0:
+                    self.semantic_cache.set(queries[i], query_embeddings[i], documents)
+        return [result or [] for result in results]
+
+    def search_with_cache(self, query: str, num_documents: int) -> List[Document]:
+        """Returns relevant documents from the semantic cache, searching the vector db on a miss"""
+        assert self.vector_db is not None and self.semantic_cache is not None
+        documents = self.semantic_cache.get_by_query(query, num_documents)
+        if documents is not None:
+            return documents
+
+        embedder = getattr(self.vector_db, "embedder", None)
+        if embedder is None:
+            return self.vector_db.search(query=query, limit=num_documents, include_embeddings=False)
+        query_embedding = self.semantic_cache.get_query_embedding(query)
+        if query_embedding is None:
+            query_embedding = embedder.get_embedding(query)
+            if query_embedding is None or len(query_embedding) == 0:
+                logger.error(f"Error getting embedding for Query: {query}")
+                return []
+
+        documents = self.semantic_cache.get(query, query_embedding, num_documents)
+        if documents is not None:
+            return documents
+
+        documents = self.vector_db.search(
+            query=query, limit=num_documents, query_embedding=query_embedding, include_embeddings=False
+        )
+        # Empty results may come from a failed search
+        if len(documents) > 0:
+            self.semantic_cache.set(query, query_embedding, documents)
+        return documents
+
+    def clear_cache(self) -> None:
+        """Clears the semantic cache, as the cached search results may be stale"""
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+
     def load(self, recreate: bool = False, upsert: bool = False, skip_existing: bool = True) -> None:
         """Load the knowledge base to the vector db
 
@@ -56,34 +219,182 @@ class AssistantKnowledge(BaseModel):
             logger.warning("No vector db provided")
             return
 
+        if self.manifest is not None:
+            self.manifest.read()
+
         if recreate:
             logger.info("Deleting collection")
             self.vector_db.delete()
+            if self.manifest is not None:
+                self.manifest.clear()
 
         logger.info("Creating collection")
         self.vector_db.create()
 
         logger.info("Loading knowledge base")
         num_documents = 0
-        for document_list in self.document_lists:
-            documents_to_load = document_list
-            # Upsert documents if upsert is True and vector db supports upsert
-            if upsert and self.vector_db.upsert_available():
-                self.vector_db.upsert(documents=documents_to_load)
-            # Insert documents
-            else:
-                # Filter out documents which already exist in the vector db
-                if skip_existing:
-                    documents_to_load = [
-                        document for document in document_list if not self.vector_db.doc_exists(document)
-                    ]
-                self.vector_db.insert(documents=documents_to_load)
-            num_documents += len(documents_to_load)
-            logger.info(f"Added {len(documents_to_load)} documents to knowledge base")
+        if self.manifest is not None and self.sources_available():
+            num_documents = self.load_changed_sources(upsert=upsert, skip_existing=skip_existing)
+        elif self.pipeline is not None:
+            num_documents = self.pipeline.run(knowledge=self, upsert=upsert, skip_existing=skip_existing).num_documents
+        else:
+            for document_list in self.document_lists:
+                num_documents += self.load_document_list(document_list, upsert=upsert, skip_existing=skip_existing)
 
         if self.optimize_on is not None and num_documents > self.optimize_on:
             logger.info("Optimizing Vector DB")
             self.vector_db.optimize()
+        self.clear_cache()
+
+    def load_document_list(
+        self, document_list: List[Document], upsert: bool = False, skip_existing: bool = True
+    ) -> int:
+        """Load a list of documents read from the knowledge base to the vector db
+
+        Returns:
+            int: Number of documents loaded
+        """
+        if self.vector_db is None:
+            return 0
+
+        documents_to_load = document_list
+        # Upsert documents if upsert is True and vector db supports upsert
+        if upsert and self.vector_db.upsert_available():
+            self.vector_db.upsert(documents=documents_to_load)
+        # Insert documents
+        else:
+            # Filter out documents which already exist in the vector db
+            if skip_existing:
+                documents_to_load = self.vector_db.filter_new(document_list)
+            self.vector_db.insert(documents=documents_to_load)
+        logger.info(f"Added {len(documents_to_load)} documents to knowledge base")
+        return len(documents_to_load)
+
+    def sources_available(self) -> bool:
+        """Returns True if the knowledge base implements `get_sources`"""
+        try:
+            self.get_sources()
+            return True
+        except NotImplementedError:
+            return False
+
+    def load_changed_sources(self, upsert: bool = False, skip_existing: bool = True) -> int:
+        """Load the sources which are new or changed since the last load, as recorded in the manifest.
+        Local files with the same size and modification time are skipped without being read,
+        and the documents of changed or removed sources are deleted from the vector db.
+
+        Returns:
+            int: Number of documents loaded
+        """
+        if self.vector_db is None or self.manifest is None:
+            return 0
+
+        sources_to_load: List[Any] = []
+        source_keys = set()
+        for source in self.get_sources():
+            key = self.get_source_key(source)
+            if key is not None:
+                source_keys.add(key)
+                path = self.get_source_path(source)
+                if path is not None and self.manifest.is_file_unchanged(key, path):
+                    logger.debug(f"Skipping unchanged source: {key}")
+                    continue
+            sources_to_load.append(source)
+
+        # Delete the documents of sources which were removed
+        for key in [key for key in self.manifest.sources if key not in source_keys]:
+            record = self.manifest.remove(key)
+            if record is not None:
+                logger.info(f"Deleting documents of removed source: {key}")
+                self.delete_document_ids(self.manifest.get_unreferenced(record.chunk_ids))
+
+        logger.info(f"Loading {len(sources_to_load)} new or changed sources")
+        num_documents = 0
+        # Sources are recorded in the manifest once all their documents are loaded,
+        # so sources which failed to load are loaded again next time
+        try:
+            if self.pipeline is not None:
+                num_documents = self.pipeline.run(
+                    knowledge=self,
+                    upsert=upsert,
+                    skip_existing=skip_existing,
+                    sources=sources_to_load,
+                    on_source=self.update_source,
+                    on_loaded=self.mark_loaded,
+                ).num_documents
+            else:
+                for source in sources_to_load:
+                    document_list = self.update_source(source, self.read_source(source))
+                    if len(document_list) > 0:
+                        num_documents += self.load_document_list(
+                            document_list, upsert=upsert, skip_existing=skip_existing
+                        )
+                        self.mark_loaded(document_list)
+        finally:
+            self.manifest.write()
+        return num_documents
+
+    def update_source(self, source: Any, documents: List[Document]) -> List[Document]:
+        """Track a source read from the knowledge base until its documents are loaded, see `mark_loaded`.
+
+        Returns:
+            List[Document]: Documents to load, empty if the source is unchanged
+        """
+        if self.vector_db is None or self.manifest is None:
+            return documents
+
+        key = self.get_source_key(source)
+        if key is None:
+            return documents
+
+        size, mtime = None, None
+        path = self.get_source_path(source)
+        if path is not None:
+            stat = path.stat()
+            size, mtime = stat.st_size, stat.st_mtime
+            content_hash = self.manifest.file_hash(path)
+        else:
+            content_hash = self.manifest.documents_hash(documents)
+            record = self.manifest.sources.get(key)
+            if record is not None and record.content_hash == content_hash:
+                logger.debug(f"Skipping unchanged source: {key}")
+                return []
+
+        record = SourceRecord(
+            key=key,
+            size=size,
+            mtime=mtime,
+            content_hash=content_hash,
+            chunk_ids=[self.vector_db.get_document_id(document) for document in documents],
+        )
+        if self.manifest.add_pending(record):
+            self.record_source(record)
+        return documents
+
+    def mark_loaded(self, documents: List[Document]) -> None:
+        """Record the sources whose documents are all loaded to the vector db, either written or already existing"""
+        if self.vector_db is None or self.manifest is None:
+            return
+        for record in self.manifest.mark_loaded(self.vector_db.get_document_id(document) for document in documents):
+            self.record_source(record)
+
+    def record_source(self, record: SourceRecord) -> None:
+        """Record a loaded source in the manifest and delete the documents it was previously loaded as"""
+        if self.manifest is None:
+            return
+        previous_ids = set(self.manifest.get_chunk_ids(record.key)) - set(record.chunk_ids)
+        self.manifest.add(record)
+        self.delete_document_ids(self.manifest.get_unreferenced(previous_ids))
+
+    def delete_document_ids(self, ids: List[str]) -> None:
+        """Delete documents from the vector db by id"""
+        if self.vector_db is None or len(ids) == 0:
+            return
+        try:
+            self.vector_db.delete_by_ids(ids)
+            self.clear_cache()
+        except NotImplementedError:
+            logger.warning(f"{self.vector_db.__class__.__name__} does not support deleting documents by id")
 
     def load_documents(self, documents: List[Document], upsert: bool = False, skip_existing: bool = True) -> None:
         """Load documents to the knowledge base
@@ -105,19 +416,17 @@ class AssistantKnowledge(BaseModel):
         # Upsert documents if upsert is True
         if upsert and self.vector_db.upsert_available():
             self.vector_db.upsert(documents=documents)
+            self.clear_cache()
             logger.info(f"Loaded {len(documents)} documents to knowledge base")
             return
 
         # Filter out documents which already exist in the vector db
-        documents_to_load = (
-            [document for document in documents if not self.vector_db.doc_exists(document)]
-            if skip_existing
-            else documents
-        )
+        documents_to_load = self.vector_db.filter_new(documents) if skip_existing else documents
 
         # Insert documents
         if len(documents_to_load) > 0:
             self.vector_db.insert(documents=documents_to_load)
+            self.clear_cache()
             logger.info(f"Loaded {len(documents_to_load)} documents to knowledge base")
         else:
             logger.info("No new documents to load")
@@ -175,4 +484,5 @@ class AssistantKnowledge(BaseModel):
             logger.warning("No vector db available")
             return True
 
+        self.clear_cache()
         return self.vector_db.clear()
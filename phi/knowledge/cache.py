@@ -0,0 +1,175 @@
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Optional, List, Dict
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+from micro.document import Document
+from micro.utils.log import logger
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600,
+        max_query_embeddings: int = 4096,
+    ):
+        """
+        Cache of knowledge base search results, keyed on the query embedding.
+
+        A query with the same text as a cached query is answered without embedding it. Otherwise the query
+        is embedded and answered from the most similar cached query, if their cosine similarity is at least
+        `threshold`. Cached results are shared by searches for up to the same number of documents.
+
+        Args:
+            threshold (float): Minimum cosine similarity between a query and a cached query to reuse its results.
+            max_entries (int): Maximum number of cached searches, the least recently used are evicted.
+            ttl (Optional[float]): Number of seconds search results are cached for. Cached until evicted if None.
+            max_query_embeddings (int): Maximum number of query embeddings kept by query text.
+        """
+        self.threshold: float = threshold
+        self.max_entries: int = max_entries
+        self.ttl: Optional[float] = ttl
+        self.max_query_embeddings: int = max_query_embeddings
+
+        # -*- Cache statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        # Hits answered from a different query text
+        self.semantic_hits: int = 0
+
+        self._lock = Lock()
+        # Normalized query embeddings, one row per slot
+        self._embeddings: Optional[np.ndarray] = None
+        self._expires_at = np.full(max_entries, -np.inf)
+        self._last_used = np.zeros(max_entries)
+        self._num_documents = np.zeros(max_entries, dtype=np.int64)
+        self._documents: List[Optional[List[Document]]] = [None] * max_entries
+        self._queries: List[Optional[str]] = [None] * max_entries
+        self._slots: Dict[str, int] = {}
+        # Embeddings of recent query texts, so repeated queries are not embedded again
+        self._query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    @staticmethod
+    def _copy(documents: List[Document], limit: int) -> List[Document]:
+        # Copies so callers can not modify the cached documents
+        return [document.model_copy() for document in documents[:limit]]
+
+    def get_query_embedding(self, query: str) -> Optional[List[float]]:
+        """Returns the embedding of a recent query with the same text"""
+        with self._lock:
+            embedding = self._query_embeddings.get(query)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(query)
+            return embedding
+
+    def _add_query_embedding(self, query: str, embedding: List[float]) -> None:
+        self._query_embeddings[query] = embedding
+        self._query_embeddings.move_to_end(query)
+        while len(self._query_embeddings) > self.max_query_embeddings:
+            self._query_embeddings.popitem(last=False)
+
+    def _live(self, slot: int, now: float, limit: int) -> bool:
+        documents = self._documents[slot]
+        return documents is not None and self._expires_at[slot] > now and len(documents) >= limit
+
+    def get_by_query(self, query: str, limit: int) -> Optional[List[Document]]:
+        """Returns the cached results of a query with the same text, without counting a miss"""
+        with self._lock:
+            slot = self._slots.get(query)
+            if slot is None or not self._live(slot, time(), limit):
+                return None
+            self._last_used[slot] = time()
+            self.hits += 1
+            return self._copy(self._documents[slot], limit)  # type: ignore
+
+    def get(self, query: str, embedding: List[float], limit: int) -> Optional[List[Document]]:
+        """Returns the cached results of the most similar query, or None if no cached query is similar enough
+
+        Args:
+            query (str): The query text
+            embedding (List[float]): The query embedding
+            limit (int): Number of documents to return
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._add_query_embedding(query, embedding)
+            now = time()
+            if self._embeddings is None or len(self._slots) == 0 or self._embeddings.shape[1] != len(vector):
+                self.misses += 1
+                return None
+
+            scores = self._embeddings @ vector
+            # Ignore expired and free slots, and results with fewer documents than requested
+            scores[(self._expires_at <= now) | (self._num_documents < limit)] = -np.inf
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                self.misses += 1
+                return None
+
+            logger.debug(f"Semantic cache hit: '{query}' matched '{self._queries[slot]}' ({scores[slot]:.4f})")
+            self._last_used[slot] = now
+            self.hits += 1
+            self.semantic_hits += 1
+            return self._copy(self._documents[slot], limit)  # type: ignore
+
+    def set(self, query: str, embedding: List[float], documents: List[Document]) -> None:
+        """Caches the results of a search"""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._embeddings is None or self._embeddings.shape[1] != len(vector):
+                # First search, or the embedder changed
+                self._clear()
+                self._embeddings = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+            slot = self._slots.get(query)
+            if slot is None:
+                # Reuse a free or expired slot, otherwise evict the least recently used
+                now = time()
+                free = np.nonzero(self._expires_at <= now)[0]
+                slot = int(free[0]) if len(free) > 0 else int(np.argmin(self._last_used))
+                previous = self._queries[slot]
+                if previous is not None:
+                    self._slots.pop(previous, None)
+
+            now = time()
+            self._embeddings[slot] = vector
+            self._expires_at[slot] = now + self.ttl if self.ttl is not None else np.inf
+            self._last_used[slot] = now
+            self._documents[slot] = self._copy(documents, len(documents))
+            self._num_documents[slot] = len(documents)
+            self._queries[slot] = query
+            self._slots[query] = slot
+
+    def _clear(self) -> None:
+        self._expires_at[:] = -np.inf
+        self._last_used[:] = 0
+        self._num_documents[:] = 0
+        self._documents = [None] * self.max_entries
+        self._queries = [None] * self.max_entries
+        self._slots = {}
+
+    def clear(self) -> None:
+        """Removes all cached results, called when the knowledge base changes. Query embeddings are kept."""
+        with self._lock:
+            self._clear()
@@ -1,6 +1,8 @@
-from typing import List, Iterator
+from pathlib import Path
+from typing import List, Iterator, Any, Optional, Tuple
 
 from micro.document import Document
+from micro.document.reader.base import Reader
 from micro.knowledge.base import AssistantKnowledge
 from micro.utils.log import logger
 
@@ -20,3 +22,36 @@ class CombinedKnowledgeBase(AssistantKnowledge):
         for kb in self.sources:
             logger.debug(f"Loading documents from {kb.__class__.__name__}")
             yield from kb.document_lists
+
+    def get_sources(self) -> Iterator[Tuple[AssistantKnowledge, Any, bool]]:
+        """Iterate over the sources of all knowledge bases as (knowledge base, source, is source) tuples.
+        Knowledge bases which do not implement `get_sources` yield their document lists instead.
+        """
+
+        for kb in self.sources:
+            try:
+                kb_sources = kb.get_sources()
+            except NotImplementedError:
+                for document_list in kb.document_lists:
+                    yield kb, document_list, False
+                continue
+            for source in kb_sources:
+                yield kb, source, True
+
+    def get_source_reader(self, source: Any) -> Optional[Reader]:
+        kb, kb_source, is_source = source
+        return kb.get_source_reader(kb_source) if is_source else None
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        kb, kb_source, is_source = source
+        if not is_source:
+            return kb_source
+        return kb.read_source(kb_source, reader=reader)
+
+    def get_source_key(self, source: Any) -> Optional[str]:
+        kb, kb_source, is_source = source
+        return kb.get_source_key(kb_source) if is_source else None
+
+    def get_source_path(self, source: Any) -> Optional[Path]:
+        kb, kb_source, is_source = source
+        return kb.get_source_path(kb_source) if is_source else None
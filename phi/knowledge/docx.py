@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Any, Optional
 
 from micro.document import Document
+from micro.document.reader.base import Reader
 from micro.document.reader.docx import DocxReader
 from micro.knowledge.base import AssistantKnowledge
 
@@ -20,11 +21,21 @@ class DocxKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        for _file in self.get_sources():
+            yield self.read_source(_file)
+
+    def get_sources(self) -> Iterator[Path]:
+        """Iterate over the files in the knowledge base path with a supported format"""
+
         _file_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _file_path.exists() and _file_path.is_dir():
             for _file in _file_path.glob("**/*"):
                 if _file.suffix in self.formats:
-                    yield self.reader.read(path=_file)
+                    yield _file
         elif _file_path.exists() and _file_path.is_file() and _file_path.suffix in self.formats:
-            yield self.reader.read(path=_file_path)
+            yield _file_path
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, DocxReader) else self.reader
+        return _reader.read(path=source)
@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Any, Optional
 
 from micro.document import Document
+from micro.document.reader.base import Reader
 from micro.document.reader.json import JSONReader
 from micro.knowledge.base import AssistantKnowledge
 
@@ -19,10 +20,19 @@ class JSONKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        for _json in self.get_sources():
+            yield self.read_source(_json)
+
+    def get_sources(self) -> Iterator[Path]:
+        """Iterate over the Json files in the knowledge base path"""
+
         _json_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _json_path.exists() and _json_path.is_dir():
-            for _pdf in _json_path.glob("*.json"):
-                yield self.reader.read(path=_pdf)
+            yield from _json_path.glob("*.json")
         elif _json_path.exists() and _json_path.is_file() and _json_path.suffix == ".json":
-            yield self.reader.read(path=_json_path)
+            yield _json_path
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, JSONReader) else self.reader
+        return _reader.read(path=source)
@@ -0,0 +1,161 @@
+from hashlib import md5
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from micro.document import Document
+from micro.utils.log import logger
+
+
+class SourceRecord(BaseModel):
+    """Record of a source loaded to the vector db"""
+
+    # Key identifying the source, e.g. the absolute path or url
+    key: str
+    # Size and modification time, only available for local files
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+    # Hash of the file contents for local files, or of the documents read from the source otherwise
+    content_hash: Optional[str] = None
+    # Ids of the documents the source was loaded as
+    chunk_ids: List[str] = []
+
+
+class SourceManifest(BaseModel):
+    """Manifest of the sources loaded to a knowledge base, persisted as json.
+
+    Used by `AssistantKnowledge.load` to skip sources which did not change since the last load,
+    and to delete the documents of sources which changed or were removed.
+    """
+
+    # Path to the manifest file
+    path: Union[str, Path]
+    sources: Dict[str, SourceRecord] = {}
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+    # Records of sources being loaded, with the ids of their documents which are not loaded yet
+    _pending: Dict[str, Tuple[SourceRecord, Set[str]]] = PrivateAttr(default_factory=dict)
+
+    @property
+    def manifest_path(self) -> Path:
+        return Path(self.path) if isinstance(self.path, str) else self.path
+
+    def read(self) -> None:
+        """Read the manifest file, if it exists"""
+        if not self.manifest_path.exists():
+            self.sources = {}
+            return
+        try:
+            manifest = SourceManifest.model_validate_json(self.manifest_path.read_text())
+            self.sources = manifest.sources
+        except Exception as e:
+            logger.warning(f"Could not read manifest {self.manifest_path}, all sources will be loaded: {e}")
+            self.sources = {}
+
+    def write(self) -> None:
+        """Write the manifest file"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            _manifest = self.model_dump_json(indent=2)
+        # Write to a temporary file first so an interrupted write does not corrupt the manifest
+        _tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+        _tmp_path.write_text(_manifest)
+        _tmp_path.replace(self.manifest_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.sources = {}
+            self._pending = {}
+
+    @staticmethod
+    def file_hash(path: Path) -> str:
+        _hash = md5()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                _hash.update(block)
+        return _hash.hexdigest()
+
+    @staticmethod
+    def documents_hash(documents: List[Document]) -> str:
+        _hash = md5()
+        for document in documents:
+            _hash.update(document.content.encode())
+            _hash.update(b"\x00")
+        return _hash.hexdigest()
+
+    def is_file_unchanged(self, key: str, path: Path) -> bool:
+        """Returns True if the file at path is unchanged since it was recorded.
+        The file is only opened if its size or modification time changed.
+        """
+        record = self.sources.get(key)
+        if record is None:
+            return False
+
+        stat = path.stat()
+        if record.size == stat.st_size and record.mtime == stat.st_mtime:
+            return True
+
+        # The file was touched or rewritten, compare the contents
+        content_hash = self.file_hash(path)
+        if record.content_hash == content_hash:
+            with self._lock:
+                record.size = stat.st_size
+                record.mtime = stat.st_mtime
+            return True
+        return False
+
+    def get_chunk_ids(self, key: str) -> List[str]:
+        record = self.sources.get(key)
+        return list(record.chunk_ids) if record is not None else []
+
+    def add(self, record: SourceRecord) -> None:
+        with self._lock:
+            self.sources[record.key] = record
+
+    def remove(self, key: str) -> Optional[SourceRecord]:
+        with self._lock:
+            return self.sources.pop(key, None)
+
+    def add_pending(self, record: SourceRecord) -> bool:
+        """Track a record until all its documents are loaded, see `mark_loaded`.
+
+        Returns:
+            bool: True if the record has no documents to wait for
+        """
+        if len(record.chunk_ids) == 0:
+            return True
+        with self._lock:
+            self._pending[record.key] = (record, set(record.chunk_ids))
+        return False
+
+    def mark_loaded(self, ids: Iterable[str]) -> List[SourceRecord]:
+        """Mark documents as loaded to the vector db
+
+        Returns:
+            List[SourceRecord]: Pending records whose documents are now all loaded
+        """
+        loaded = set(ids)
+        completed: List[SourceRecord] = []
+        with self._lock:
+            for key, (record, remaining) in list(self._pending.items()):
+                remaining -= loaded
+                if len(remaining) == 0:
+                    del self._pending[key]
+                    completed.append(record)
+        return completed
+
+    def get_unreferenced(self, ids: Iterable[str]) -> List[str]:
+        """Returns the ids which are not listed by any recorded or pending source.
+        Sources share documents with the same content, which must not be deleted with either source.
+        """
+        with self._lock:
+            referenced: Set[str] = set()
+            for record in self.sources.values():
+                referenced.update(record.chunk_ids)
+            for record, _ in self._pending.values():
+                referenced.update(record.chunk_ids)
+        return [_id for _id in dict.fromkeys(ids) if _id not in referenced]
@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Any, Optional
 
 from micro.document import Document
+from micro.document.reader.base import Reader
 from micro.document.reader.pdf import PDFReader, PDFUrlReader, PDFImageReader, PDFUrlImageReader
 from micro.knowledge.base import AssistantKnowledge
 
@@ -19,13 +20,26 @@ class PDFKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        if isinstance(self.reader, PDFReader):
+            # Extracts the pages of several PDFs at the same time if the reader uses a process pool
+            yield from self.reader.read_many(self.get_sources())
+        else:
+            for _pdf in self.get_sources():
+                yield self.read_source(_pdf)
+
+    def get_sources(self) -> Iterator[Path]:
+        """Iterate over the PDF files in the knowledge base path"""
+
         _pdf_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _pdf_path.exists() and _pdf_path.is_dir():
-            for _pdf in _pdf_path.glob("**/*.pdf"):
-                yield self.reader.read(pdf=_pdf)
+            yield from _pdf_path.glob("**/*.pdf")
         elif _pdf_path.exists() and _pdf_path.is_file() and _pdf_path.suffix == ".pdf":
-            yield self.reader.read(pdf=_pdf_path)
+            yield _pdf_path
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, (PDFReader, PDFImageReader)) else self.reader
+        return _reader.read(pdf=source)
 
 
 class PDFUrlKnowledgeBase(AssistantKnowledge):
@@ -41,5 +55,12 @@ class PDFUrlKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
-        for url in self.urls:
-            yield self.reader.read(url=url)
+        # Downloads several PDFs at the same time
+        yield from self.reader.read_many(self.get_sources())
+
+    def get_sources(self) -> Iterator[str]:
+        yield from self.urls
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, (PDFUrlReader, PDFUrlImageReader)) else self.reader
+        return _reader.read(url=source)
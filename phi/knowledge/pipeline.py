@@ -0,0 +1,384 @@
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from micro.document import Document
+from micro.document.reader.base import Reader
+from micro.utils.log import logger
+
+if TYPE_CHECKING:
+    from micro.knowledge.base import AssistantKnowledge
+
+# Marks the end of the input to a stage
+_DONE = object()
+
+
+def _num_documents(item: Any) -> int:
+    # Stages pass either lists of documents or (source, reader, list of documents) tuples
+    if isinstance(item, tuple):
+        item = item[-1]
+    return len(item) if isinstance(item, list) else 1
+
+
+class StageStats(BaseModel):
+    """Statistics for a stage of the ingestion pipeline"""
+
+    name: str
+    workers: int
+    # Number of items taken from the input queue
+    items: int = 0
+    # Number of documents produced by the stage
+    documents: int = 0
+    # Time spent by all workers processing items, in seconds
+    busy_time: float = 0
+    # Wall-clock time since the pipeline started, in seconds
+    elapsed: float = 0
+    # Current and maximum number of items waiting in the input queue
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Documents produced per second of wall-clock time"""
+        return self.documents / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the time the workers of this stage were busy"""
+        return self.busy_time / (self.elapsed * self.workers) if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.documents} documents, {self.throughput:.1f} docs/s, "
+            f"utilization {self.utilization:.0%}, queue {self.queue_depth} (max {self.max_queue_depth})"
+        )
+
+
+class IngestionStats(BaseModel):
+    """Statistics for a run of the ingestion pipeline"""
+
+    stages: List[StageStats] = []
+    # Number of documents written to the vector db
+    num_documents: int = 0
+    elapsed: float = 0
+
+
+class _Stage:
+    """A pool of worker threads that take items from an input queue and put results on an output queue"""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Iterable[Any]],
+        workers: int,
+        input_queue: "Queue[Any]",
+        output_queue: Optional["Queue[Any]"],
+        stop: Event,
+        batch_size: Optional[int] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(workers, 1)
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop = stop
+        # If set, workers merge document lists from the input queue into batches of up to this many documents
+        self.batch_size = batch_size
+        self.stats = StageStats(name=name, workers=self.workers)
+        self.error: Optional[BaseException] = None
+        self._lock = Lock()
+        self._threads = [Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(self.workers)]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the workers to finish, returns True if all workers finished"""
+        for thread in self._threads:
+            thread.join(timeout)
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def put(self, item: Any, queue: "Queue[Any]") -> bool:
+        while not self.stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _get(self) -> Any:
+        while not self.stop.is_set():
+            try:
+                return self.input_queue.get(timeout=0.1)
+            except Empty:
+                continue
+        return _DONE
+
+    def _get_batch(self) -> Tuple[Any, bool]:
+        """Returns the next item, merged with queued document lists up to `batch_size`, and whether input is done"""
+        item = self._get()
+        if item is _DONE or self.batch_size is None:
+            return item, item is _DONE
+
+        batch: List[Document] = list(item)
+        while len(batch) < self.batch_size:
+            try:
+                next_item = self.input_queue.get_nowait()
+            except Empty:
+                break
+            if next_item is _DONE:
+                return batch, True
+            batch.extend(next_item)
+        return batch, False
+
+    def _work(self) -> None:
+        done = False
+        while not done and not self.stop.is_set():
+            item, done = self._get_batch()
+            if item is _DONE:
+                break
+            try:
+                start = perf_counter()
+                outputs = list(self.fn(item))
+                busy = perf_counter() - start
+            except BaseException as e:
+                logger.error(f"Error in {self.name} stage: {e}")
+                self.error = e
+                self.stop.set()
+                return
+
+            with self._lock:
+                self.stats.items += 1
+                self.stats.busy_time += busy
+                self.stats.documents += sum(_num_documents(output) for output in outputs)
+                depth = self.input_queue.qsize()
+                self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+
+            if self.output_queue is not None:
+                for output in outputs:
+                    if not self.put(output, self.output_queue):
+                        return
+
+
+class IngestionPipeline(BaseModel):
+    """Loads a knowledge base into its vector db using concurrent stages connected by bounded queues:
+
+    read sources -> chunk documents -> embed batches -> write batches
+
+    Knowledge bases which implement `get_sources` and `read_source` are read by `num_readers` workers,
+    others are read from `document_lists` by a single worker.
+    """
+
+    # Number of worker threads for each stage
+    num_readers: int = 4
+    num_chunkers: int = 2
+    num_embedders: int = 4
+    num_writers: int = 2
+    # Maximum number of items waiting between stages
+    queue_size: int = 32
+    # Number of documents embedded per batch
+    embed_batch_size: int = 256
+    # Number of documents written per batch
+    write_batch_size: int = 512
+    # Interval in seconds to log the stage statistics at, disabled if None
+    log_interval: Optional[float] = 10
+
+    def run(
+        self,
+        knowledge: "AssistantKnowledge",
+        upsert: bool = False,
+        skip_existing: bool = True,
+        sources: Optional[Iterable[Any]] = None,
+        on_source: Optional[Callable[[Any, List[Document]], List[Document]]] = None,
+        on_loaded: Optional[Callable[[List[Document]], None]] = None,
+    ) -> IngestionStats:
+        """Load the knowledge base to its vector db
+
+        Args:
+            knowledge (AssistantKnowledge): Knowledge base to load
+            upsert (bool): If True, upserts documents to the vector db. Defaults to False.
+            skip_existing (bool): If True, skips documents which already exist in the vector db when inserting.
+            sources (Optional[Iterable[Any]]): Sources to load instead of `knowledge.get_sources()`
+            on_source (Optional[Callable]): Called with each source and its chunked documents,
+                returns the documents to load.
+            on_loaded (Optional[Callable]): Called with the documents which are loaded to the vector db,
+                either written or skipped because they already exist.
+        """
+        vector_db = knowledge.vector_db
+        if vector_db is None:
+            raise ValueError("No vector db provided")
+
+        _upsert = upsert and vector_db.upsert_available()
+        embedder = getattr(vector_db, "embedder", None)
+        stop = Event()
+
+        # Readers that do not chunk, used when the chunk stage chunks documents instead of the reader
+        raw_readers: Dict[int, Reader] = {}
+        raw_readers_lock = Lock()
+
+        def get_raw_reader(reader: Reader) -> Reader:
+            with raw_readers_lock:
+                if id(reader) not in raw_readers:
+                    raw_readers[id(reader)] = reader.model_copy(update={"chunk": False})
+                return raw_readers[id(reader)]
+
+        def read(source: Any) -> Iterator[Tuple[Any, Optional[Reader], List[Document]]]:
+            reader = knowledge.get_source_reader(source)
+            if reader is not None and reader.chunk:
+                yield source, reader, knowledge.read_source(source, reader=get_raw_reader(reader))
+            else:
+                yield source, None, knowledge.read_source(source)
+
+        def read_documents(documents: List[Document]) -> Iterator[Tuple[Any, Optional[Reader], List[Document]]]:
+            yield None, None, documents
+
+        def chunk(item: Tuple[Any, Optional[Reader], List[Document]]) -> Iterator[List[Document]]:
+            source, reader, documents = item
+            chunked_documents: List[Document] = documents
+            if reader is not None:
+                chunked_documents = []
+                for document in documents:
+                    chunked_documents.extend(reader.chunk_document(document))
+            if on_source is not None and source is not None:
+                chunked_documents = on_source(source, chunked_documents)
+            if len(chunked_documents) > 0:
+                yield chunked_documents
+
+        # Content hashes of the documents claimed by an embed worker in this run, shared by the workers
+        # so documents with the same content in batches embedded at the same time are only loaded once.
+        # Duplicates are marked loaded once the document with their content is loaded.
+        claimed_hashes: Set[str] = set()
+        loaded_hashes: Set[str] = set()
+        duplicates: Dict[str, List[Document]] = {}
+        hashes_lock = Lock()
+
+        def claim(documents: List[Document]) -> Tuple[List[Document], List[Document]]:
+            """Returns the documents whose content is not claimed by another document of this run,
+            and the duplicates whose content is already loaded
+            """
+            claimed: List[Document] = []
+            loaded: List[Document] = []
+            with hashes_lock:
+                for document in documents:
+                    content_hash = vector_db.get_content_hash(document)
+                    if content_hash not in claimed_hashes:
+                        claimed_hashes.add(content_hash)
+                        claimed.append(document)
+                    elif content_hash in loaded_hashes:
+                        loaded.append(document)
+                    else:
+                        duplicates.setdefault(content_hash, []).append(document)
+            return claimed, loaded
+
+        def mark_loaded(documents: List[Document]) -> None:
+            loaded = list(documents)
+            with hashes_lock:
+                for document in documents:
+                    content_hash = vector_db.get_content_hash(document)
+                    loaded_hashes.add(content_hash)
+                    loaded.extend(duplicates.pop(content_hash, []))
+            if on_loaded is not None:
+                on_loaded(loaded)
+
+        def embed(documents: List[Document]) -> Iterator[List[Document]]:
+            # Filter out documents which already exist in the vector db before embedding them
+            if skip_existing and not _upsert:
+                documents, loaded = claim(documents)
+                new_documents = vector_db.filter_new(documents)
+                if len(new_documents) < len(documents):
+                    new_ids = {id(document) for document in new_documents}
+                    loaded.extend(document for document in documents if id(document) not in new_ids)
+                if len(loaded) > 0:
+                    mark_loaded(loaded)
+                documents = new_documents
+            if len(documents) == 0:
+                return
+            if embedder is not None:
+                Document.embed_documents(documents, embedder=embedder)
+            yield documents
+
+        def write(documents: List[Document]) -> Iterator[List[Document]]:
+            if _upsert:
+                vector_db.upsert(documents=documents)
+            else:
+                vector_db.insert(documents=documents)
+            logger.info(f"Added {len(documents)} documents to knowledge base")
+            mark_loaded(documents)
+            yield documents
+
+        try:
+            items: Iterable[Any] = sources if sources is not None else knowledge.get_sources()
+            read_fn: Callable[[Any], Iterable[Any]] = read
+            num_readers = self.num_readers
+        except NotImplementedError:
+            items = knowledge.document_lists
+            read_fn = read_documents
+            num_readers = 1
+
+        source_queue: "Queue[Any]" = Queue(maxsize=self.queue_size)
+        read_queue: "Queue[Any]" = Queue(maxsize=self.queue_size)
+        chunk_queue: "Queue[Any]" = Queue(maxsize=self.queue_size)
+        embed_queue: "Queue[Any]" = Queue(maxsize=self.queue_size)
+        stages = [
+            _Stage("read", read_fn, num_readers, source_queue, read_queue, stop),
+            _Stage("chunk", chunk, self.num_chunkers, read_queue, chunk_queue, stop),
+            _Stage("embed", embed, self.num_embedders, chunk_queue, embed_queue, stop, self.embed_batch_size),
+            _Stage("write", write, self.num_writers, embed_queue, None, stop, self.write_batch_size),
+        ]
+
+        start = perf_counter()
+        for stage in stages:
+            stage.start()
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    if not stages[0].put(item, source_queue):
+                        return
+            except BaseException as e:
+                logger.error(f"Error listing sources: {e}")
+                stages[0].error = e
+                stop.set()
+                return
+            for _ in range(stages[0].workers):
+                stages[0].put(_DONE, source_queue)
+
+        feeder = Thread(target=feed, name="source", daemon=True)
+        feeder.start()
+
+        stats = IngestionStats(stages=[stage.stats for stage in stages])
+        last_log = perf_counter()
+        for i, stage in enumerate(stages):
+            while not stage.join(timeout=0.5):
+                if self.log_interval is not None and perf_counter() - last_log >= self.log_interval:
+                    self._update_stats(stats, stages, start)
+                    for stage_stats in stats.stages:
+                        logger.info(stage_stats)
+                    last_log = perf_counter()
+            # Signal the end of the input to the next stage once all workers of this stage are done
+            if i + 1 < len(stages):
+                for _ in range(stages[i + 1].workers):
+                    stage.put(_DONE, stages[i + 1].input_queue)
+        feeder.join()
+
+        self._update_stats(stats, stages, start)
+        for stage_stats in stats.stages:
+            logger.debug(stage_stats)
+
+        for stage in stages:
+            if stage.error is not None:
+                raise stage.error
+        return stats
+
+    @staticmethod
+    def _update_stats(stats: IngestionStats, stages: List[_Stage], start: float) -> None:
+        stats.elapsed = perf_counter() - start
+        for stage in stages:
+            stage.stats.elapsed = stats.elapsed
+            stage.stats.queue_depth = stage.input_queue.qsize()
+        stats.num_documents = stages[-1].stats.documents
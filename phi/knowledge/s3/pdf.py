@@ -1,6 +1,8 @@
-from typing import List, Iterator
+from typing import List, Iterator, Any, Optional
 
 from micro.document import Document
+from micro.document.reader.base import Reader
+from phi.aws.resource.s3.object import S3Object
 from micro.document.reader.s3.pdf import S3PDFReader
 from micro.knowledge.s3.base import S3KnowledgeBase
 
@@ -16,6 +18,15 @@ class S3PDFKnowledgeBase(S3KnowledgeBase):
         Returns:
             Iterator[List[Document]]: Iterator yielding list of documents
         """
+        # Extracts the pages of several PDFs at the same time if the reader uses a process pool
+        yield from self.reader.read_many(self.get_sources())
+
+    def get_sources(self) -> Iterator[S3Object]:
+        """Iterate over the PDF objects in the s3 bucket"""
         for s3_object in self.s3_objects:
             if s3_object.name.endswith(".pdf"):
-                yield self.reader.read(s3_object=s3_object)
+                yield s3_object
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, S3PDFReader) else self.reader
+        return _reader.read(s3_object=source)
@@ -1,6 +1,8 @@
-from typing import List, Iterator
+from typing import List, Iterator, Any, Optional
 
 from micro.document import Document
+from micro.document.reader.base import Reader
+from phi.aws.resource.s3.object import S3Object
 from micro.document.reader.s3.text import S3TextReader
 from micro.knowledge.s3.base import S3KnowledgeBase
 
@@ -18,6 +20,15 @@ class S3TextKnowledgeBase(S3KnowledgeBase):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        for s3_object in self.get_sources():
+            yield self.read_source(s3_object)
+
+    def get_sources(self) -> Iterator[S3Object]:
+        """Iterate over the objects in the s3 bucket with a supported format"""
         for s3_object in self.s3_objects:
             if s3_object.name.endswith(tuple(self.formats)):
-                yield self.reader.read(s3_object=s3_object)
+                yield s3_object
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, S3TextReader) else self.reader
+        return _reader.read(s3_object=source)
@@ -1,8 +1,9 @@
-from typing import Iterator, List, Optional
+from typing import Iterator, List, Optional, Any
 
 from pydantic import model_validator
 
 from micro.document import Document
+from micro.document.reader.base import Reader
 from micro.document.reader.website import WebsiteReader
 from micro.knowledge.base import AssistantKnowledge
 from micro.utils.log import logger
@@ -31,8 +32,17 @@ class WebsiteKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
         if self.reader is not None:
-            for _url in self.urls:
-                yield self.reader.read(url=_url)
+            for _url in self.get_sources():
+                yield self.read_source(_url)
+
+    def get_sources(self) -> Iterator[str]:
+        yield from self.urls
+
+    def read_source(self, source: Any, reader: Optional[Reader] = None) -> List[Document]:
+        _reader = reader if isinstance(reader, WebsiteReader) else self.reader
+        if _reader is None:
+            return []
+        return _reader.read(url=source)
 
     def load(self, recreate: bool = False, upsert: bool = True, skip_existing: bool = True) -> None:
         """Load the website contents to the vector db"""
@@ -69,7 +79,7 @@ class WebsiteKnowledgeBase(AssistantKnowledge):
             document_list = self.reader.read(url=url)
             # Filter out documents which already exist in the vector db
             if not recreate:
-                document_list = [document for document in document_list if not self.vector_db.doc_exists(document)]
+                document_list = self.vector_db.filter_new(document_list)
 
             self.vector_db.insert(documents=document_list)
             num_documents += len(document_list)
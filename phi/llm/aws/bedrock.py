@@ -1,9 +1,11 @@
 import json
-from typing import Optional, List, Iterator, Dict, Any
+import asyncio
+from typing import Optional, List, Iterator, AsyncIterator, Dict, Any
 
 from phi.aws.api_client import AwsApiClient
 from micro.llm.base import LLM
 from micro.llm.message import Message
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 from micro.utils.timer import Timer
 
@@ -62,13 +64,25 @@ class AwsBedrock(LLM):
         self.aws_client = AwsApiClient(aws_region=self.get_aws_region(), aws_profile=self.get_aws_profile())
         return self.aws_client
 
+    def get_boto3_client(self, service_name: str) -> Any:
+        # boto3 clients are thread safe, share them across models using the same region and profile
+        def create_client(service_name: str, aws_region: Optional[str], aws_profile: Optional[str]) -> Any:
+            boto3_session: session = self.get_aws_client().boto3_session
+            return boto3_session.client(service_name=service_name)
+
+        return client_registry.get_client(
+            "aws",
+            create_client,
+            {"service_name": service_name, "aws_region": self.get_aws_region(), "aws_profile": self.get_aws_profile()},
+            http_client_param=None,
+        )
+
     @property
     def bedrock_client(self):
         if self._bedrock_client is not None:
             return self._bedrock_client
 
-        boto3_session: session = self.get_aws_client().boto3_session
-        self._bedrock_client = boto3_session.client(service_name="bedrock")
+        self._bedrock_client = self.get_boto3_client(service_name="bedrock")
         return self._bedrock_client
 
     @property
@@ -76,8 +90,7 @@ class AwsBedrock(LLM):
         if self._bedrock_runtime_client is not None:
             return self._bedrock_runtime_client
 
-        boto3_session: session = self.get_aws_client().boto3_session
-        self._bedrock_runtime_client = boto3_session.client(service_name="bedrock-runtime")
+        self._bedrock_runtime_client = self.get_boto3_client(service_name="bedrock-runtime")
         return self._bedrock_runtime_client
 
     @property
@@ -128,6 +141,29 @@ class AwsBedrock(LLM):
             if chunk:
                 yield json.loads(chunk.get("bytes").decode())
 
+    async def ainvoke(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        # boto3 has no async api, so the blocking request runs in the default executor
+        return await asyncio.get_running_loop().run_in_executor(None, self.invoke, body)
+
+    async def ainvoke_stream(self, body: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None,
+            lambda: self.bedrock_runtime_client.invoke_model_with_response_stream(
+                body=json.dumps(body),
+                modelId=self.model,
+            ),
+        )
+        # Read each event from the blocking event stream in the executor
+        events = iter(response.get("body"))
+        while True:
+            event = await loop.run_in_executor(None, next, events, None)
+            if event is None:
+                break
+            chunk = event.get("chunk")
+            if chunk:
+                yield json.loads(chunk.get("bytes").decode())
+
     def get_request_body(self, messages: List[Message]) -> Dict[str, Any]:
         raise NotImplementedError("Please use a subclass of AwsBedrock")
 
@@ -190,6 +226,59 @@ class AwsBedrock(LLM):
         # -*- Return content
         return assistant_message.get_content_string()
 
+    async def aresponse(self, messages: List[Message]) -> str:
+        logger.debug("---------- Bedrock Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_timer = Timer()
+        response_timer.start()
+        response: Dict[str, Any] = await self.ainvoke(body=self.get_request_body(messages))
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Create assistant message
+        assistant_message = self.parse_response_message(response)
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # Add token usage to metrics
+        prompt_tokens = 0
+        if prompt_tokens is not None:
+            assistant_message.metrics["prompt_tokens"] = prompt_tokens
+            if "prompt_tokens" not in self.metrics:
+                self.metrics["prompt_tokens"] = prompt_tokens
+            else:
+                self.metrics["prompt_tokens"] += prompt_tokens
+        completion_tokens = 0
+        if completion_tokens is not None:
+            assistant_message.metrics["completion_tokens"] = completion_tokens
+            if "completion_tokens" not in self.metrics:
+                self.metrics["completion_tokens"] = completion_tokens
+            else:
+                self.metrics["completion_tokens"] += completion_tokens
+        total_tokens = prompt_tokens + completion_tokens
+        if total_tokens is not None:
+            assistant_message.metrics["total_tokens"] = total_tokens
+            if "total_tokens" not in self.metrics:
+                self.metrics["total_tokens"] = total_tokens
+            else:
+                self.metrics["total_tokens"] += total_tokens
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        logger.debug("---------- Bedrock Async Response End ----------")
+        # -*- Return content
+        return assistant_message.get_content_string()
+
     def response_stream(self, messages: List[Message]) -> Iterator[str]:
         logger.debug("---------- Bedrock Response Start ----------")
 
@@ -246,3 +335,60 @@ class AwsBedrock(LLM):
         messages.append(assistant_message)
         assistant_message.log()
         logger.debug("---------- Bedrock Response End ----------")
+
+    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        logger.debug("---------- Bedrock Async Response Start ----------")
+
+        assistant_message_content = ""
+        completion_tokens = 0
+        response_timer = Timer()
+        response_timer.start()
+        async for delta in self.ainvoke_stream(body=self.get_request_body(messages)):
+            completion_tokens += 1
+            # -*- Parse response
+            content = self.parse_response_delta(delta)
+            # -*- Yield completion
+            if content is not None:
+                assistant_message_content += content
+                yield content
+
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Create assistant message
+        assistant_message = Message(role="assistant")
+        # -*- Add content to assistant message
+        if assistant_message_content != "":
+            assistant_message.content = assistant_message_content
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # Add token usage to metrics
+        prompt_tokens = 0
+        assistant_message.metrics["prompt_tokens"] = prompt_tokens
+        if "prompt_tokens" not in self.metrics:
+            self.metrics["prompt_tokens"] = prompt_tokens
+        else:
+            self.metrics["prompt_tokens"] += prompt_tokens
+        logger.debug(f"Estimated completion tokens: {completion_tokens}")
+        assistant_message.metrics["completion_tokens"] = completion_tokens
+        if "completion_tokens" not in self.metrics:
+            self.metrics["completion_tokens"] = completion_tokens
+        else:
+            self.metrics["completion_tokens"] += completion_tokens
+        total_tokens = prompt_tokens + completion_tokens
+        assistant_message.metrics["total_tokens"] = total_tokens
+        if "total_tokens" not in self.metrics:
+            self.metrics["total_tokens"] = total_tokens
+        else:
+            self.metrics["total_tokens"] += total_tokens
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+        logger.debug("---------- Bedrock Async Response End ----------")
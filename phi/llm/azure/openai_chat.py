@@ -1,5 +1,6 @@
 from os import getenv
 from typing import Optional, Dict, Any
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 from micro.llm.openai.like import OpenAILike
 
@@ -49,4 +50,4 @@ class AzureOpenAIChat(OpenAILike):
         if self.client_params:
             _client_params.update(self.client_params)
 
-        return AzureOpenAIClient(**_client_params)
+        return client_registry.get_client("azure_openai", AzureOpenAIClient, _client_params)
@@ -1,7 +1,15 @@
-from typing import List, Iterator, Optional, Dict, Any, Callable, Union
-
-from pydantic import BaseModel, ConfigDict
-
+import asyncio
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from functools import wraps
+from hashlib import sha256
+from threading import Lock, Semaphore
+from time import perf_counter
+from typing import List, Iterator, Optional, Dict, Any, Callable, Set, Tuple, Union
+
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from micro.llm.cache.base import ResponseCache
 from micro.llm.message import Message
 from micro.tools import Tool, Toolkit
 from micro.tools.function import Function, FunctionCall
@@ -43,6 +51,20 @@ class LLM(BaseModel):
     function_call_limit: int = 10
     # Function call stack.
     function_call_stack: Optional[List[FunctionCall]] = None
+    # If True, runs the function calls from one response concurrently,
+    # unless one of the functions called sets `parallel=False`.
+    parallel_tool_calls: bool = True
+    # Maximum number of function calls to run at the same time.
+    max_parallel_tool_calls: int = 8
+    # Timeout in seconds for each function call, if the function does not set its own timeout.
+    tool_call_timeout: Optional[float] = None
+
+    # -*- Response cache
+    # Cache for the output of response, response_stream, aresponse and aresponse_stream.
+    # Cached responses are replayed, including the tool calls and results they added to the messages.
+    response_cache: Optional[ResponseCache] = None
+    # If True, also caches responses when the temperature is above 0 or not set, i.e. the provider default
+    cache_sampled_responses: bool = False
 
     system_prompt: Optional[str] = None
     instructions: Optional[List[str]] = None
@@ -52,6 +74,23 @@ class LLM(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    # Ids of the message lists with a cached response in progress, so the recursive tool call responses are not cached
+    _cached_calls: Set[int] = PrivateAttr(default_factory=set)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        # Add the response cache to the response methods implemented by the subclass
+        for name, wrapper in (
+            ("response", _cache_response),
+            ("response_stream", _cache_response_stream),
+            ("aresponse", _cache_aresponse),
+            ("aresponse_stream", _cache_aresponse_stream),
+        ):
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "__response_cache__", False):
+                setattr(cls, name, wrapper(method))
+
     @property
     def api_kwargs(self) -> Dict[str, Any]:
         raise NotImplementedError
@@ -151,41 +190,393 @@ class LLM(BaseModel):
         # This is triggered when the function call limit is reached.
         self.tool_choice = "none"
 
-    def run_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+    def get_function_calls_to_run(self, function_calls: List[FunctionCall]) -> List[FunctionCall]:
+        """Returns the function calls which can run without exceeding the function call limit"""
+        if self.function_call_stack is None:
+            self.function_call_stack = []
+        remaining = max(self.function_call_limit - len(self.function_call_stack), 0)
+        if len(function_calls) > remaining:
+            logger.debug(f"Function call limit reached, running {remaining} of {len(function_calls)} function calls")
+        return function_calls[:remaining]
+
+    def can_run_in_parallel(self, function_calls: List[FunctionCall]) -> bool:
+        """Returns True if the function calls from one response may run concurrently"""
+        if not self.parallel_tool_calls or len(function_calls) <= 1:
+            return False
+        return all(function_call.function.parallel for function_call in function_calls)
+
+    def get_function_call_timeout(self, function_call: FunctionCall) -> Optional[float]:
+        return function_call.function.timeout or self.tool_call_timeout
+
+    @staticmethod
+    def _execute_function_call(function_call: FunctionCall) -> float:
+        """Runs the function call, returns the time it took"""
+        _function_call_timer = Timer()
+        _function_call_timer.start()
+        function_call.execute()
+        _function_call_timer.stop()
+        return _function_call_timer.elapsed
+
+    @classmethod
+    def _execute_function_call_copy(cls, function_call: FunctionCall) -> Tuple[float, FunctionCall]:
+        """Runs a copy of the function call, so that a call which timed out cannot overwrite the result later"""
+        _function_call = function_call.model_copy()
+        return cls._execute_function_call(_function_call), _function_call
+
+    @staticmethod
+    async def _aexecute_function_call_copy(function_call: FunctionCall) -> Tuple[float, FunctionCall]:
+        """Runs a copy of the function call without blocking the event loop, returns the time it took"""
+        _function_call = function_call.model_copy()
+        _function_call_timer = Timer()
+        _function_call_timer.start()
+        await _function_call.aexecute()
+        _function_call_timer.stop()
+        return _function_call_timer.elapsed, _function_call
+
+    @staticmethod
+    def _set_function_call_result(function_call: FunctionCall, executed: FunctionCall) -> None:
+        function_call.result = executed.result
+        function_call.error = executed.error
+
+    @staticmethod
+    def _set_function_call_timed_out(function_call: FunctionCall, timeout: Optional[float]) -> None:
+        logger.warning(f"Function call timed out after {timeout}s: {function_call.get_call_str()}")
+        function_call.error = f"Function call timed out after {timeout} seconds."
+        function_call.result = function_call.error
+
+    def _wait_for_function_call(
+        self, function_call: FunctionCall, future: Any, timeout: Optional[float], start: float
+    ) -> float:
+        """Waits for a function call running in a thread until `timeout` seconds after `start`"""
+        remaining = None if timeout is None else max(timeout - (perf_counter() - start), 0)
+        try:
+            elapsed, executed = future.result(timeout=remaining)
+            self._set_function_call_result(function_call, executed)
+            return elapsed
+        except FutureTimeoutError:
+            future.cancel()
+            self._set_function_call_timed_out(function_call, timeout)
+            return perf_counter() - start
+
+    def add_function_call_results(
+        self, function_calls: List[FunctionCall], times: List[float], batch_time: float, role: str
+    ) -> List[Message]:
+        """Records the function calls in the function call stack and metrics, in the order they were requested"""
+        if self.function_call_stack is None:
+            self.function_call_stack = []
+
         function_call_results: List[Message] = []
-        for function_call in function_calls:
-            if self.function_call_stack is None:
-                self.function_call_stack = []
-
-            # -*- Run function call
-            _function_call_timer = Timer()
-            _function_call_timer.start()
-            function_call.execute()
-            _function_call_timer.stop()
+        for function_call, elapsed in zip(function_calls, times):
             _function_call_result = Message(
                 role=role,
                 content=function_call.result,
                 tool_call_id=function_call.call_id,
                 tool_call_name=function_call.function.name,
-                metrics={"time": _function_call_timer.elapsed},
+                metrics={"time": elapsed},
             )
             if "tool_call_times" not in self.metrics:
                 self.metrics["tool_call_times"] = {}
             if function_call.function.name not in self.metrics["tool_call_times"]:
                 self.metrics["tool_call_times"][function_call.function.name] = []
-            self.metrics["tool_call_times"][function_call.function.name].append(_function_call_timer.elapsed)
+            self.metrics["tool_call_times"][function_call.function.name].append(elapsed)
             function_call_results.append(_function_call_result)
             self.function_call_stack.append(function_call)
 
-            # -*- Check function call limit
-            if len(self.function_call_stack) >= self.function_call_limit:
-                self.deactivate_function_calls()
-                break  # Exit early if we reach the function call limit
+        # Wall-clock time to run all function calls from one response
+        if len(function_calls) > 0:
+            if "tool_call_batch_times" not in self.metrics:
+                self.metrics["tool_call_batch_times"] = []
+            self.metrics["tool_call_batch_times"].append(batch_time)
+
+        # -*- Check function call limit
+        if len(self.function_call_stack) >= self.function_call_limit:
+            self.deactivate_function_calls()
 
         return function_call_results
 
+    def _run_parallel_function_calls(
+        self, function_calls: List[FunctionCall], timeouts: List[Optional[float]], times: List[float]
+    ) -> None:
+        """Runs up to `max_parallel_tool_calls` function calls at the same time, setting their times.
+        Timeouts are measured from the start of each call, and a call which timed out frees its slot
+        for the next call while its thread keeps running.
+        """
+        semaphore = Semaphore(max(self.max_parallel_tool_calls, 1))
+        starts: List[Optional[float]] = [None] * len(function_calls)
+        released = [False] * len(function_calls)
+        lock = Lock()
+
+        def release(i: int) -> None:
+            with lock:
+                if not released[i]:
+                    released[i] = True
+                    semaphore.release()
+
+        def run(i: int) -> Tuple[float, FunctionCall]:
+            semaphore.acquire()
+            starts[i] = perf_counter()
+            try:
+                return self._execute_function_call_copy(function_calls[i])
+            finally:
+                release(i)
+
+        # Each call gets its own thread, as calls which timed out keep theirs
+        executor = ThreadPoolExecutor(max_workers=len(function_calls), thread_name_prefix="tool")
+        try:
+            futures = {executor.submit(run, i): i for i in range(len(function_calls))}
+            pending = set(futures)
+            while len(pending) > 0:
+                done, pending = wait(
+                    pending,
+                    timeout=self._get_parallel_wait_timeout(futures, pending, starts, timeouts),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    i = futures[future]
+                    elapsed, executed = future.result()
+                    self._set_function_call_result(function_calls[i], executed)
+                    times[i] = elapsed
+                now = perf_counter()
+                for future in list(pending):
+                    i, start = futures[future], starts[futures[future]]
+                    timeout = timeouts[i]
+                    if timeout is not None and start is not None and now - start >= timeout:
+                        pending.discard(future)
+                        release(i)
+                        self._set_function_call_timed_out(function_calls[i], timeout)
+                        times[i] = now - start
+        finally:
+            # Do not wait for function calls which timed out
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _get_parallel_wait_timeout(
+        futures: Dict[Any, int], pending: Set[Any], starts: List[Optional[float]], timeouts: List[Optional[float]]
+    ) -> Optional[float]:
+        """Returns how long to wait for a pending call to finish before the next call may time out"""
+        wait_timeout: Optional[float] = None
+        now = perf_counter()
+        for future in pending:
+            i = futures[future]
+            timeout = timeouts[i]
+            if timeout is None:
+                continue
+            start = starts[i]
+            # Calls waiting for a slot have not started yet, check again shortly
+            remaining = max(start + timeout - now, 0) if start is not None else min(timeout, 0.05)
+            wait_timeout = remaining if wait_timeout is None else min(wait_timeout, remaining)
+        return wait_timeout
+
+    def run_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+        function_calls = self.get_function_calls_to_run(function_calls)
+        times: List[float] = [0.0] * len(function_calls)
+        timeouts = [self.get_function_call_timeout(function_call) for function_call in function_calls]
+
+        batch_start = perf_counter()
+        parallel = self.can_run_in_parallel(function_calls)
+        # -*- Run function calls without threads if they run one after another and have no timeout
+        if not parallel and all(timeout is None for timeout in timeouts):
+            for i, function_call in enumerate(function_calls):
+                times[i] = self._execute_function_call(function_call)
+        elif not parallel:
+            # Calls which timed out keep their thread, so each call gets its own
+            executor = ThreadPoolExecutor(max_workers=len(function_calls), thread_name_prefix="tool")
+            try:
+                for i, (function_call, timeout) in enumerate(zip(function_calls, timeouts)):
+                    future = executor.submit(self._execute_function_call_copy, function_call)
+                    times[i] = self._wait_for_function_call(function_call, future, timeout, perf_counter())
+            finally:
+                # Do not wait for function calls which timed out
+                executor.shutdown(wait=False)
+        else:
+            self._run_parallel_function_calls(function_calls, timeouts, times)
+        batch_time = perf_counter() - batch_start
+
+        return self.add_function_call_results(function_calls, times, batch_time, role)
+
+    async def arun_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+        function_calls = self.get_function_calls_to_run(function_calls)
+        # Calls which can not run in parallel acquire the semaphore one after another, in order
+        semaphore = asyncio.Semaphore(
+            max(self.max_parallel_tool_calls if self.can_run_in_parallel(function_calls) else 1, 1)
+        )
+
+        async def run(function_call: FunctionCall) -> float:
+            timeout = self.get_function_call_timeout(function_call)
+            async with semaphore:
+                start = perf_counter()
+                try:
+                    # Async functions are cancelled on timeout, sync functions keep running in their thread
+                    elapsed, executed = await asyncio.wait_for(
+                        self._aexecute_function_call_copy(function_call), timeout=timeout
+                    )
+                    self._set_function_call_result(function_call, executed)
+                    return elapsed
+                except asyncio.TimeoutError:
+                    self._set_function_call_timed_out(function_call, timeout)
+                    return perf_counter() - start
+
+        batch_start = perf_counter()
+        # asyncio.gather returns the results in the order of the function calls
+        times = list(await asyncio.gather(*[run(function_call) for function_call in function_calls]))
+        batch_time = perf_counter() - batch_start
+
+        return self.add_function_call_results(function_calls, times, batch_time, role)
+
+    def get_temperature(self) -> Optional[float]:
+        temperature = getattr(self, "temperature", None)
+        request_params = getattr(self, "request_params", None)
+        if isinstance(request_params, dict) and request_params.get("temperature") is not None:
+            temperature = request_params["temperature"]
+        return temperature
+
+    def use_response_cache(self, messages: List[Message]) -> bool:
+        if self.response_cache is None or id(messages) in self._cached_calls:
+            return False
+        if self.cache_sampled_responses:
+            return True
+        # Sampled responses are not deterministic, so only responses with a temperature of 0 are cached by default.
+        # Without a temperature the provider default applies, which usually samples.
+        temperature = self.get_temperature()
+        return temperature is not None and temperature <= 0
+
+    def get_response_cache_key(self, messages: List[Message]) -> str:
+        """Returns a hash of everything sent to the model: model, request parameters, tools and messages"""
+        request = {
+            "llm": self.__class__.__name__,
+            "model": self.model,
+            "api_kwargs": self.api_kwargs,
+            "tools": self.get_tools_for_api(),
+            "functions": {name: f.to_dict() for name, f in self.functions.items()} if self.functions else None,
+            "messages": [m.to_dict() for m in messages],
+        }
+        return sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get_cached_response(self, key: str, messages: List[Message]) -> Optional[List[str]]:
+        """Returns the cached response chunks and adds the cached messages to the conversation"""
+        assert self.response_cache is not None
+        cached_response = self.response_cache.get(key)
+        if cached_response is None:
+            return None
+        logger.debug(f"Using cached response: {key}")
+        messages.extend(cached_response.get_messages())
+        self.metrics["cache_hits"] = self.metrics.get("cache_hits", 0) + 1
+        return cached_response.chunks
+
+    def set_cached_response(self, key: str, chunks: List[str], messages: List[Message], num_messages: int) -> None:
+        assert self.response_cache is not None
+        self.response_cache.set(key, chunks, messages[num_messages:])
+
     def get_system_prompt_from_llm(self) -> Optional[str]:
         return self.system_prompt
 
     def get_instructions_from_llm(self) -> Optional[List[str]]:
         return self.instructions
+
+
+def _cache_response(response: Callable) -> Callable:
+    @wraps(response)
+    def cached_response(self: LLM, messages: List[Message], *args, **kwargs) -> str:
+        if not self.use_response_cache(messages):
+            return response(self, messages, *args, **kwargs)
+
+        key = self.get_response_cache_key(messages)
+        chunks = self.get_cached_response(key, messages)
+        if chunks is not None:
+            return "".join(chunks)
+
+        num_messages = len(messages)
+        self._cached_calls.add(id(messages))
+        try:
+            content = response(self, messages, *args, **kwargs)
+        finally:
+            self._cached_calls.discard(id(messages))
+        self.set_cached_response(key, [content], messages, num_messages)
+        return content
+
+    cached_response.__response_cache__ = True  # type: ignore
+    return cached_response
+
+
+def _cache_response_stream(response_stream: Callable) -> Callable:
+    @wraps(response_stream)
+    def cached_response_stream(self: LLM, messages: List[Message], *args, **kwargs) -> Iterator[str]:
+        if not self.use_response_cache(messages):
+            yield from response_stream(self, messages, *args, **kwargs)
+            return
+
+        key = self.get_response_cache_key(messages)
+        chunks = self.get_cached_response(key, messages)
+        if chunks is not None:
+            yield from chunks
+            return
+
+        num_messages = len(messages)
+        chunks = []
+        self._cached_calls.add(id(messages))
+        try:
+            for chunk in response_stream(self, messages, *args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            self._cached_calls.discard(id(messages))
+        # Only reached if the stream was consumed completely
+        self.set_cached_response(key, chunks, messages, num_messages)
+
+    cached_response_stream.__response_cache__ = True  # type: ignore
+    return cached_response_stream
+
+
+def _cache_aresponse(aresponse: Callable) -> Callable:
+    @wraps(aresponse)
+    async def cached_aresponse(self: LLM, messages: List[Message], *args, **kwargs) -> str:
+        if not self.use_response_cache(messages):
+            return await aresponse(self, messages, *args, **kwargs)
+
+        key = self.get_response_cache_key(messages)
+        chunks = self.get_cached_response(key, messages)
+        if chunks is not None:
+            return "".join(chunks)
+
+        num_messages = len(messages)
+        self._cached_calls.add(id(messages))
+        try:
+            content = await aresponse(self, messages, *args, **kwargs)
+        finally:
+            self._cached_calls.discard(id(messages))
+        self.set_cached_response(key, [content], messages, num_messages)
+        return content
+
+    cached_aresponse.__response_cache__ = True  # type: ignore
+    return cached_aresponse
+
+
+def _cache_aresponse_stream(aresponse_stream: Callable) -> Callable:
+    @wraps(aresponse_stream)
+    async def cached_aresponse_stream(self: LLM, messages: List[Message], *args, **kwargs) -> Any:
+        if not self.use_response_cache(messages):
+            async for chunk in aresponse_stream(self, messages, *args, **kwargs):
+                yield chunk
+            return
+
+        key = self.get_response_cache_key(messages)
+        chunks = self.get_cached_response(key, messages)
+        if chunks is not None:
+            for chunk in chunks:
+                yield chunk
+            return
+
+        num_messages = len(messages)
+        chunks = []
+        self._cached_calls.add(id(messages))
+        try:
+            async for chunk in aresponse_stream(self, messages, *args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            self._cached_calls.discard(id(messages))
+        # Only reached if the stream was consumed completely
+        self.set_cached_response(key, chunks, messages, num_messages)
+
+    cached_aresponse_stream.__response_cache__ = True  # type: ignore
+    return cached_aresponse_stream
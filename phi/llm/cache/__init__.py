@@ -0,0 +1,3 @@
+from micro.llm.cache.base import ResponseCache, CachedResponse
+from micro.llm.cache.memory import InMemoryResponseCache
+from micro.llm.cache.sqlite import SqliteResponseCache
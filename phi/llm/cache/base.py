@@ -0,0 +1,92 @@
+from abc import ABC, abstractmethod
+from time import time
+from typing import Optional, List, Dict, Any
+
+from pydantic import BaseModel
+
+from micro.llm.message import Message
+
+
+class CachedResponse(BaseModel):
+    """Output of an LLM response, stored in a ResponseCache"""
+
+    # The response content, as the chunks yielded by response_stream or a single chunk for response
+    chunks: List[str]
+    # Messages added to the conversation by the response: the assistant message, tool calls and results
+    messages: List[Dict[str, Any]] = []
+    created_at: float = 0
+    # Time after which the response is expired, never expires if None
+    expires_at: Optional[float] = None
+
+    @property
+    def content(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= time()
+
+    def get_messages(self) -> List[Message]:
+        return [Message.model_validate(m) for m in self.messages]
+
+
+class ResponseCache(ABC):
+    """Base class for LLM response caches, mapping a hash of the request to the response"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        Args:
+            ttl (Optional[float]): Number of seconds a response is cached for. Cached forever if None.
+        """
+        self.ttl: Optional[float] = ttl
+
+        # -*- Cache statistics
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def get_expires_at(self, now: float) -> Optional[float]:
+        return now + self.ttl if self.ttl is not None else None
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        response = self.read(key)
+        if response is not None and response.expired:
+            self.delete(key)
+            response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def set(self, key: str, chunks: List[str], messages: List[Message]) -> None:
+        now = time()
+        self.write(
+            key,
+            CachedResponse(
+                chunks=chunks,
+                messages=[m.model_dump(exclude_none=True) for m in messages],
+                created_at=now,
+                expires_at=self.get_expires_at(now),
+            ),
+        )
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write(self, key: str, response: CachedResponse) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
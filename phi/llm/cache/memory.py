@@ -0,0 +1,46 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from micro.llm.cache.base import ResponseCache, CachedResponse
+
+
+class InMemoryResponseCache(ResponseCache):
+    def __init__(self, max_entries: Optional[int] = 1024, ttl: Optional[float] = None):
+        """
+        LLM response cache held in memory, evicting the least recently used responses.
+
+        Args:
+            max_entries (Optional[int]): Maximum number of responses to keep. Unbounded if None.
+            ttl (Optional[float]): Number of seconds a response is cached for. Cached forever if None.
+        """
+        super().__init__(ttl=ttl)
+        self.max_entries: Optional[int] = max_entries
+        self._responses: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def read(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+            return response
+
+    def write(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._responses) > self.max_entries:
+                    self._responses.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._responses.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._responses.clear()
@@ -0,0 +1,101 @@
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Optional
+
+from micro.llm.cache.base import ResponseCache, CachedResponse
+from micro.utils.log import logger
+
+
+class SqliteResponseCache(ResponseCache):
+    def __init__(
+        self,
+        db_file: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        """
+        LLM response cache stored in a sqlite database on local disk, shared across processes.
+
+        Args:
+            db_file (Optional[str]): Path to the database file. Defaults to ~/.phi/llm_responses.db
+            max_entries (Optional[int]): Maximum number of responses to keep, the least recently used are evicted.
+                Unbounded if None.
+            ttl (Optional[float]): Number of seconds a response is cached for. Cached forever if None.
+        """
+        super().__init__(ttl=ttl)
+        self.db_file: Path = (
+            Path(db_file) if db_file is not None else Path.home().resolve().joinpath(".phi", "llm_responses.db")
+        )
+        self.max_entries: Optional[int] = max_entries
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"Opening response cache: {self.db_file}")
+        connection = sqlite3.connect(str(self.db_file), check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL, last_used REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        connection.commit()
+        self._connection = connection
+        return connection
+
+    def read(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            connection = self._open()
+            row = connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.max_entries is not None:
+                connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time(), key))
+                connection.commit()
+        return CachedResponse.model_validate_json(row[0])
+
+    def write(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            connection = self._open()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response.model_dump_json(), response.expires_at, response.created_at),
+            )
+            self._evict(connection)
+            connection.commit()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        connection.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time(),))
+        if self.max_entries is None:
+            return
+        count = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            logger.debug(f"Evicting {count - self.max_entries} responses from cache")
+            connection.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            connection = self._open()
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            connection = self._open()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
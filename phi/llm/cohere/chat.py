@@ -1,16 +1,17 @@
 import json
 from textwrap import dedent
-from typing import Optional, List, Dict, Any, Iterator
+from typing import Optional, List, Dict, Any, Iterator, AsyncIterator
 
 from micro.llm.base import LLM
 from micro.llm.message import Message
 from micro.tools.function import FunctionCall
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 from micro.utils.timer import Timer
 from micro.utils.tools import get_function_call_for_tool_call
 
 try:
-    from cohere import Client as CohereClient
+    from cohere import Client as CohereClient, AsyncClient as AsyncCohereClient
     from cohere.types.tool import Tool as CohereTool
     from cohere.types.tool_call import ToolCall as CohereToolCall
     from cohere.types.non_streamed_chat_response import NonStreamedChatResponse
@@ -45,16 +46,31 @@ class CohereChat(LLM):
     client_params: Optional[Dict[str, Any]] = None
     # -*- Provide the Cohere client manually
     cohere_client: Optional[CohereClient] = None
+    async_cohere_client: Optional[AsyncCohereClient] = None
+
+    def get_client_params(self) -> Dict[str, Any]:
+        _client_params: Dict[str, Any] = {}
+        if self.api_key:
+            _client_params["api_key"] = self.api_key
+        if self.client_params:
+            _client_params.update(self.client_params)
+        return _client_params
 
     @property
     def client(self) -> CohereClient:
         if self.cohere_client:
             return self.cohere_client
+        return client_registry.get_client(
+            "cohere", CohereClient, self.get_client_params(), http_client_param="httpx_client"
+        )
 
-        _client_params: Dict[str, Any] = {}
-        if self.api_key:
-            _client_params["api_key"] = self.api_key
-        return CohereClient(**_client_params)
+    @property
+    def async_client(self) -> AsyncCohereClient:
+        if self.async_cohere_client:
+            return self.async_cohere_client
+        return client_registry.get_async_client(
+            "cohere", AsyncCohereClient, self.get_client_params(), http_client_param="httpx_client"
+        )
 
     @property
     def api_kwargs(self) -> Dict[str, Any]:
@@ -180,6 +196,90 @@ class CohereChat(LLM):
         logger.debug(f"Chat message: {chat_message}")
         return self.client.chat_stream(message=chat_message or "", model=self.model, **api_kwargs)
 
+    async def ainvoke(
+        self, messages: List[Message], tool_results: Optional[List[ChatRequestToolResultsItem]] = None
+    ) -> NonStreamedChatResponse:
+        api_kwargs: Dict[str, Any] = self.api_kwargs
+        chat_message: Optional[str] = None
+
+        if self.add_chat_history:
+            logger.debug("Providing chat_history to cohere")
+            chat_history = []
+            for m in messages:
+                if m.role == "system" and "preamble" not in api_kwargs:
+                    api_kwargs["preamble"] = m.content
+                elif m.role == "user":
+                    if chat_message is not None:
+                        # Add the existing chat_message to the chat_history
+                        chat_history.append({"role": "USER", "message": chat_message})
+                    # Update the chat_message to the new user message
+                    chat_message = m.get_content_string()
+                else:
+                    chat_history.append({"role": "CHATBOT", "message": m.get_content_string() or ""})
+            api_kwargs["chat_history"] = chat_history
+        else:
+            # Set first system message as preamble
+            for m in messages:
+                if m.role == "system" and "preamble" not in api_kwargs:
+                    api_kwargs["preamble"] = m.get_content_string()
+                    break
+            # Set last user message as chat_message
+            for m in reversed(messages):
+                if m.role == "user":
+                    chat_message = m.get_content_string()
+                    break
+
+        if self.tools:
+            api_kwargs["tools"] = self.get_tools()
+
+        if tool_results:
+            api_kwargs["tool_results"] = tool_results
+
+        return await self.async_client.chat(message=chat_message or "", model=self.model, **api_kwargs)
+
+    async def ainvoke_stream(
+        self, messages: List[Message], tool_results: Optional[List[ChatRequestToolResultsItem]] = None
+    ) -> AsyncIterator[StreamedChatResponse]:
+        api_kwargs: Dict[str, Any] = self.api_kwargs
+        chat_message: Optional[str] = None
+
+        if self.add_chat_history:
+            logger.debug("Providing chat_history to cohere")
+            chat_history = []
+            for m in messages:
+                if m.role == "system" and "preamble" not in api_kwargs:
+                    api_kwargs["preamble"] = m.get_content_string()
+                elif m.role == "user":
+                    if chat_message is not None:
+                        # Add the existing chat_message to the chat_history
+                        chat_history.append({"role": "USER", "message": chat_message})
+                    # Update the chat_message to the new user message
+                    chat_message = m.get_content_string()
+                else:
+                    chat_history.append({"role": "CHATBOT", "message": m.get_content_string() or ""})
+            api_kwargs["chat_history"] = chat_history
+        else:
+            # Set first system message as preamble
+            for m in messages:
+                if m.role == "system" and "preamble" not in api_kwargs:
+                    api_kwargs["preamble"] = m.get_content_string()
+                    break
+            # Set last user message as chat_message
+            for m in reversed(messages):
+                if m.role == "user":
+                    chat_message = m.get_content_string()
+                    break
+
+        if self.tools:
+            api_kwargs["tools"] = self.get_tools()
+
+        if tool_results:
+            api_kwargs["tool_results"] = tool_results
+
+        logger.debug(f"Chat message: {chat_message}")
+        async for chunk in self.async_client.chat_stream(message=chat_message or "", model=self.model, **api_kwargs):
+            yield chunk
+
     def response(self, messages: List[Message], tool_results: Optional[List[ChatRequestToolResultsItem]] = None) -> str:
         logger.debug("---------- Cohere Response Start ----------")
         # -*- Log messages for debugging
@@ -273,6 +373,101 @@ class CohereChat(LLM):
             return assistant_message.get_content_string()
         return "Something went wrong, please try again."
 
+    async def aresponse(
+        self, messages: List[Message], tool_results: Optional[List[ChatRequestToolResultsItem]] = None
+    ) -> str:
+        logger.debug("---------- Cohere Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_timer = Timer()
+        response_timer.start()
+        response: NonStreamedChatResponse = await self.ainvoke(messages=messages, tool_results=tool_results)
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Parse response
+        response_content = response.text
+        response_tool_calls: Optional[List[CohereToolCall]] = response.tool_calls
+
+        # -*- Create assistant message
+        assistant_message = Message(role="assistant", content=response_content)
+
+        # -*- Get tool calls from response
+        if response_tool_calls:
+            tool_calls: List[Dict[str, Any]] = []
+            for tools in response_tool_calls:
+                tool_calls.append(
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": tools.name,
+                            "arguments": json.dumps(tools.parameters),
+                        },
+                    }
+                )
+            if len(tool_calls) > 0:
+                assistant_message.tool_calls = tool_calls
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Run function call
+        if assistant_message.tool_calls is not None and self.run_tools:
+            final_response = ""
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(Message(role="user", content="Could not find function to call."))
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="user", content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    final_response += f" - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    final_response += "Running:"
+                    for _f in function_calls_to_run:
+                        final_response += f"\n - {_f.get_call_str()}"
+                    final_response += "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run, role="user")
+
+            # Making sure the length of tool calls and function call results are the same to avoid unexpected behavior
+            if response_tool_calls is not None and 0 < len(function_call_results) == len(response_tool_calls):
+                # Constructs a list named tool_results, where each element is a dictionary that contains details of tool calls and their outputs.
+                # It pairs each tool call in response_tool_calls with its corresponding result in function_call_results.
+                tool_results = [
+                    ChatRequestToolResultsItem(
+                        call=tool_call, outputs=[tool_call.parameters, {"result": fn_result.content}]
+                    )
+                    for tool_call, fn_result in zip(response_tool_calls, function_call_results)
+                ]
+                messages.append(Message(role="user", content="Tool result"))
+                # logger.debug(f"Tool results: {tool_results}")
+
+            # -*- Yield new response using results of tool calls
+            final_response += await self.aresponse(messages=messages, tool_results=tool_results)
+            return final_response
+        logger.debug("---------- Cohere Async Response End ----------")
+        # -*- Return content if no function calls are present
+        if assistant_message.content is not None:
+            return assistant_message.get_content_string()
+        return "Something went wrong, please try again."
+
     def response_stream(
         self, messages: List[Message], tool_results: Optional[List[ChatRequestToolResultsItem]] = None
     ) -> Any:
@@ -374,6 +569,108 @@ class CohereChat(LLM):
             yield from self.response_stream(messages=messages, tool_results=tool_results)
         logger.debug("---------- Cohere Response End ----------")
 
+    async def aresponse_stream(
+        self, messages: List[Message], tool_results: Optional[List[ChatRequestToolResultsItem]] = None
+    ) -> Any:
+        logger.debug("---------- Cohere Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        assistant_message_content = ""
+        tool_calls: List[Dict[str, Any]] = []
+        response_tool_calls: List[CohereToolCall] = []
+        response_timer = Timer()
+        response_timer.start()
+        async for response in self.ainvoke_stream(messages=messages, tool_results=tool_results):
+            # logger.debug(f"Cohere response type: {type(response)}")
+            # logger.debug(f"Cohere response: {response}")
+
+            if isinstance(response, StreamedChatResponse_StreamStart):
+                pass
+
+            if isinstance(response, StreamedChatResponse_TextGeneration):
+                if response.text is not None:
+                    assistant_message_content += response.text
+
+                    yield response.text
+
+            # Detect if response is a tool call
+            if isinstance(response, StreamedChatResponse_ToolCallsGeneration):
+                for tc in response.tool_calls:
+                    response_tool_calls.append(tc)
+                    tool_calls.append(
+                        {
+                            "type": "function",
+                            "function": {
+                                "name": tc.name,
+                                "arguments": json.dumps(tc.parameters),
+                            },
+                        }
+                    )
+
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Create assistant message
+        assistant_message = Message(role="assistant", content=assistant_message_content)
+        # -*- Add tool calls to assistant message
+        if len(tool_calls) > 0:
+            assistant_message.tool_calls = tool_calls
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run function call
+        if assistant_message.tool_calls is not None and self.run_tools:
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(Message(role="user", content="Could not find function to call."))
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="user", content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    yield f"- Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    yield "Running:"
+                    for _f in function_calls_to_run:
+                        yield f"\n - {_f.get_call_str()}"
+                    yield "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run, role="user")
+
+            # Making sure the length of tool calls and function call results are the same to avoid unexpected behavior
+            if response_tool_calls is not None and 0 < len(function_call_results) == len(tool_calls):
+                # Constructs a list named tool_results, where each element is a dictionary that contains details of tool calls and their outputs.
+                # It pairs each tool call in response_tool_calls with its corresponding result in function_call_results.
+                tool_results = [
+                    ChatRequestToolResultsItem(
+                        call=tool_call, outputs=[tool_call.parameters, {"result": fn_result.content}]
+                    )
+                    for tool_call, fn_result in zip(response_tool_calls, function_call_results)
+                ]
+                messages.append(Message(role="user", content="Tool result"))
+                # logger.debug(f"Tool results: {tool_results}")
+
+            # -*- Yield new response using results of tool calls
+            async for content in self.aresponse_stream(messages=messages, tool_results=tool_results):
+                yield content
+        logger.debug("---------- Cohere Async Response End ----------")
+
     def get_tool_call_prompt(self) -> Optional[str]:
         if self.functions is not None and len(self.functions) > 0:
             preamble = """\
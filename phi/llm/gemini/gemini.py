@@ -1,5 +1,5 @@
 import json
-from typing import Optional, List, Iterator, Dict, Any, Union, Callable
+from typing import Optional, List, Iterator, AsyncIterator, Dict, Any, Union, Callable
 
 from micro.llm.base import LLM
 from micro.llm.message import Message
@@ -138,6 +138,17 @@ class Gemini(LLM):
             stream=True,
         )
 
+    async def ainvoke(self, messages: List[Message]) -> GenerationResponse:
+        return await self.client.generate_content_async(contents=self.convert_messages_to_contents(messages))
+
+    async def ainvoke_stream(self, messages: List[Message]) -> AsyncIterator[GenerationResponse]:
+        async_stream = await self.client.generate_content_async(
+            contents=self.convert_messages_to_contents(messages),
+            stream=True,
+        )
+        async for chunk in async_stream:  # type: ignore
+            yield chunk
+
     def response(self, messages: List[Message]) -> str:
         logger.debug("---------- VertexAI Response Start ----------")
         # -*- Log messages for debugging
@@ -236,6 +247,104 @@ class Gemini(LLM):
         logger.debug("---------- VertexAI Response End ----------")
         return assistant_message.get_content_string()
 
+    async def aresponse(self, messages: List[Message]) -> str:
+        logger.debug("---------- VertexAI Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_timer = Timer()
+        response_timer.start()
+        response: GenerationResponse = await self.ainvoke(messages=messages)
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+        # logger.debug(f"VertexAI response type: {type(response)}")
+        # logger.debug(f"VertexAI response: {response}")
+
+        # -*- Parse response
+        response_candidates: List[GenerationResponseCandidate] = response.candidates
+        response_content: GenerationResponseContent = response_candidates[0].content
+        response_role = response_content.role
+        response_parts: List[GenerationResponsePart] = response_content.parts
+        response_text: Optional[str] = None
+        response_function_calls: Optional[List[Dict[str, Any]]] = None
+
+        if len(response_parts) > 1:
+            logger.warning("Multiple content parts are not yet supported.")
+            return "More than one response part found."
+
+        _part_dict = response_parts[0].to_dict()
+        if "text" in _part_dict:
+            response_text = _part_dict.get("text")
+        if "function_call" in _part_dict:
+            if response_function_calls is None:
+                response_function_calls = []
+            response_function_calls.append(
+                {
+                    "type": "function",
+                    "function": {
+                        "name": _part_dict.get("function_call").get("name"),
+                        "arguments": json.dumps(_part_dict.get("function_call").get("args")),
+                    },
+                }
+            )
+
+        # -*- Create assistant message
+        assistant_message = Message(
+            role=response_role or "assistant",
+            content=response_text,
+        )
+        # -*- Add tool calls to assistant message
+        if response_function_calls is not None:
+            assistant_message.tool_calls = response_function_calls
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+        # TODO: Add token usage to metrics
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run function calls
+        if assistant_message.tool_calls is not None:
+            final_response = ""
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _tool_call_id = tool_call.get("id")
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(
+                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
+                    )
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    final_response += "\nRunning:"
+                    for _f in function_calls_to_run:
+                        final_response += f"\n - {_f.get_call_str()}"
+                    final_response += "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run)
+            if len(function_call_results) > 0:
+                messages.extend(function_call_results)
+            # -*- Get new response using result of tool call
+            final_response += await self.aresponse(messages=messages)
+            return final_response
+        logger.debug("---------- VertexAI Async Response End ----------")
+        return assistant_message.get_content_string()
+
     def response_stream(self, messages: List[Message]) -> Iterator[str]:
         logger.debug("---------- VertexAI Response Start ----------")
         # -*- Log messages for debugging
@@ -326,3 +435,95 @@ class Gemini(LLM):
             # -*- Yield new response using results of tool calls
             yield from self.response_stream(messages=messages)
         logger.debug("---------- VertexAI Response End ----------")
+
+    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        logger.debug("---------- VertexAI Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_role: Optional[str] = None
+        response_function_calls: Optional[List[Dict[str, Any]]] = None
+        assistant_message_content = ""
+        response_timer = Timer()
+        response_timer.start()
+        async for response in self.ainvoke_stream(messages=messages):
+            # logger.debug(f"VertexAI response type: {type(response)}")
+            # logger.debug(f"VertexAI response: {response}")
+
+            # -*- Parse response
+            response_candidates: List[GenerationResponseCandidate] = response.candidates
+            response_content: GenerationResponseContent = response_candidates[0].content
+            if response_role is None:
+                response_role = response_content.role
+            response_parts: List[GenerationResponsePart] = response_content.parts
+            _part_dict = response_parts[0].to_dict()
+
+            # -*- Return text if present, otherwise get function call
+            if "text" in _part_dict:
+                response_text = _part_dict.get("text")
+                yield response_text
+                assistant_message_content += response_text
+
+            # -*- Parse function calls
+            if "function_call" in _part_dict:
+                if response_function_calls is None:
+                    response_function_calls = []
+                response_function_calls.append(
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": _part_dict.get("function_call").get("name"),
+                            "arguments": json.dumps(_part_dict.get("function_call").get("args")),
+                        },
+                    }
+                )
+
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Create assistant message
+        assistant_message = Message(role=response_role or "assistant")
+        # -*- Add content to assistant message
+        if assistant_message_content != "":
+            assistant_message.content = assistant_message_content
+        # -*- Add tool calls to assistant message
+        if response_function_calls is not None:
+            assistant_message.tool_calls = response_function_calls
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run function calls
+        if assistant_message.tool_calls is not None:
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _tool_call_id = tool_call.get("id")
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(
+                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
+                    )
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    yield "\nRunning:"
+                    for _f in function_calls_to_run:
+                        yield f"\n - {_f.get_call_str()}"
+                    yield "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run)
+            if len(function_call_results) > 0:
+                messages.extend(function_call_results)
+            # -*- Yield new response using results of tool calls
+            async for content in self.aresponse_stream(messages=messages):
+                yield content
+        logger.debug("---------- VertexAI Async Response End ----------")
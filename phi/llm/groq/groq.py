@@ -1,15 +1,16 @@
 import httpx
-from typing import Optional, List, Iterator, Dict, Any, Union
+from typing import Optional, List, Iterator, AsyncIterator, Dict, Any, Union
 
 from phi.llm.base import LLM
 from phi.llm.message import Message
 from phi.tools.function import FunctionCall
+from micro.utils.client_registry import client_registry
 from phi.utils.log import logger
 from phi.utils.timer import Timer
 from phi.utils.tools import get_function_call_for_tool_call
 
 try:
-    from groq import Groq as GroqClient
+    from groq import Groq as GroqClient, AsyncGroq as AsyncGroqClient
 except ImportError:
     logger.error("`groq` not installed")
     raise
@@ -44,12 +45,21 @@ class Groq(LLM):
     client_params: Optional[Dict[str, Any]] = None
     # -*- Provide the Groq manually
     groq_client: Optional[GroqClient] = None
+    async_groq_client: Optional[AsyncGroqClient] = None
 
     @property
     def client(self) -> GroqClient:
         if self.groq_client:
             return self.groq_client
+        return client_registry.get_client("groq", GroqClient, self.get_client_params())
 
+    @property
+    def async_client(self) -> AsyncGroqClient:
+        if self.async_groq_client:
+            return self.async_groq_client
+        return client_registry.get_async_client("groq", AsyncGroqClient, self.get_client_params())
+
+    def get_client_params(self) -> Dict[str, Any]:
         _client_params: Dict[str, Any] = {}
         if self.api_key:
             _client_params["api_key"] = self.api_key
@@ -65,7 +75,7 @@ class Groq(LLM):
             _client_params["default_query"] = self.default_query
         if self.client_params:
             _client_params.update(self.client_params)
-        return GroqClient(**_client_params)
+        return _client_params
 
     @property
     def api_kwargs(self) -> Dict[str, Any]:
@@ -161,6 +171,23 @@ class Groq(LLM):
             **self.api_kwargs,
         )
 
+    async def ainvoke(self, messages: List[Message]) -> Any:
+        return await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[m.to_dict() for m in messages],  # type: ignore
+            **self.api_kwargs,
+        )
+
+    async def ainvoke_stream(self, messages: List[Message]) -> AsyncIterator[Any]:
+        async_stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[m.to_dict() for m in messages],  # type: ignore
+            stream=True,
+            **self.api_kwargs,
+        )
+        async for chunk in async_stream:  # type: ignore
+            yield chunk
+
     def response(self, messages: List[Message]) -> str:
         logger.debug("---------- Groq Response Start ----------")
         # -*- Log messages for debugging
@@ -238,6 +265,83 @@ class Groq(LLM):
             return assistant_message.get_content_string()
         return "Something went wrong, please try again."
 
+    async def aresponse(self, messages: List[Message]) -> str:
+        logger.debug("---------- Groq Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_timer = Timer()
+        response_timer.start()
+        response = await self.ainvoke(messages=messages)
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+        # logger.debug(f"Groq response type: {type(response)}")
+        # logger.debug(f"Groq response: {response}")
+
+        # -*- Parse response
+        response_message = response.choices[0].message
+
+        # -*- Create assistant message
+        assistant_message = Message(
+            role=response_message.role or "assistant",
+            content=response_message.content,
+        )
+        if response_message.tool_calls is not None and len(response_message.tool_calls) > 0:
+            assistant_message.tool_calls = [t.model_dump() for t in response_message.tool_calls]
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+        # Add token usage to metrics
+        if response.usage is not None:
+            self.metrics.update(response.usage.model_dump())
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run tool calls
+        if assistant_message.tool_calls is not None and len(assistant_message.tool_calls) > 0:
+            final_response = ""
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _tool_call_id = tool_call.get("id")
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(
+                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
+                    )
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    final_response += "\nRunning:"
+                    for _f in function_calls_to_run:
+                        final_response += f"\n - {_f.get_call_str()}"
+                    final_response += "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run)
+            if len(function_call_results) > 0:
+                messages.extend(function_call_results)
+            # -*- Get new response using result of tool call
+            final_response += await self.aresponse(messages=messages)
+            return final_response
+        logger.debug("---------- Groq Async Response End ----------")
+        # -*- Return content if no function calls are present
+        if assistant_message.content is not None:
+            return assistant_message.get_content_string()
+        return "Something went wrong, please try again."
+
     def response_stream(self, messages: List[Message]) -> Iterator[str]:
         logger.debug("---------- Groq Response Start ----------")
         # -*- Log messages for debugging
@@ -324,3 +428,91 @@ class Groq(LLM):
             # -*- Yield new response using results of tool calls
             yield from self.response_stream(messages=messages)
         logger.debug("---------- Groq Response End ----------")
+
+    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        logger.debug("---------- Groq Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        assistant_message_role = None
+        assistant_message_content = ""
+        assistant_message_tool_calls: Optional[List[Any]] = None
+        response_timer = Timer()
+        response_timer.start()
+        async for response in self.ainvoke_stream(messages=messages):
+            # logger.debug(f"Groq response type: {type(response)}")
+            # logger.debug(f"Groq response: {response}")
+            # -*- Parse response
+            response_delta = response.choices[0].delta
+            if assistant_message_role is None and response_delta.role is not None:
+                assistant_message_role = response_delta.role
+            response_content: Optional[str] = response_delta.content
+            response_tool_calls: Optional[List[Any]] = response_delta.tool_calls
+
+            # -*- Return content if present, otherwise get tool call
+            if response_content is not None:
+                assistant_message_content += response_content
+                yield response_content
+
+            # -*- Parse tool calls
+            if response_tool_calls is not None and len(response_tool_calls) > 0:
+                if assistant_message_tool_calls is None:
+                    assistant_message_tool_calls = []
+                assistant_message_tool_calls.extend(response_tool_calls)
+
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Create assistant message
+        assistant_message = Message(role=(assistant_message_role or "assistant"))
+        # -*- Add content to assistant message
+        if assistant_message_content != "":
+            assistant_message.content = assistant_message_content
+        # -*- Add tool calls to assistant message
+        if assistant_message_tool_calls is not None:
+            assistant_message.tool_calls = [t.model_dump() for t in assistant_message_tool_calls]
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run tool calls
+        if assistant_message.tool_calls is not None and len(assistant_message.tool_calls) > 0:
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _tool_call_id = tool_call.get("id")
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(
+                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
+                    )
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    yield "\nRunning:"
+                    for _f in function_calls_to_run:
+                        yield f"\n - {_f.get_call_str()}"
+                    yield "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run)
+            if len(function_call_results) > 0:
+                messages.extend(function_call_results)
+            # -*- Yield new response using results of tool calls
+            async for content in self.aresponse_stream(messages=messages):
+                yield content
+        logger.debug("---------- Groq Async Response End ----------")
@@ -1,16 +1,17 @@
 import json
 from textwrap import dedent
-from typing import Optional, List, Iterator, Dict, Any, Mapping, Union
+from typing import Optional, List, Iterator, AsyncIterator, Dict, Any, Mapping, Union
 
 from micro.llm.base import LLM
 from micro.llm.message import Message
 from micro.tools.function import FunctionCall
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 from micro.utils.timer import Timer
 from micro.utils.tools import get_function_call_for_tool_call
 
 try:
-    from ollama import Client as OllamaClient
+    from ollama import Client as OllamaClient, AsyncClient as AsyncOllamaClient
 except ImportError:
     logger.error("`ollama` not installed")
     raise
@@ -26,6 +27,7 @@ class Ollama(LLM):
     keep_alive: Optional[Union[float, str]] = None
     client_kwargs: Optional[Dict[str, Any]] = None
     ollama_client: Optional[OllamaClient] = None
+    async_ollama_client: Optional[AsyncOllamaClient] = None
     # Maximum number of function calls allowed across all iterations.
     function_call_limit: int = 5
     # Deactivate tool calls after 1 tool call
@@ -37,15 +39,26 @@ class Ollama(LLM):
     def client(self) -> OllamaClient:
         if self.ollama_client:
             return self.ollama_client
+        return client_registry.get_client("ollama", OllamaClient, self.get_client_params(), http_client_param=None)
 
-        _ollama_params: Dict[str, Any] = {}
+    @property
+    def async_client(self) -> AsyncOllamaClient:
+        if self.async_ollama_client:
+            return self.async_ollama_client
+        return client_registry.get_async_client(
+            "ollama", AsyncOllamaClient, self.get_client_params(), http_client_param=None
+        )
+
+    def get_client_params(self) -> Dict[str, Any]:
+        # The ollama clients pass extra arguments to their httpx client
+        _ollama_params: Dict[str, Any] = client_registry.get_http_client_kwargs()
         if self.host:
             _ollama_params["host"] = self.host
         if self.timeout:
             _ollama_params["timeout"] = self.timeout
         if self.client_kwargs:
             _ollama_params.update(self.client_kwargs)
-        return OllamaClient(**_ollama_params)
+        return _ollama_params
 
     @property
     def api_kwargs(self) -> Dict[str, Any]:
@@ -99,6 +112,23 @@ class Ollama(LLM):
             **self.api_kwargs,
         )  # type: ignore
 
+    async def ainvoke(self, messages: List[Message]) -> Mapping[str, Any]:
+        return await self.async_client.chat(
+            model=self.model,
+            messages=[self.to_llm_message(m) for m in messages],
+            **self.api_kwargs,
+        )
+
+    async def ainvoke_stream(self, messages: List[Message]) -> AsyncIterator[Mapping[str, Any]]:
+        async_stream = await self.async_client.chat(
+            model=self.model,
+            messages=[self.to_llm_message(m) for m in messages],
+            stream=True,
+            **self.api_kwargs,
+        )
+        async for chunk in async_stream:  # type: ignore
+            yield chunk
+
     def deactivate_function_calls(self) -> None:
         # Deactivate tool calls by turning off JSON mode after 1 tool call
         # This is triggered when the function call limit is reached.
@@ -212,6 +242,114 @@ class Ollama(LLM):
             return assistant_message.get_content_string()
         return "Something went wrong, please try again."
 
+    async def aresponse(self, messages: List[Message]) -> str:
+        logger.debug("---------- Ollama Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_timer = Timer()
+        response_timer.start()
+        response: Mapping[str, Any] = await self.ainvoke(messages=messages)
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+        # logger.debug(f"Ollama response type: {type(response)}")
+        # logger.debug(f"Ollama response: {response}")
+
+        # -*- Parse response
+        response_message: Mapping[str, Any] = response.get("message")  # type: ignore
+        response_role = response_message.get("role")
+        response_content: Optional[str] = response_message.get("content")
+
+        # -*- Create assistant message
+        assistant_message = Message(
+            role=response_role or "assistant",
+            content=response_content,
+        )
+        # Check if the response is a tool call
+        try:
+            if response_content is not None:
+                _tool_call_content = response_content.strip()
+                if _tool_call_content.startswith("{") and _tool_call_content.endswith("}"):
+                    _tool_call_content_json = json.loads(_tool_call_content)
+                    if "tool_calls" in _tool_call_content_json:
+                        assistant_tool_calls = _tool_call_content_json.get("tool_calls")
+                        if isinstance(assistant_tool_calls, list):
+                            # Build tool calls
+                            tool_calls: List[Dict[str, Any]] = []
+                            logger.debug(f"Building tool calls from {assistant_tool_calls}")
+                            for tool_call in assistant_tool_calls:
+                                tool_call_name = tool_call.get("name")
+                                tool_call_args = tool_call.get("arguments")
+                                _function_def = {"name": tool_call_name}
+                                if tool_call_args is not None:
+                                    _function_def["arguments"] = json.dumps(tool_call_args)
+                                tool_calls.append(
+                                    {
+                                        "type": "function",
+                                        "function": _function_def,
+                                    }
+                                )
+                            assistant_message.tool_calls = tool_calls
+                            assistant_message.role = "assistant"
+        except Exception:
+            logger.warning(f"Could not parse tool calls from response: {response_content}")
+            pass
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run function call
+        if assistant_message.tool_calls is not None and self.run_tools:
+            final_response = ""
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(Message(role="user", content="Could not find function to call."))
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="user", content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    final_response += "\nRunning:"
+                    for _f in function_calls_to_run:
+                        final_response += f"\n - {_f.get_call_str()}"
+                    final_response += "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run, role="user")
+            if len(function_call_results) > 0:
+                messages.extend(function_call_results)
+                # Reconfigure messages so the LLM is reminded of the original task
+                if self.add_user_message_after_tool_call:
+                    messages = self.add_original_user_message(messages)
+
+            # Deactivate tool calls by turning off JSON mode after 1 tool call
+            if self.deactivate_tools_after_use:
+                self.deactivate_function_calls()
+
+            # -*- Yield new response using results of tool calls
+            final_response += await self.aresponse(messages=messages)
+            return final_response
+        logger.debug("---------- Ollama Async Response End ----------")
+        # -*- Return content if no function calls are present
+        if assistant_message.content is not None:
+            return assistant_message.get_content_string()
+        return "Something went wrong, please try again."
+
     def response_stream(self, messages: List[Message]) -> Iterator[str]:
         logger.debug("---------- Ollama Response Start ----------")
         # -*- Log messages for debugging
@@ -373,6 +511,168 @@ class Ollama(LLM):
             yield from self.response_stream(messages=messages)
         logger.debug("---------- Ollama Response End ----------")
 
+    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        logger.debug("---------- Ollama Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        assistant_message_content = ""
+        response_is_tool_call = False
+        tool_call_bracket_count = 0
+        is_last_tool_call_bracket = False
+        completion_tokens = 0
+        time_to_first_token = None
+        response_timer = Timer()
+        response_timer.start()
+        async for response in self.ainvoke_stream(messages=messages):
+            completion_tokens += 1
+            if completion_tokens == 1:
+                time_to_first_token = response_timer.elapsed
+                logger.debug(f"Time to first token: {time_to_first_token:.4f}s")
+
+            # -*- Parse response
+            # logger.info(f"Ollama partial response: {response}")
+            # logger.info(f"Ollama partial response type: {type(response)}")
+            response_message: Optional[dict] = response.get("message")
+            response_content = response_message.get("content") if response_message else None
+            # logger.info(f"Ollama partial response content: {response_content}")
+
+            # Add response content to assistant message
+            if response_content is not None:
+                assistant_message_content += response_content
+
+            # Strip out tool calls from the response
+            # If the response is a tool call, it will start with a {
+            if not response_is_tool_call and assistant_message_content.strip().startswith("{"):
+                response_is_tool_call = True
+
+            # If the response is a tool call, count the number of brackets
+            if response_is_tool_call and response_content is not None:
+                if "{" in response_content.strip():
+                    # Add the number of opening brackets to the count
+                    tool_call_bracket_count += response_content.strip().count("{")
+                    # logger.debug(f"Tool call bracket count: {tool_call_bracket_count}")
+                if "}" in response_content.strip():
+                    # Subtract the number of closing brackets from the count
+                    tool_call_bracket_count -= response_content.strip().count("}")
+                    # Check if the response is the last bracket
+                    if tool_call_bracket_count == 0:
+                        response_is_tool_call = False
+                        is_last_tool_call_bracket = True
+                    # logger.debug(f"Tool call bracket count: {tool_call_bracket_count}")
+
+            # -*- Yield content if not a tool call and content is not None
+            if not response_is_tool_call and response_content is not None:
+                if is_last_tool_call_bracket and response_content.strip().endswith("}"):
+                    is_last_tool_call_bracket = False
+                    continue
+
+                yield response_content
+
+        response_timer.stop()
+        logger.debug(f"Tokens generated: {completion_tokens}")
+        if completion_tokens > 0:
+            logger.debug(f"Time per output token: {response_timer.elapsed / completion_tokens:.4f}s")
+            logger.debug(f"Throughput: {completion_tokens / response_timer.elapsed:.4f} tokens/s")
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+
+        # -*- Create assistant message
+        assistant_message = Message(
+            role="assistant",
+            content=assistant_message_content,
+        )
+        # Check if the response is a tool call
+        try:
+            if response_is_tool_call and assistant_message_content != "":
+                _tool_call_content = assistant_message_content.strip()
+                if _tool_call_content.startswith("{") and _tool_call_content.endswith("}"):
+                    _tool_call_content_json = json.loads(_tool_call_content)
+                    if "tool_calls" in _tool_call_content_json:
+                        assistant_tool_calls = _tool_call_content_json.get("tool_calls")
+                        if isinstance(assistant_tool_calls, list):
+                            # Build tool calls
+                            tool_calls: List[Dict[str, Any]] = []
+                            logger.debug(f"Building tool calls from {assistant_tool_calls}")
+                            for tool_call in assistant_tool_calls:
+                                tool_call_name = tool_call.get("name")
+                                tool_call_args = tool_call.get("arguments")
+                                _function_def = {"name": tool_call_name}
+                                if tool_call_args is not None:
+                                    _function_def["arguments"] = json.dumps(tool_call_args)
+                                tool_calls.append(
+                                    {
+                                        "type": "function",
+                                        "function": _function_def,
+                                    }
+                                )
+                            assistant_message.tool_calls = tool_calls
+        except Exception:
+            logger.warning(f"Could not parse tool calls from response: {assistant_message_content}")
+            pass
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = f"{response_timer.elapsed:.4f}"
+        if time_to_first_token is not None:
+            assistant_message.metrics["time_to_first_token"] = f"{time_to_first_token:.4f}s"
+        if completion_tokens > 0:
+            assistant_message.metrics["time_per_output_token"] = f"{response_timer.elapsed / completion_tokens:.4f}s"
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+        if time_to_first_token is not None:
+            if "time_to_first_token" not in self.metrics:
+                self.metrics["time_to_first_token"] = []
+            self.metrics["time_to_first_token"].append(f"{time_to_first_token:.4f}s")
+        if completion_tokens > 0:
+            if "tokens_per_second" not in self.metrics:
+                self.metrics["tokens_per_second"] = []
+            self.metrics["tokens_per_second"].append(f"{completion_tokens / response_timer.elapsed:.4f}")
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run function call
+        if assistant_message.tool_calls is not None and self.run_tools:
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(Message(role="user", content="Could not find function to call."))
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="user", content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    yield "\nRunning:"
+                    for _f in function_calls_to_run:
+                        yield f"\n - {_f.get_call_str()}"
+                    yield "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run, role="user")
+            # Add results of the function calls to the messages
+            if len(function_call_results) > 0:
+                messages.extend(function_call_results)
+                # Reconfigure messages so the LLM is reminded of the original task
+                if self.add_user_message_after_tool_call:
+                    messages = self.add_original_user_message(messages)
+
+            # Deactivate tool calls by turning off JSON mode after 1 tool call
+            if self.deactivate_tools_after_use:
+                self.deactivate_function_calls()
+
+            # -*- Yield new response using results of tool calls
+            async for content in self.aresponse_stream(messages=messages):
+                yield content
+        logger.debug("---------- Ollama Async Response End ----------")
+
     def add_original_user_message(self, messages: List[Message]) -> List[Message]:
         # Add the original user message to the messages to remind the LLM of the original task
         original_user_message_content = None
@@ -1,11 +1,12 @@
 import json
 from textwrap import dedent
-from typing import Optional, List, Iterator, Dict, Any, Mapping, Union
+from typing import Optional, List, Iterator, AsyncIterator, Dict, Any, Mapping, Union
 
 from micro.llm.base import LLM
 from micro.llm.message import Message
 from micro.llm.exceptions import InvalidToolCallException
 from micro.tools.function import FunctionCall
+from micro.utils.client_registry import client_registry
 from micro.utils.log import logger
 from micro.utils.timer import Timer
 from micro.utils.tools import (
@@ -15,7 +16,7 @@ from micro.utils.tools import (
 )
 
 try:
-    from ollama import Client as OllamaClient
+    from ollama import Client as OllamaClient, AsyncClient as AsyncOllamaClient
 except ImportError:
     logger.error("`ollama` not installed")
     raise
@@ -31,6 +32,7 @@ class OllamaTools(LLM):
     keep_alive: Optional[Union[float, str]] = None
     client_kwargs: Optional[Dict[str, Any]] = None
     ollama_client: Optional[OllamaClient] = None
+    async_ollama_client: Optional[AsyncOllamaClient] = None
     # Maximum number of function calls allowed across all iterations.
     function_call_limit: int = 5
     # After a tool call is run, add the user message as a reminder to the LLM
@@ -40,15 +42,26 @@ class OllamaTools(LLM):
     def client(self) -> OllamaClient:
         if self.ollama_client:
             return self.ollama_client
+        return client_registry.get_client("ollama", OllamaClient, self.get_client_params(), http_client_param=None)
 
-        _ollama_params: Dict[str, Any] = {}
+    @property
+    def async_client(self) -> AsyncOllamaClient:
+        if self.async_ollama_client:
+            return self.async_ollama_client
+        return client_registry.get_async_client(
+            "ollama", AsyncOllamaClient, self.get_client_params(), http_client_param=None
+        )
+
+    def get_client_params(self) -> Dict[str, Any]:
+        # The ollama clients pass extra arguments to their httpx client
+        _ollama_params: Dict[str, Any] = client_registry.get_http_client_kwargs()
         if self.host:
             _ollama_params["host"] = self.host
         if self.timeout:
             _ollama_params["timeout"] = self.timeout
         if self.client_kwargs:
             _ollama_params.update(self.client_kwargs)
-        return OllamaClient(**_ollama_params)
+        return _ollama_params
 
     @property
     def api_kwargs(self) -> Dict[str, Any]:
@@ -102,6 +115,23 @@ class OllamaTools(LLM):
             **self.api_kwargs,
         )  # type: ignore
 
+    async def ainvoke(self, messages: List[Message]) -> Mapping[str, Any]:
+        return await self.async_client.chat(
+            model=self.model,
+            messages=[self.to_llm_message(m) for m in messages],
+            **self.api_kwargs,
+        )
+
+    async def ainvoke_stream(self, messages: List[Message]) -> AsyncIterator[Mapping[str, Any]]:
+        async_stream = await self.async_client.chat(
+            model=self.model,
+            messages=[self.to_llm_message(m) for m in messages],
+            stream=True,
+            **self.api_kwargs,
+        )
+        async for chunk in async_stream:  # type: ignore
+            yield chunk
+
     def deactivate_function_calls(self) -> None:
         # Deactivate tool calls by turning off JSON mode after 1 tool call
         # This is triggered when the function call limit is reached.
@@ -239,6 +269,138 @@ class OllamaTools(LLM):
             return assistant_message.get_content_string()
         return "Something went wrong, please try again."
 
+    async def aresponse(self, messages: List[Message]) -> str:
+        logger.debug("---------- OllamaTools Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        response_timer = Timer()
+        response_timer.start()
+        response: Mapping[str, Any] = await self.ainvoke(messages=messages)
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+        # logger.debug(f"Ollama response type: {type(response)}")
+        # logger.debug(f"Ollama response: {response}")
+
+        # -*- Parse response
+        response_message: Mapping[str, Any] = response.get("message")  # type: ignore
+        response_role = response_message.get("role")
+        response_content: Optional[str] = response_message.get("content")
+
+        # -*- Create assistant message
+        assistant_message = Message(
+            role=response_role or "assistant",
+            content=response_content.strip() if response_content is not None else None,
+        )
+        # Check if the response contains a tool call
+        try:
+            if response_content is not None:
+                if "<tool_call>" in response_content and "</tool_call>" in response_content:
+                    # List of tool calls added to the assistant message
+                    tool_calls: List[Dict[str, Any]] = []
+                    # Break the response into tool calls
+                    tool_call_responses = response_content.split("</tool_call>")
+                    for tool_call_response in tool_call_responses:
+                        # Add back the closing tag if this is not the last tool call
+                        if tool_call_response != tool_call_responses[-1]:
+                            tool_call_response += "</tool_call>"
+
+                        if "<tool_call>" in tool_call_response and "</tool_call>" in tool_call_response:
+                            # Extract tool call string from response
+                            tool_call_content = extract_tool_call_from_string(tool_call_response)
+                            # Convert the extracted string to a dictionary
+                            try:
+                                logger.debug(f"Tool call content: {tool_call_content}")
+                                tool_call_dict = json.loads(tool_call_content)
+                            except json.JSONDecodeError:
+                                raise ValueError(f"Could not parse tool call from: {tool_call_content}")
+
+                            tool_call_name = tool_call_dict.get("name")
+                            tool_call_args = tool_call_dict.get("arguments")
+                            function_def = {"name": tool_call_name}
+                            if tool_call_args is not None:
+                                function_def["arguments"] = json.dumps(tool_call_args)
+                            tool_calls.append(
+                                {
+                                    "type": "function",
+                                    "function": function_def,
+                                }
+                            )
+
+                    # If tool call parsing is successful, add tool calls to the assistant message
+                    if len(tool_calls) > 0:
+                        assistant_message.tool_calls = tool_calls
+        except Exception as e:
+            logger.warning(e)
+            pass
+
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+        assistant_message.log()
+
+        # -*- Parse and run function call
+        if assistant_message.tool_calls is not None and self.run_tools:
+            # Remove the tool call from the response content
+            final_response = remove_tool_calls_from_string(assistant_message.get_content_string())
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(Message(role="user", content="Could not find function to call."))
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="user", content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    final_response += f" - Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    final_response += "Running:"
+                    for _f in function_calls_to_run:
+                        final_response += f"\n - {_f.get_call_str()}"
+                    final_response += "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run, role="user")
+            if len(function_call_results) > 0:
+                fc_responses = []
+                for _fc_message in function_call_results:
+                    fc_responses.append(
+                        json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content})
+                    )
+
+                tool_response_message_content = "<tool_response>\n" + "\n".join(fc_responses) + "\n</tool_response>"
+                messages.append(Message(role="user", content=tool_response_message_content))
+
+                for _fc_message in function_call_results:
+                    _fc_message.content = (
+                        "<tool_response>\n"
+                        + json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content})
+                        + "\n</tool_response>"
+                    )
+                    messages.append(_fc_message)
+                # Reconfigure messages so the LLM is reminded of the original task
+                if self.add_user_message_after_tool_call:
+                    messages = self.add_original_user_message(messages)
+
+            # -*- Yield new response using results of tool calls
+            final_response += await self.aresponse(messages=messages)
+            return final_response
+        logger.debug("---------- OllamaTools Async Response End ----------")
+        # -*- Return content if no function calls are present
+        if assistant_message.content is not None:
+            return assistant_message.get_content_string()
+        return "Something went wrong, please try again."
+
     def response_stream(self, messages: List[Message]) -> Iterator[str]:
         logger.debug("---------- OllamaTools Response Start ----------")
         # -*- Log messages for debugging
@@ -402,6 +564,170 @@ class OllamaTools(LLM):
             yield from self.response_stream(messages=messages)
         logger.debug("---------- OllamaTools Response End ----------")
 
+    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        logger.debug("---------- OllamaTools Async Response Start ----------")
+        # -*- Log messages for debugging
+        for m in messages:
+            m.log()
+
+        assistant_message_content = ""
+        tool_calls_counter = 0
+        response_is_tool_call = False
+        is_closing_tool_call_tag = False
+        completion_tokens = 0
+        response_timer = Timer()
+        response_timer.start()
+        async for response in self.ainvoke_stream(messages=messages):
+            completion_tokens += 1
+
+            # -*- Parse response
+            # logger.info(f"Ollama partial response: {response}")
+            # logger.info(f"Ollama partial response type: {type(response)}")
+            response_message: Optional[dict] = response.get("message")
+            response_content = response_message.get("content") if response_message else None
+            # logger.info(f"Ollama partial response content: {response_content}")
+
+            # Add response content to assistant message
+            if response_content is not None:
+                assistant_message_content += response_content
+
+            # Detect if response is a tool call
+            # If the response is a tool call, it will start a <tool token
+            if not response_is_tool_call and "<tool" in response_content:
+                response_is_tool_call = True
+                # logger.debug(f"Response is tool call: {response_is_tool_call}")
+
+            # If response is a tool call, count the number of tool calls
+            if response_is_tool_call:
+                # If the response is an opening tool call tag, increment the tool call counter
+                if "<tool" in response_content:
+                    tool_calls_counter += 1
+
+                # If the response is a closing tool call tag, decrement the tool call counter
+                if assistant_message_content.strip().endswith("</tool_call>"):
+                    tool_calls_counter -= 1
+
+                # If the response is a closing tool call tag and the tool call counter is 0,
+                # tool call response is complete
+                if tool_calls_counter == 0 and response_content.strip().endswith(">"):
+                    response_is_tool_call = False
+                    # logger.debug(f"Response is tool call: {response_is_tool_call}")
+                    is_closing_tool_call_tag = True
+
+            # -*- Yield content if not a tool call and content is not None
+            if not response_is_tool_call and response_content is not None:
+                if is_closing_tool_call_tag and response_content.strip().endswith(">"):
+                    is_closing_tool_call_tag = False
+                    continue
+
+                yield response_content
+
+        response_timer.stop()
+        logger.debug(f"Time to generate response: {response_timer.elapsed:.4f}s")
+        # Strip extra whitespaces
+        assistant_message_content = assistant_message_content.strip()
+
+        # -*- Create assistant message
+        assistant_message = Message(
+            role="assistant",
+            content=assistant_message_content,
+        )
+        # -*- Update usage metrics
+        # Add response time to metrics
+        assistant_message.metrics["time"] = response_timer.elapsed
+        if "response_times" not in self.metrics:
+            self.metrics["response_times"] = []
+        self.metrics["response_times"].append(response_timer.elapsed)
+
+        # -*- Add assistant message to messages
+        messages.append(assistant_message)
+
+        # Parse tool calls from the assistant message content
+        try:
+            if "<tool_call>" in assistant_message_content and "</tool_call>" in assistant_message_content:
+                # List of tool calls added to the assistant message
+                tool_calls: List[Dict[str, Any]] = []
+                # Break the response into tool calls
+                tool_call_responses = assistant_message_content.split("</tool_call>")
+                for tool_call_response in tool_call_responses:
+                    # Add back the closing tag if this is not the last tool call
+                    if tool_call_response != tool_call_responses[-1]:
+                        tool_call_response += "</tool_call>"
+
+                    if "<tool_call>" in tool_call_response and "</tool_call>" in tool_call_response:
+                        # Extract tool call string from response
+                        tool_call_content = extract_tool_call_from_string(tool_call_response)
+                        # Convert the extracted string to a dictionary
+                        try:
+                            logger.debug(f"Tool call content: {tool_call_content}")
+                            tool_call_dict = json.loads(tool_call_content)
+                        except json.JSONDecodeError as e:
+                            raise InvalidToolCallException(f"Error parsing tool call: {tool_call_content}. Error: {e}")
+
+                        tool_call_name = tool_call_dict.get("name")
+                        tool_call_args = tool_call_dict.get("arguments")
+                        function_def = {"name": tool_call_name}
+                        if tool_call_args is not None:
+                            function_def["arguments"] = json.dumps(tool_call_args)
+                        tool_calls.append(
+                            {
+                                "type": "function",
+                                "function": function_def,
+                            }
+                        )
+
+                # If tool call parsing is successful, add tool calls to the assistant message
+                if len(tool_calls) > 0:
+                    assistant_message.tool_calls = tool_calls
+        except Exception as e:
+            yield str(e)
+            logger.warning(e)
+            pass
+
+        assistant_message.log()
+
+        # -*- Parse and run function call
+        if assistant_message.tool_calls is not None and self.run_tools:
+            function_calls_to_run: List[FunctionCall] = []
+            for tool_call in assistant_message.tool_calls:
+                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+                if _function_call is None:
+                    messages.append(Message(role="user", content="Could not find function to call."))
+                    continue
+                if _function_call.error is not None:
+                    messages.append(Message(role="user", content=_function_call.error))
+                    continue
+                function_calls_to_run.append(_function_call)
+
+            if self.show_tool_calls:
+                if len(function_calls_to_run) == 1:
+                    yield f"- Running: {function_calls_to_run[0].get_call_str()}\n\n"
+                elif len(function_calls_to_run) > 1:
+                    yield "Running:"
+                    for _f in function_calls_to_run:
+                        yield f"\n - {_f.get_call_str()}"
+                    yield "\n\n"
+
+            function_call_results = await self.arun_function_calls(function_calls_to_run, role="user")
+            # Add results of the function calls to the messages
+            if len(function_call_results) > 0:
+                fc_responses = []
+                for _fc_message in function_call_results:
+                    fc_responses.append(
+                        json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content})
+                    )
+
+                tool_response_message_content = "<tool_response>\n" + "\n".join(fc_responses) + "\n</tool_response>"
+                messages.append(Message(role="user", content=tool_response_message_content))
+                # Reconfigure messages so the LLM is reminded of the original task
+                if self.add_user_message_after_tool_call:
+                    messages = self.add_original_user_message(messages)
+
+            # -*- Yield new response using results of tool calls
+            async for content in self.aresponse_stream(messages=messages):
+                yield content
+        logger.debug("---------- OllamaTools Async Response End ----------")
+
     def add_original_user_message(self, messages: List[Message]) -> List[Message]:
         # Add the original user message to the messages to remind the LLM of the original task
         original_user_message_content = None
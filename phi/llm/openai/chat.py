@@ -4,6 +4,7 @@ from typing import Optional, List, Iterator, Dict, Any, Union, Tuple
 from phi.llm.base import LLM
 from phi.llm.message import Message
 from phi.tools.function import FunctionCall
+from micro.utils.client_registry import client_registry
 from phi.utils.log import logger
 from phi.utils.timer import Timer
 from phi.utils.functions import get_function_call
@@ -64,13 +65,7 @@ class OpenAIChat(LLM):
     # Deprecated: will be removed in v3
     openai_client: Optional[OpenAIClient] = None
 
-    def get_client(self) -> OpenAIClient:
-        if self.client:
-            return self.client
-
-        if self.openai_client:
-            return self.openai_client
-
+    def get_client_params(self) -> Dict[str, Any]:
         _client_params: Dict[str, Any] = {}
         if self.api_key:
             _client_params["api_key"] = self.api_key
@@ -90,36 +85,23 @@ class OpenAIChat(LLM):
             _client_params["http_client"] = self.http_client
         if self.client_params:
             _client_params.update(self.client_params)
-        return OpenAIClient(**_client_params)
+        return _client_params
+
+    def get_client(self) -> OpenAIClient:
+        if self.client:
+            return self.client
+
+        if self.openai_client:
+            return self.openai_client
+
+        # Shared with other LLMs and embedders using the same parameters, see client_registry
+        return client_registry.get_client("openai", OpenAIClient, self.get_client_params())
 
     def get_async_client(self) -> AsyncOpenAIClient:
         if self.async_client:
             return self.async_client
 
-        _client_params: Dict[str, Any] = {}
-        if self.api_key:
-            _client_params["api_key"] = self.api_key
-        if self.organization:
-            _client_params["organization"] = self.organization
-        if self.base_url:
-            _client_params["base_url"] = self.base_url
-        if self.timeout:
-            _client_params["timeout"] = self.timeout
-        if self.max_retries:
-            _client_params["max_retries"] = self.max_retries
-        if self.default_headers:
-            _client_params["default_headers"] = self.default_headers
-        if self.default_query:
-            _client_params["default_query"] = self.default_query
-        if self.http_client:
-            _client_params["http_client"] = self.http_client
-        else:
-            _client_params["http_client"] = httpx.AsyncClient(
-                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100)
-            )
-        if self.client_params:
-            _client_params.update(self.client_params)
-        return AsyncOpenAIClient(**_client_params)
+        return client_registry.get_async_client("openai", AsyncOpenAIClient, self.get_client_params())
 
     @property
     def api_kwargs(self) -> Dict[str, Any]:
@@ -232,51 +214,75 @@ class OpenAIChat(LLM):
         async for chunk in async_stream:  # type: ignore
             yield chunk
 
-    def run_function(self, function_call: Dict[str, Any]) -> Tuple[Message, Optional[FunctionCall]]:
+    def get_function_to_run(self, function_call: Dict[str, Any]) -> Tuple[Optional[Message], Optional[FunctionCall]]:
+        """Returns the function call to run, or the message to respond with if it cannot run"""
         _function_name = function_call.get("name")
         _function_arguments_str = function_call.get("arguments")
-        if _function_name is not None:
-            # Get function call
-            _function_call = get_function_call(
-                name=_function_name,
-                arguments=_function_arguments_str,
-                functions=self.functions,
-            )
-            if _function_call is None:
-                return Message(role="function", content="Could not find function to call."), None
-            if _function_call.error is not None:
-                return Message(role="function", content=_function_call.error), _function_call
-
-            if self.function_call_stack is None:
-                self.function_call_stack = []
-
-            # -*- Check function call limit
-            if len(self.function_call_stack) > self.function_call_limit:
-                self.tool_choice = "none"
-                return Message(
-                    role="function",
-                    content=f"Function call limit ({self.function_call_limit}) exceeded.",
-                ), _function_call
-
-            # -*- Run function call
-            self.function_call_stack.append(_function_call)
-            _function_call_timer = Timer()
-            _function_call_timer.start()
-            _function_call.execute()
-            _function_call_timer.stop()
-            _function_call_message = Message(
+        if _function_name is None:
+            return Message(role="function", content="Function name is None."), None
+
+        # Get function call
+        _function_call = get_function_call(
+            name=_function_name,
+            arguments=_function_arguments_str,
+            functions=self.functions,
+        )
+        if _function_call is None:
+            return Message(role="function", content="Could not find function to call."), None
+        if _function_call.error is not None:
+            return Message(role="function", content=_function_call.error), _function_call
+
+        if self.function_call_stack is None:
+            self.function_call_stack = []
+
+        # -*- Check function call limit
+        if len(self.function_call_stack) > self.function_call_limit:
+            self.tool_choice = "none"
+            return Message(
                 role="function",
-                name=_function_call.function.name,
-                content=_function_call.result,
-                metrics={"time": _function_call_timer.elapsed},
-            )
-            if "function_call_times" not in self.metrics:
-                self.metrics["function_call_times"] = {}
-            if _function_call.function.name not in self.metrics["function_call_times"]:
-                self.metrics["function_call_times"][_function_call.function.name] = []
-            self.metrics["function_call_times"][_function_call.function.name].append(_function_call_timer.elapsed)
-            return _function_call_message, _function_call
-        return Message(role="function", content="Function name is None."), None
+                content=f"Function call limit ({self.function_call_limit}) exceeded.",
+            ), _function_call
+
+        self.function_call_stack.append(_function_call)
+        return None, _function_call
+
+    def get_function_message(self, function_call: FunctionCall, elapsed: float) -> Message:
+        _function_call_message = Message(
+            role="function",
+            name=function_call.function.name,
+            content=function_call.result,
+            metrics={"time": elapsed},
+        )
+        if "function_call_times" not in self.metrics:
+            self.metrics["function_call_times"] = {}
+        if function_call.function.name not in self.metrics["function_call_times"]:
+            self.metrics["function_call_times"][function_call.function.name] = []
+        self.metrics["function_call_times"][function_call.function.name].append(elapsed)
+        return _function_call_message
+
+    def run_function(self, function_call: Dict[str, Any]) -> Tuple[Message, Optional[FunctionCall]]:
+        _message, _function_call = self.get_function_to_run(function_call)
+        if _message is not None or _function_call is None:
+            return _message or Message(role="function", content="Could not find function to call."), _function_call
+
+        # -*- Run function call
+        _function_call_timer = Timer()
+        _function_call_timer.start()
+        _function_call.execute()
+        _function_call_timer.stop()
+        return self.get_function_message(_function_call, _function_call_timer.elapsed), _function_call
+
+    async def arun_function(self, function_call: Dict[str, Any]) -> Tuple[Message, Optional[FunctionCall]]:
+        _message, _function_call = self.get_function_to_run(function_call)
+        if _message is not None or _function_call is None:
+            return _message or Message(role="function", content="Could not find function to call."), _function_call
+
+        # -*- Run function call without blocking the event loop
+        _function_call_timer = Timer()
+        _function_call_timer.start()
+        await _function_call.aexecute()
+        _function_call_timer.stop()
+        return self.get_function_message(_function_call, _function_call_timer.elapsed), _function_call
 
     def response(self, messages: List[Message]) -> str:
         logger.debug("---------- OpenAI Response Start ----------")
@@ -473,7 +479,9 @@ class OpenAIChat(LLM):
         need_to_run_functions = assistant_message.function_call is not None or assistant_message.tool_calls is not None
         if need_to_run_functions and self.run_tools:
             if assistant_message.function_call is not None:
-                function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
+                function_call_message, function_call = await self.arun_function(
+                    function_call=assistant_message.function_call
+                )
                 messages.append(function_call_message)
                 # -*- Get new response using result of function call
                 final_response = ""
@@ -516,7 +524,7 @@ class OpenAIChat(LLM):
                             final_response += f"\n - {_f.get_call_str()}"
                         final_response += "\n\n"
 
-                function_call_results = self.run_function_calls(function_calls_to_run)
+                function_call_results = await self.arun_function_calls(function_calls_to_run)
                 if len(function_call_results) > 0:
                     messages.extend(function_call_results)
                 # -*- Get new response using result of tool call
@@ -953,7 +961,9 @@ class OpenAIChat(LLM):
         need_to_run_functions = assistant_message.function_call is not None or assistant_message.tool_calls is not None
         if need_to_run_functions and self.run_tools:
             if assistant_message.function_call is not None:
-                function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
+                function_call_message, function_call = await self.arun_function(
+                    function_call=assistant_message.function_call
+                )
                 messages.append(function_call_message)
                 if self.show_tool_calls and function_call is not None:
                     yield f"\n - Running: {function_call.get_call_str()}\n\n"
@@ -996,7 +1006,7 @@ class OpenAIChat(LLM):
                             yield f"\n - {_f.get_call_str()}"
                         yield "\n\n"
 
-                function_call_results = self.run_function_calls(function_calls_to_run)
+                function_call_results = await self.arun_function_calls(function_calls_to_run)
                 if len(function_call_results) > 0:
                     messages.extend(function_call_results)
                     # Code to show function call results
@@ -0,0 +1 @@
+from micro.tokenizer.base import Tokenizer
@@ -0,0 +1,24 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class Tokenizer(BaseModel):
+    """Base class for local tokenizers, used to measure text in tokens"""
+
+    @property
+    def name(self) -> str:
+        """Identifies the vocabulary, tokenizers with the same name count the same number of tokens"""
+        return self.__class__.__name__
+
+    def encode(self, text: str) -> List[int]:
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Returns the number of tokens in each text.
+        Tokenizers that can encode multiple texts at once should override this method.
+        """
+        return [self.count_tokens(text) for text in texts]
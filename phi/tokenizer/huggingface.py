@@ -0,0 +1,38 @@
+from functools import lru_cache
+from os import path
+from typing import List
+
+from micro.tokenizer.base import Tokenizer
+
+try:
+    from tokenizers import Tokenizer as HFTokenizer
+except ImportError:
+    raise ImportError("`tokenizers` not installed")
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: str) -> HFTokenizer:
+    """Loads a tokenizer once per process, from a tokenizer.json file or the Hugging Face Hub"""
+    if path.isfile(model):
+        return HFTokenizer.from_file(model)
+    return HFTokenizer.from_pretrained(model)
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    # Name of the model on the Hugging Face Hub, e.g. "BAAI/bge-small-en-v1.5", or the path to a tokenizer.json file
+    model: str
+
+    @property
+    def tokenizer(self) -> HFTokenizer:
+        return get_tokenizer(self.model)
+
+    @property
+    def name(self) -> str:
+        return f"huggingface:{self.model}"
+
+    def encode(self, text: str) -> List[int]:
+        return self.tokenizer.encode(text, add_special_tokens=False).ids
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        # encode_batch encodes the texts in parallel
+        return [len(encoding.ids) for encoding in self.tokenizer.encode_batch(texts, add_special_tokens=False)]
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+
+from micro.tokenizer.base import Tokenizer
+
+try:
+    import tiktoken
+except ImportError:
+    raise ImportError("`tiktoken` not installed")
+
+# Batches with fewer characters are encoded in the calling thread
+_MIN_THREADED_BATCH_CHARS = 256 * 1024
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str, model: Optional[str] = None) -> tiktoken.Encoding:
+    """Loads an encoding once per process, encodings are expensive to build"""
+    if model is not None:
+        return tiktoken.encoding_for_model(model)
+    return tiktoken.get_encoding(encoding_name)
+
+
+class TiktokenTokenizer(Tokenizer):
+    encoding_name: str = "cl100k_base"
+    # Use the encoding of this model instead of `encoding_name`, e.g. "text-embedding-3-small"
+    model: Optional[str] = None
+    # Number of threads used to encode a batch of texts
+    num_threads: int = 8
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        return get_encoding(self.encoding_name, self.model)
+
+    @property
+    def name(self) -> str:
+        return f"tiktoken:{self.encoding.name}"
+
+    def encode(self, text: str) -> List[int]:
+        # Special tokens in the text are encoded as regular text
+        return self.encoding.encode_ordinary(text)
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        encode = self.encoding.encode_ordinary
+        return [len(encode(text)) for text in texts]
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        if self.num_threads <= 1 or sum(len(text) for text in texts) < _MIN_THREADED_BATCH_CHARS:
+            return self._count_tokens(texts)
+
+        # tiktoken encodes without holding the GIL. Each thread encodes a contiguous slice of the batch,
+        # which costs less than encode_ordinary_batch submitting every text to the pool separately.
+        slice_size = -(-len(texts) // self.num_threads)
+        slices = [texts[i : i + slice_size] for i in range(0, len(texts), slice_size)]
+        with ThreadPoolExecutor(max_workers=len(slices)) as executor:
+            return [num_tokens for counts in executor.map(self._count_tokens, slices) for num_tokens in counts]
@@ -1,9 +1,29 @@
-from typing import Any, Dict, Optional, Callable, get_type_hints
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, Optional, Callable, get_type_hints
 from pydantic import BaseModel, validate_call
 
 from micro.utils.log import logger
 
 
+def run_awaitable(awaitable: Awaitable[Any]) -> Any:
+    """Runs an awaitable to completion from sync code.
+    When called from a thread with a running event loop, e.g. a sync tool called from async code,
+    the awaitable runs on a new event loop in a separate thread, as the running loop cannot be blocked on.
+    """
+
+    async def _await() -> Any:
+        return await awaitable
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="awaitable") as executor:
+        return executor.submit(asyncio.run, _await()).result()
+
+
 class Function(BaseModel):
     """Model for Functions"""
 
@@ -19,10 +39,24 @@ class Function(BaseModel):
 
     # If True, the arguments are sanitized before being passed to the function.
     sanitize_arguments: bool = True
+    # Timeout in seconds for a call to the function, overrides the timeout set on the LLM.
+    timeout: Optional[float] = None
+    # If False, the function calls from a response which calls this function run one after another, in order.
+    # Set to False for functions with side effects that other calls in the same response may depend on.
+    parallel: bool = True
 
     def to_dict(self) -> Dict[str, Any]:
         return self.model_dump(exclude_none=True, include={"name", "description", "parameters"})
 
+    @property
+    def is_async(self) -> bool:
+        """True if the entrypoint is a coroutine function"""
+        if self.entrypoint is None:
+            return False
+        return inspect.iscoroutinefunction(self.entrypoint) or inspect.iscoroutinefunction(
+            inspect.unwrap(self.entrypoint)
+        )
+
     @classmethod
     def from_callable(cls, c: Callable) -> "Function":
         from inspect import getdoc
@@ -139,6 +173,8 @@ class FunctionCall(BaseModel):
         if self.arguments is None:
             try:
                 self.result = self.function.entrypoint()
+                if inspect.isawaitable(self.result):
+                    self.result = run_awaitable(self.result)
                 return True
             except Exception as e:
                 logger.warning(f"Could not run function {self.get_call_str()}")
@@ -148,6 +184,37 @@ class FunctionCall(BaseModel):
 
         try:
             self.result = self.function.entrypoint(**self.arguments)
+            if inspect.isawaitable(self.result):
+                # Async functions are run to completion when called from sync code
+                self.result = run_awaitable(self.result)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not run function {self.get_call_str()}")
+            logger.exception(e)
+            self.result = str(e)
+            return False
+
+    async def aexecute(self) -> bool:
+        """Runs the function call without blocking the event loop.
+        Async functions are awaited, sync functions run in the default executor of the event loop.
+
+        @return: True if the function call was successful, False otherwise.
+        """
+        if self.function.entrypoint is None:
+            return False
+
+        logger.debug(f"Running: {self.get_call_str()}")
+
+        entrypoint = self.function.entrypoint
+        arguments = self.arguments or {}
+        try:
+            if self.function.is_async:
+                self.result = await entrypoint(**arguments)
+            else:
+                loop = asyncio.get_running_loop()
+                self.result = await loop.run_in_executor(None, lambda: entrypoint(**arguments))
+                if inspect.isawaitable(self.result):
+                    self.result = await self.result
             return True
         except Exception as e:
             logger.warning(f"Could not run function {self.get_call_str()}")
@@ -0,0 +1,199 @@
+import asyncio
+import atexit
+import json
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+
+from micro.utils.log import logger
+
+ClientType = TypeVar("ClientType")
+
+
+class ClientRegistry:
+    """Process-wide registry of provider clients.
+
+    Clients are shared by every LLM and embedder created with the same provider and client parameters
+    (api key, base url, timeouts, ...), so their connection pools and TLS sessions are reused across calls.
+    Async clients are also keyed by the running event loop, as httpx.AsyncClient can not be shared across loops.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = 200,
+        max_keepalive_connections: Optional[int] = 50,
+        keepalive_expiry: Optional[float] = 60.0,
+        http2: bool = False,
+    ):
+        # -*- Connection pool settings for the http clients created by the registry
+        self.max_connections: Optional[int] = max_connections
+        self.max_keepalive_connections: Optional[int] = max_keepalive_connections
+        self.keepalive_expiry: Optional[float] = keepalive_expiry
+        # Requires the `h2` package
+        self.http2: bool = http2
+
+        self._lock = Lock()
+        # Maps the client key to the client, the http client created for it and the event loop for async clients
+        self._clients: Dict[Tuple[str, str], Tuple[Any, Optional[Any], Optional[asyncio.AbstractEventLoop]]] = {}
+
+    def configure(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ) -> None:
+        """Updates the connection pool settings, only clients created afterwards use the new settings"""
+        if max_connections is not None:
+            self.max_connections = max_connections
+        if max_keepalive_connections is not None:
+            self.max_keepalive_connections = max_keepalive_connections
+        if keepalive_expiry is not None:
+            self.keepalive_expiry = keepalive_expiry
+        if http2 is not None:
+            self.http2 = http2
+
+    def get_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def get_http2(self) -> bool:
+        if not self.http2:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("`h2` not installed, using HTTP/1.1")
+            return False
+        return True
+
+    def get_http_client_kwargs(self, limits: Optional[httpx.Limits] = None) -> Dict[str, Any]:
+        """Keyword arguments for SDK clients which build their own httpx client, e.g. ollama"""
+        return {"limits": limits or self.get_limits(), "http2": self.get_http2()}
+
+    @staticmethod
+    def get_key(provider: str, client_params: Dict[str, Any], limits: Optional[httpx.Limits]) -> Tuple[str, str]:
+        # Parameters which can not be serialized (http clients, callables) are keyed by their repr, i.e. their id
+        params = json.dumps([client_params, repr(limits)], sort_keys=True, default=repr)
+        # Hash the parameters so api keys are not kept in the key
+        return provider, sha256(params.encode()).hexdigest()
+
+    def _get(
+        self,
+        provider: str,
+        factory: Callable[..., ClientType],
+        client_params: Dict[str, Any],
+        http_client_param: Optional[str],
+        limits: Optional[httpx.Limits],
+        loop: Optional[asyncio.AbstractEventLoop],
+    ) -> ClientType:
+        key = self.get_key(provider if loop is None else f"{provider}:{id(loop)}", client_params, limits)
+        with self._lock:
+            if key in self._clients:
+                return self._clients[key][0]
+
+            # Remove the async clients of closed event loops
+            for _key in [k for k, (_, _, _loop) in self._clients.items() if _loop is not None and _loop.is_closed()]:
+                del self._clients[_key]
+
+            _client_params = dict(client_params)
+            http_client: Optional[Any] = None
+            if http_client_param is not None and http_client_param not in _client_params:
+                http_client_cls = httpx.AsyncClient if loop is not None else httpx.Client
+                http_client = http_client_cls(limits=limits or self.get_limits(), http2=self.get_http2())
+                _client_params[http_client_param] = http_client
+
+            logger.debug(f"Creating {provider} client")
+            client = factory(**_client_params)
+            self._clients[key] = (client, http_client, loop)
+            return client
+
+    def get_client(
+        self,
+        provider: str,
+        factory: Callable[..., ClientType],
+        client_params: Dict[str, Any],
+        http_client_param: Optional[str] = "http_client",
+        limits: Optional[httpx.Limits] = None,
+    ) -> ClientType:
+        """Returns the shared client for the provider and client parameters, creating it using `factory(**client_params)`
+
+        Args:
+            provider (str): Name of the provider, e.g. "openai"
+            factory (Callable): Client class or function creating the client
+            client_params (Dict[str, Any]): Keyword arguments for the factory, part of the key
+            http_client_param (Optional[str]): Name of the factory argument accepting an httpx.Client.
+                If set and not provided in client_params, the registry creates a pooled http client.
+            limits (Optional[httpx.Limits]): Connection limits overriding the registry settings
+        """
+        return self._get(provider, factory, client_params, http_client_param, limits, None)
+
+    def get_async_client(
+        self,
+        provider: str,
+        factory: Callable[..., ClientType],
+        client_params: Dict[str, Any],
+        http_client_param: Optional[str] = "http_client",
+        limits: Optional[httpx.Limits] = None,
+    ) -> ClientType:
+        """Returns the shared async client for the provider, client parameters and running event loop,
+        see `get_client`. The http client created by the registry is an httpx.AsyncClient.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside of an event loop the client can not be tied to a loop, so it is not shared
+            _client_params = dict(client_params)
+            if http_client_param is not None and http_client_param not in _client_params:
+                _client_params[http_client_param] = httpx.AsyncClient(
+                    limits=limits or self.get_limits(), http2=self.get_http2()
+                )
+            return factory(**_client_params)
+        return self._get(provider, factory, client_params, http_client_param, limits, loop)
+
+    def _pop_clients(self, async_clients: bool) -> List[Tuple[Any, Optional[Any]]]:
+        with self._lock:
+            keys = [k for k, (_, _, loop) in self._clients.items() if (loop is not None) == async_clients]
+            return [self._clients.pop(k)[:2] for k in keys]
+
+    def close(self) -> None:
+        """Closes the sync clients and their connection pools"""
+        for client, http_client in self._pop_clients(async_clients=False):
+            for _closeable in (client, http_client):
+                close = getattr(_closeable, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception as e:
+                        logger.debug(f"Error closing client: {e}")
+
+    async def aclose(self) -> None:
+        """Closes the async clients of the running event loop and their connection pools"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [k for k, (_, _, _loop) in self._clients.items() if _loop is loop]
+            clients = [self._clients.pop(k)[:2] for k in keys]
+        for client, http_client in clients:
+            for _closeable in (client, http_client):
+                close = getattr(_closeable, "aclose", None) or getattr(_closeable, "close", None)
+                if callable(close):
+                    try:
+                        result = close()
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except Exception as e:
+                        logger.debug(f"Error closing client: {e}")
+
+    def clear(self) -> None:
+        """Forgets every client without closing them"""
+        with self._lock:
+            self._clients.clear()
+
+
+client_registry = ClientRegistry()
+atexit.register(client_registry.close)
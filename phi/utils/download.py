@@ -0,0 +1,188 @@
+import json
+import os
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from micro.utils.client_registry import client_registry
+from micro.utils.log import logger
+
+
+class DownloadedFile:
+    """A downloaded file, held in memory or written to a file on disk"""
+
+    def __init__(self, data: Optional[bytes] = None, path: Optional[str] = None, temporary: bool = False):
+        self.data: Optional[bytes] = data
+        self.path: Optional[str] = path
+        # Temporary files are removed by close()
+        self.temporary: bool = temporary
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        """The file contents if held in memory, otherwise the path of the file"""
+        if self.path is not None:
+            return self.path
+        return self.data or b""
+
+    def get_path(self, suffix: str = "") -> str:
+        """Returns the path of the file, writing the file to a temporary file if it is held in memory"""
+        if self.path is None:
+            with NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                f.write(self.data or b"")
+            self.path, self.data, self.temporary = f.name, None, True
+        return self.path
+
+    def close(self) -> None:
+        if self.temporary and self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                logger.debug(f"Could not remove {self.path}: {e}")
+            self.path = None
+        self.data = None
+
+    def __enter__(self) -> "DownloadedFile":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class Downloader(BaseModel):
+    """Downloads files by streaming them to memory, or to a temporary file once larger than `max_memory`,
+    so large files are never held in memory. Connections are reused across downloads.
+
+    With a `cache_dir`, downloads are cached on disk and revalidated with conditional requests
+    (ETag / Last-Modified), so unchanged files are not downloaded again.
+    """
+
+    # Directory where downloads are cached, not cached if None
+    cache_dir: Optional[Path] = None
+    # Downloads are kept in memory up to this many bytes, larger downloads are written to a temporary file
+    max_memory: int = 16 * 1024 * 1024
+    # Number of bytes read from the response at a time
+    chunk_size: int = 1024 * 1024
+    # Timeout for http requests in seconds
+    timeout: float = 60.0
+    # Number of files downloaded at the same time
+    max_concurrency: int = 4
+
+    @property
+    def client(self) -> Any:
+        import httpx
+
+        return client_registry.get_client(
+            "download",
+            httpx.Client,
+            {"timeout": self.timeout, "follow_redirects": True, "limits": client_registry.get_limits()},
+            http_client_param=None,
+        )
+
+    def spool(self, chunks: Iterable[bytes], suffix: str = "") -> DownloadedFile:
+        """Reads chunks into memory until `max_memory` bytes, then into a temporary file"""
+        buffer = bytearray()
+        iterator = iter(chunks)
+        for chunk in iterator:
+            buffer += chunk
+            if len(buffer) > self.max_memory:
+                with NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                    try:
+                        f.write(buffer)
+                        del buffer
+                        for chunk in iterator:
+                            f.write(chunk)
+                    except BaseException:
+                        f.close()
+                        os.remove(f.name)
+                        raise
+                return DownloadedFile(path=f.name, temporary=True)
+        return DownloadedFile(data=bytes(buffer))
+
+    def get_cache_paths(self, key: str, suffix: str = "") -> Tuple[Path, Path]:
+        """Returns the paths of the cached file and of its validators"""
+        assert self.cache_dir is not None
+        name = sha256(key.encode()).hexdigest()
+        return self.cache_dir.joinpath(f"{name}{suffix}"), self.cache_dir.joinpath(f"{name}.json")
+
+    def get_cached(self, key: str, suffix: str = "") -> Optional[Tuple[DownloadedFile, Dict[str, str]]]:
+        """Returns the cached file and its validators, e.g. {"etag": ...}, if the file is cached"""
+        if self.cache_dir is None:
+            return None
+        path, validators_path = self.get_cache_paths(key, suffix)
+        try:
+            validators = json.loads(validators_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not path.exists():
+            return None
+        return DownloadedFile(path=str(path)), validators
+
+    def store(self, key: str, chunks: Iterable[bytes], validators: Dict[str, str], suffix: str = "") -> DownloadedFile:
+        """Writes chunks to the cache. Files are replaced atomically, so readers see either version."""
+        assert self.cache_dir is not None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path, validators_path = self.get_cache_paths(key, suffix)
+        with NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            try:
+                for chunk in chunks:
+                    f.write(chunk)
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, path)
+        with NamedTemporaryFile("w", dir=self.cache_dir, suffix=".tmp", delete=False) as validators_file:
+            json.dump(validators, validators_file)
+        os.replace(validators_file.name, validators_path)
+        return DownloadedFile(path=str(path))
+
+    def get(self, url: str, suffix: str = "") -> DownloadedFile:
+        """Downloads a file, or returns the cached file if it has not changed"""
+        cached = self.get_cached(url, suffix)
+        headers: Dict[str, str] = {}
+        if cached is not None:
+            if "etag" in cached[1]:
+                headers["If-None-Match"] = cached[1]["etag"]
+            if "last_modified" in cached[1]:
+                headers["If-Modified-Since"] = cached[1]["last_modified"]
+
+        with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached is not None:
+                logger.debug(f"Not modified: {url}")
+                return cached[0]
+            response.raise_for_status()
+
+            chunks = response.iter_bytes(self.chunk_size)
+            validators = {
+                name: response.headers[header]
+                for name, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+                if header in response.headers
+            }
+            if self.cache_dir is not None and len(validators) > 0:
+                return self.store(url, chunks, validators, suffix)
+            return self.spool(chunks, suffix)
+
+    def get_s3_object(self, s3_object: Any, suffix: str = "") -> DownloadedFile:
+        """Downloads an S3Object, or returns the cached file if its ETag has not changed"""
+        cached = self.get_cached(s3_object.uri, suffix)
+        object_resource = s3_object.get_resource()
+        try:
+            if cached is not None and "etag" in cached[1]:
+                response = object_resource.get(IfNoneMatch=cached[1]["etag"])
+            else:
+                response = object_resource.get()
+        except Exception as e:
+            # boto3 raises a ClientError for 304 Not Modified
+            error_code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if cached is not None and error_code in ("304", "NotModified"):
+                logger.debug(f"Not modified: {s3_object.uri}")
+                return cached[0]
+            raise
+
+        chunks = response["Body"].iter_chunks(self.chunk_size)
+        if self.cache_dir is not None and response.get("ETag"):
+            return self.store(s3_object.uri, chunks, {"etag": response["ETag"]}, suffix)
+        return self.spool(chunks, suffix)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
+from hashlib import md5
+from typing import List, Optional, Set
 
 from micro.document import Document
 
@@ -19,6 +20,35 @@ class VectorDb(ABC):
     def name_exists(self, name: str) -> bool:
         raise NotImplementedError
 
+    def get_content_hash(self, document: Document) -> str:
+        """Returns the hash `doc_exists` and `existing_hashes` identify the document by"""
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        return md5(cleaned_content.encode()).hexdigest()
+
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """Returns the subset of hashes which exist in the vector db, in as few queries as possible"""
+        raise NotImplementedError
+
+    def filter_new(self, documents: List[Document]) -> List[Document]:
+        """Returns the documents which do not exist in the vector db"""
+        if len(documents) == 0:
+            return []
+        hashes = [self.get_content_hash(document) for document in documents]
+        try:
+            existing = self.existing_hashes(hashes)
+        except NotImplementedError:
+            return [document for document in documents if not self.doc_exists(document)]
+        return [document for document, _hash in zip(documents, hashes) if _hash not in existing]
+
+    def get_document_id(self, document: Document) -> str:
+        """Returns the id the document is stored under in the vector db"""
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        return document.id or md5(cleaned_content.encode()).hexdigest()
+
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """Delete the documents stored under the given ids"""
+        raise NotImplementedError
+
     @abstractmethod
     def insert(self, documents: List[Document]) -> None:
         raise NotImplementedError
@@ -31,9 +61,61 @@ class VectorDb(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        """Returns the documents most similar to the query
+
+        Args:
+            query (str): The query to search for
+            limit (int): Maximum number of documents to return
+            query_embedding (Optional[List[float]]): Embedding of the query, if already computed
+            include_embeddings (bool): If False, only the name, meta_data and content of the documents are fetched,
+                and the documents are built without validation.
+        """
         raise NotImplementedError
 
+    def get_query_embeddings(
+        self, queries: List[str], query_embeddings: Optional[List[List[float]]] = None
+    ) -> List[List[float]]:
+        """Returns the embeddings of the queries, embedded in as few requests as possible if not provided"""
+        if query_embeddings is not None:
+            if len(query_embeddings) != len(queries):
+                raise ValueError("Number of query embeddings does not match the number of queries")
+            return query_embeddings
+        if len(queries) == 0:
+            return []
+        embedder = getattr(self, "embedder", None)
+        if embedder is None:
+            raise ValueError("No embedder provided")
+        return embedder.get_embeddings(queries)
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        *,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = True,
+    ) -> List[List[Document]]:
+        """Returns the documents most similar to each query, in the same order as `queries`.
+
+        The queries are embedded in a single batched request. Vector dbs which can run several queries
+        in one request override this method, the default searches the queries one after another.
+        """
+        query_embeddings = self.get_query_embeddings(queries, query_embeddings)
+        return [
+            self.search(
+                query=query, limit=limit, query_embedding=query_embedding, include_embeddings=include_embeddings
+            )
+            for query, query_embedding in zip(queries, query_embeddings)
+        ]
+
     @abstractmethod
     def delete(self) -> None:
         raise NotImplementedError
@@ -0,0 +1,58 @@
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+# Operators accepted in filters, e.g. {"year": {"$gte": 2020, "$lt": 2024}}
+OPERATORS = ("$eq", "$ne", "$in", "$nin", "$gt", "$gte", "$lt", "$lte")
+
+
+class FilterCondition(BaseModel):
+    # Filter key as written, e.g. "source.type"
+    key: str
+    # Path of the key in meta_data, e.g. ["source", "type"]
+    path: List[str]
+    operator: str
+    value: Any
+
+
+def parse_filters(filters: Dict[str, Any]) -> List[FilterCondition]:
+    """Parses filters into a list of conditions, all of which must match.
+
+    Keys are meta_data keys, nested keys are separated by dots. Values are either matched for equality
+    or are a dict of operators to values:
+        {"tenant": "acme", "source.type": {"$in": ["pdf", "docx"]}, "year": {"$gte": 2020}}
+    A dict without operators matches its keys, i.e. {"source": {"type": "pdf"}} is {"source.type": "pdf"}.
+    """
+    conditions: List[FilterCondition] = []
+    for key, value in filters.items():
+        path = key.split(".")
+        if isinstance(value, dict) and len(value) > 0 and not any(k.startswith("$") for k in value):
+            conditions.extend(parse_filters({f"{key}.{k}": v for k, v in value.items()}))
+        elif isinstance(value, dict) and len(value) > 0 and all(k.startswith("$") for k in value):
+            for operator, operand in value.items():
+                if operator not in OPERATORS:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+                if operator in ("$in", "$nin") and not isinstance(operand, (list, tuple, set)):
+                    raise ValueError(f"Filter operator {operator} requires a list, got: {operand}")
+                if isinstance(operand, (tuple, set)):
+                    operand = list(operand)
+                conditions.append(FilterCondition(key=key, path=path, operator=operator, value=operand))
+        else:
+            conditions.append(FilterCondition(key=key, path=path, operator="$eq", value=value))
+    return conditions
+
+
+def compare(expression: Any, operator: str, value: Any) -> Any:
+    """Applies a comparison operator to an expression, e.g. a sqlalchemy column"""
+    if operator == "$in":
+        return expression.in_(value)
+    if operator == "$nin":
+        return expression.not_in(value)
+    return {
+        "$eq": expression.__eq__,
+        "$ne": expression.__ne__,
+        "$gt": expression.__gt__,
+        "$gte": expression.__ge__,
+        "$lt": expression.__lt__,
+        "$lte": expression.__le__,
+    }[operator](value)
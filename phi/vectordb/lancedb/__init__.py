@@ -1 +1,2 @@
+from micro.vectordb.lancedb.index import IvfPq
 from micro.vectordb.lancedb.lancedb import LanceDb
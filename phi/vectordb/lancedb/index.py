@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class IvfPq(BaseModel):
+    # Number of IVF partitions, defaults to the square root of the number of rows
+    num_partitions: Optional[int] = None
+    # Number of PQ sub-vectors, defaults to dimensions / 16. Reduced to a divisor of the dimensions
+    num_sub_vectors: Optional[int] = None
+    # Re-rank limit * refine_factor candidates using the exact vectors, disabled if None
+    refine_factor: Optional[int] = None
+    # Minimum number of rows to build the index, smaller tables are searched exactly
+    min_rows: int = 10000
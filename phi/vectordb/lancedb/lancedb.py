@@ -1,5 +1,6 @@
 from hashlib import md5
-from typing import List, Optional
+from math import sqrt
+from typing import List, Optional, Set, Union
 import json
 
 try:
@@ -13,9 +14,17 @@ from micro.embedder import Embedder
 from micro.embedder.openai import OpenAIEmbedder
 from micro.vectordb.base import VectorDb
 from micro.vectordb.distance import Distance
+from micro.vectordb.lancedb.index import IvfPq
 from micro.utils.log import logger
 
 
+class _Default:
+    """Marks an argument which was not passed, where None has a meaning of its own"""
+
+
+_DEFAULT = _Default()
+
+
 class LanceDb(VectorDb):
     def __init__(
         self,
@@ -25,6 +34,7 @@ class LanceDb(VectorDb):
         uri: Optional[str] = "/tmp/lancedb",
         table_name: Optional[str] = "phi",
         nprobes: Optional[int] = 20,
+        index: Union[IvfPq, None, _Default] = _DEFAULT,
         **kwargs,
     ):
         # Embedder for embedding the document contents
@@ -39,6 +49,9 @@ class LanceDb(VectorDb):
         self.client = lancedb.connect(self.uri)
         self.nprobes = nprobes
 
+        # Vector index built by optimize(). Set to None to not build an index
+        self.index: Optional[IvfPq] = IvfPq() if isinstance(index, _Default) else index
+
         if connection:
             if not isinstance(connection, lancedb.db.LanceTable):
                 raise ValueError(
@@ -88,18 +101,51 @@ class LanceDb(VectorDb):
         Args:
             document (Document): Document to validate
         """
-        if self.client:
-            cleaned_content = document.content.replace("\x00", "\ufffd")
-            doc_id = md5(cleaned_content.encode()).hexdigest()
-            result = self.connection.search().where(f"{self._id}='{doc_id}'").to_arrow()
-            return len(result) > 0
-        return False
+        _hash = self.get_content_hash(document)
+        return _hash in self.existing_hashes([_hash])
+
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Returns the content hashes which exist in the table, using a single `IN` filter
+
+        Args:
+            hashes (List[str]): Content hashes to check, the rows are stored under their content hash
+        """
+        if len(hashes) == 0 or not self.client:
+            return set()
+        unique_hashes = list(set(hashes))
+        _ids = ", ".join("'{}'".format(_id.replace("'", "''")) for _id in unique_hashes)
+        result = (
+            self.connection.search()
+            .where(f"{self._id} IN ({_ids})")
+            .select([self._id])
+            .limit(len(unique_hashes))
+            .to_arrow()
+        )
+        return set(result[self._id].to_pylist())
+
+    def get_document_id(self, document: Document) -> str:
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        return md5(cleaned_content.encode()).hexdigest()
+
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """
+        Delete the rows with the given ids
+
+        Args:
+            ids (List[str]): Ids of the rows to delete
+        """
+        if len(ids) == 0:
+            return
+        _ids = ", ".join("'{}'".format(_id.replace("'", "''")) for _id in ids)
+        self.connection.delete(f"{self._id} IN ({_ids})")
+        logger.debug(f"Deleted {len(ids)} documents")
 
     def insert(self, documents: List[Document]) -> None:
         logger.debug(f"Inserting {len(documents)} documents")
         data = []
+        Document.embed_documents(documents, embedder=self.embedder)
         for document in documents:
-            document.embed(embedder=self.embedder)
             cleaned_content = document.content.replace("\x00", "\ufffd")
             doc_id = str(md5(cleaned_content.encode()).hexdigest())
             payload = {
@@ -130,8 +176,16 @@ class LanceDb(VectorDb):
         logger.debug("Redirecting the request to insert")
         self.insert(documents)
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        if query_embedding is None:
+            query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
@@ -141,32 +195,53 @@ class LanceDb(VectorDb):
                 query=query_embedding,
                 vector_column_name=self._vector_col,
             )
+            .metric(self.get_metric())
             .limit(limit)
             .nprobes(self.nprobes)
-            .to_pandas()
         )
+        if self.index is not None and self.index.refine_factor is not None:
+            results = results.refine_factor(self.index.refine_factor)
+        results = results.select(["payload", self._vector_col] if include_embeddings else ["payload"])
 
         # Build search results
-        search_results: List[Document] = []
-
         try:
-            for _, item in results.iterrows():
-                payload = json.loads(item["payload"])
-                search_results.append(
-                    Document(
-                        name=payload["name"],
-                        meta_data=payload["meta_data"],
-                        content=payload["content"],
-                        embedder=self.embedder,
-                        embedding=item["vector"],
-                        usage=payload["usage"],
-                    )
-                )
-
+            return self.get_documents(results.to_arrow(), include_embeddings)
         except Exception as e:
             logger.error(f"Error building search results: {e}")
+            return []
 
-        return search_results
+    def get_documents(self, results: pa.Table, include_embeddings: bool) -> List[Document]:
+        """Builds documents from the columns of an Arrow table, without converting the rows to pandas"""
+        payloads = [json.loads(payload) for payload in results["payload"].to_pylist()]
+        if not include_embeddings:
+            return [
+                Document.model_construct(
+                    name=payload["name"], meta_data=payload["meta_data"], content=payload["content"]
+                )
+                for payload in payloads
+            ]
+
+        # The vector column is a fixed size list, its values are one flat float32 array
+        vectors = results[self._vector_col].combine_chunks()
+        embeddings = vectors.flatten().to_numpy(zero_copy_only=False).reshape(len(vectors), -1).tolist()
+        return [
+            Document(
+                name=payload["name"],
+                meta_data=payload["meta_data"],
+                content=payload["content"],
+                embedder=self.embedder,
+                embedding=embedding,
+                usage=payload["usage"],
+            )
+            for payload, embedding in zip(payloads, embeddings)
+        ]
+
+    def get_metric(self) -> str:
+        if self.distance == Distance.l2:
+            return "L2"
+        if self.distance == Distance.max_inner_product:
+            return "dot"
+        return "cosine"
 
     def delete(self) -> None:
         if self.exists():
@@ -185,7 +260,41 @@ class LanceDb(VectorDb):
         return 0
 
     def optimize(self) -> None:
-        pass
+        """Compacts the table fragments and builds the IVF-PQ index once the table has `index.min_rows` rows"""
+        if not self.exists():
+            return
+
+        logger.debug("==== Optimizing Vector DB ====")
+        # Inserts create a fragment per call, merge them so searches read fewer files
+        if hasattr(self.connection, "optimize"):
+            self.connection.optimize()
+        else:
+            self.connection.compact_files()
+            self.connection.cleanup_old_versions()
+
+        num_rows = self.connection.count_rows()
+        if self.index is None or num_rows < self.index.min_rows:
+            logger.debug(f"Skipping index, {num_rows} rows")
+            return
+
+        num_partitions = self.index.num_partitions or int(sqrt(num_rows))
+        num_sub_vectors = self.index.num_sub_vectors or max(self.dimensions // 16, 1)
+        # Each sub-vector must have the same number of dimensions
+        num_sub_vectors = max(
+            d for d in range(1, min(num_sub_vectors, self.dimensions) + 1) if self.dimensions % d == 0
+        )
+        logger.debug(
+            f"Creating IVF-PQ index with {num_partitions} partitions, {num_sub_vectors} sub-vectors "
+            f"and metric: {self.get_metric()}"
+        )
+        self.connection.create_index(
+            metric=self.get_metric(),
+            num_partitions=num_partitions,
+            num_sub_vectors=num_sub_vectors,
+            vector_column_name=self._vector_col,
+            replace=True,
+        )
+        logger.debug("==== Optimized Vector DB ====")
 
     def clear(self) -> bool:
         return False
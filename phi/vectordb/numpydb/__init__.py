@@ -0,0 +1,2 @@
+from micro.vectordb.numpydb.index import IvfPq
+from micro.vectordb.numpydb.numpydb import NumpyDb
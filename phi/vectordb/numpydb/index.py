@@ -0,0 +1,21 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class IvfPq(BaseModel):
+    # Number of coarse clusters, defaults to the square root of the number of vectors
+    lists: Optional[int] = None
+    # Number of sub-quantizers, each vector is stored as m uint8 codes. Reduced to a divisor of the dimensions
+    m: int = 64
+    # Number of clusters searched per query
+    nprobe: int = 16
+    # Re-rank limit * refine_factor candidates using the exact vectors, disabled if None
+    refine_factor: Optional[int] = 10
+    # Minimum number of vectors to train the index on, smaller collections are searched exactly
+    min_rows: int = 10000
+    # Maximum number of vectors sampled to train the index
+    train_size: int = 100000
+    # Number of k-means iterations
+    iterations: int = 20
+    seed: int = 0
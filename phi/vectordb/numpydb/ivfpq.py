@@ -0,0 +1,292 @@
+from math import sqrt
+from pathlib import Path
+from typing import Optional, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+from micro.vectordb.numpydb.index import IvfPq
+from micro.utils.log import logger
+
+# Number of centroids per sub-quantizer, so that codes fit in a uint8
+_KSUB = 256
+# Number of vectors processed at once when assigning and encoding
+_BATCH_SIZE = 16384
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Returns the index of the nearest centroid (l2) for each row of data"""
+    centroid_norms = np.square(centroids).sum(axis=1)
+    assignments = np.empty(data.shape[0], dtype=np.int32)
+    for i in range(0, data.shape[0], _BATCH_SIZE):
+        batch = data[i : i + _BATCH_SIZE]
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, ||x||^2 does not change the nearest centroid
+        assignments[i : i + _BATCH_SIZE] = np.argmin(centroid_norms - 2 * (batch @ centroids.T), axis=1)
+    return assignments
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Returns k centroids of data using Lloyd's algorithm"""
+    n = data.shape[0]
+    k = min(k, n)
+    centroids = data[rng.choice(n, size=k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignments = _assign(data, centroids)
+        sums = np.zeros(centroids.shape, dtype=np.float64)
+        for i in range(0, n, _BATCH_SIZE):
+            batch_assignments = assignments[i : i + _BATCH_SIZE]
+            one_hot = np.zeros((len(batch_assignments), k), dtype=np.float32)
+            one_hot[np.arange(len(batch_assignments)), batch_assignments] = 1
+            sums += one_hot.T @ data[i : i + _BATCH_SIZE]
+        counts = np.bincount(assignments, minlength=k)
+        non_empty = counts > 0
+        centroids[non_empty] = (sums[non_empty] / counts[non_empty, None]).astype(np.float32)
+        # Restart empty clusters from random points
+        num_empty = int((~non_empty).sum())
+        if num_empty > 0:
+            centroids[~non_empty] = data[rng.choice(n, size=num_empty, replace=False)]
+    return centroids
+
+
+class IvfPqIndex:
+    """Inverted file index with product quantization.
+
+    Vectors are assigned to their nearest coarse centroid and the residual is encoded as m uint8 codes,
+    one per sub-vector. Search scores the vectors in the nprobe nearest clusters using lookup tables.
+    Codes are stored in memory-mapped files next to the vectors, indexed by slot. The slots of each cluster
+    are kept in memory as inverted lists, so search only reads the slots of the probed clusters.
+    """
+
+    def __init__(self, path: Path, dimensions: int, metric: str):
+        self.path: Path = path
+        self.dimensions: int = dimensions
+        # "ip" for inner product, "l2" for euclidean distance
+        self.metric: str = metric
+
+        self.centroids: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None
+        # Number of vectors when the index was trained
+        self.num_trained: int = 0
+
+        self._capacity: int = 0
+        self._lists: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        # Query-independent part of the l2 distance: 2 <c, r> + ||r||^2
+        self._terms: Optional[np.memmap] = None
+
+        # Inverted lists: slots sorted by cluster, the slots of cluster i are _order[_offsets[i] : _offsets[i + 1]]
+        self._order: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        # Slots added to each cluster since the inverted lists were built. Slots which moved to another cluster
+        # are left in their previous list and skipped by search, until the lists are rebuilt.
+        self._added: List[List[np.ndarray]] = []
+        self._num_added: int = 0
+        # Number of slots covered by the inverted lists
+        self._num_slots: int = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None and self.codebooks is not None
+
+    @property
+    def m(self) -> int:
+        return self.codebooks.shape[0] if self.codebooks is not None else 0
+
+    @property
+    def params_path(self) -> Path:
+        return self.path.joinpath("ivfpq.npz")
+
+    def _file(self, name: str) -> Path:
+        return self.path.joinpath(name)
+
+    def load(self, capacity: int, num_slots: int) -> bool:
+        """Loads a trained index, returns False if there is none or it does not match the collection"""
+        if not self.params_path.exists():
+            return False
+        with np.load(self.params_path) as params:
+            if str(params["metric"]) != self.metric or params["centroids"].shape[1] != self.dimensions:
+                logger.warning("Ignoring index trained for a different metric or dimensions")
+                return False
+            self.centroids = params["centroids"]
+            self.codebooks = params["codebooks"]
+            self.num_trained = int(params["num_trained"])
+        self.resize(capacity)
+        self._build_lists(num_slots)
+        return True
+
+    def _build_lists(self, num_slots: int) -> None:
+        """Builds the inverted lists of the first `num_slots` slots"""
+        num_lists = len(self.centroids) if self.centroids is not None else 0
+        num_slots = min(num_slots, self._capacity) if self._lists is not None else 0
+        lists = np.asarray(self._lists[:num_slots]) if self._lists is not None else np.zeros(0, dtype=np.int32)
+        self._order = np.argsort(lists, kind="stable").astype(np.int64)
+        self._offsets = np.zeros(num_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=num_lists), out=self._offsets[1:])
+        self._added = [[] for _ in range(num_lists)]
+        self._num_added = 0
+        self._num_slots = num_slots
+
+    def save(self) -> None:
+        if self.centroids is None or self.codebooks is None:
+            return
+        self.flush()
+        with self.params_path.open("wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                codebooks=self.codebooks,
+                metric=np.array(self.metric),
+                num_trained=np.array(self.num_trained),
+            )
+
+    def flush(self) -> None:
+        for array in (self._lists, self._codes, self._terms):
+            if array is not None:
+                array.flush()
+
+    def resize(self, capacity: int) -> None:
+        """Resizes the code files to hold `capacity` vectors"""
+        if not self.trained:
+            return
+        self.flush()
+        self._lists = self._codes = self._terms = None
+        files = [
+            ("ivf_lists.i32", np.int32, ()),
+            ("pq_codes.u8", np.uint8, (self.m,)),
+            ("pq_terms.f32", np.float32, ()),
+        ]
+        arrays = []
+        for name, dtype, shape in files:
+            path = self._file(name)
+            if not path.exists():
+                path.touch()
+            with path.open("r+b") as f:
+                f.truncate(capacity * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize)
+            arrays.append(np.memmap(path, dtype=dtype, mode="r+", shape=(capacity, *shape)) if capacity > 0 else None)
+        self._lists, self._codes, self._terms = arrays
+        self._capacity = capacity
+
+    def train(self, vectors: np.ndarray, config: IvfPq, num_vectors: int) -> None:
+        """Trains the coarse centroids and the product quantizer codebooks on a sample of vectors"""
+        rng = np.random.default_rng(config.seed)
+        m = max(d for d in range(1, min(config.m, self.dimensions) + 1) if self.dimensions % d == 0)
+        lists = config.lists or int(sqrt(num_vectors))
+        # At least 39 training vectors per cluster
+        lists = max(1, min(lists, vectors.shape[0] // 39))
+        logger.info(f"Training IVF-PQ index with {lists} lists and {m} sub-quantizers on {vectors.shape[0]} vectors")
+
+        centroids = kmeans(vectors, lists, config.iterations, rng)
+        residuals = vectors - centroids[_assign(vectors, centroids)]
+        dsub = self.dimensions // m
+        codebooks = np.zeros((m, min(_KSUB, vectors.shape[0]), dsub), dtype=np.float32)
+        for j in range(m):
+            codebooks[j] = kmeans(
+                np.ascontiguousarray(residuals[:, j * dsub : (j + 1) * dsub]), _KSUB, config.iterations, rng
+            )
+
+        self.centroids = centroids
+        self.codebooks = codebooks
+        self.num_trained = num_vectors
+        self._build_lists(0)
+
+    def add(self, slots: np.ndarray, vectors: np.ndarray) -> None:
+        """Encodes the vectors and stores their codes at the given slots"""
+        if not self.trained or len(slots) == 0:
+            return
+        assert self.centroids is not None and self.codebooks is not None
+        assert self._lists is not None and self._codes is not None and self._terms is not None
+        m, _, dsub = self.codebooks.shape
+        for i in range(0, len(slots), _BATCH_SIZE):
+            batch_slots = slots[i : i + _BATCH_SIZE]
+            batch = np.asarray(vectors[i : i + _BATCH_SIZE], dtype=np.float32)
+            lists = _assign(batch, self.centroids)
+            residuals = batch - self.centroids[lists]
+            codes = np.empty((len(batch), m), dtype=np.uint8)
+            for j in range(m):
+                codes[:, j] = _assign(residuals[:, j * dsub : (j + 1) * dsub], self.codebooks[j])
+            reconstructed = self.codebooks[np.arange(m), codes].reshape(len(batch), -1)
+            self._lists[batch_slots] = lists
+            self._codes[batch_slots] = codes
+            self._terms[batch_slots] = 2 * (self.centroids[lists] * reconstructed).sum(axis=1) + np.square(
+                reconstructed
+            ).sum(axis=1)
+            for cluster in np.unique(lists):
+                self._added[cluster].append(np.asarray(batch_slots[lists == cluster], dtype=np.int64))
+            self._num_added += len(batch_slots)
+            self._num_slots = max(self._num_slots, int(batch_slots.max()) + 1)
+        # Rebuild the inverted lists once as many slots were added as they hold, dropping moved slots
+        if self._num_added > max(len(self._order), _BATCH_SIZE):
+            self._build_lists(self._num_slots)
+
+    def move(self, slots: List[int]) -> None:
+        """Moves the codes at the given slots to the first len(slots) slots, used to compact the collection"""
+        if not self.trained or len(slots) == 0:
+            return
+        assert self._lists is not None and self._codes is not None and self._terms is not None
+        self._lists[: len(slots)] = self._lists[slots]
+        self._codes[: len(slots)] = self._codes[slots]
+        self._terms[: len(slots)] = self._terms[slots]
+        self._build_lists(len(slots))
+
+    def search(self, query: np.ndarray, mask: np.ndarray, limit: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the slots of the approximate top `limit` vectors and their scores, higher is more similar
+
+        Args:
+            query (np.ndarray): Query vector
+            mask (np.ndarray): Slots which may be returned
+            limit (int): Number of slots to return
+            nprobe (int): Number of clusters to search
+        """
+        assert self.centroids is not None and self.codebooks is not None
+        assert self._lists is not None and self._codes is not None and self._terms is not None
+        m, _, dsub = self.codebooks.shape
+        if self.metric == "ip":
+            coarse = self.centroids @ query
+        else:
+            coarse = -np.square(self.centroids - query).sum(axis=1)
+        nprobe = min(nprobe, len(coarse))
+        probes = np.argpartition(-coarse, nprobe - 1)[:nprobe]
+
+        parts: List[np.ndarray] = []
+        for probe in probes:
+            parts.append(self._order[self._offsets[probe] : self._offsets[probe + 1]])
+            parts.extend(self._added[probe])
+        candidates = np.unique(np.concatenate(parts)) if len(parts) > 0 else np.zeros(0, dtype=np.int64)
+        candidates = candidates[candidates < len(mask)]
+        # Skip slots which are masked out, or moved to a cluster which is not probed since the lists were built
+        probed = np.zeros(len(coarse), dtype=bool)
+        probed[probes] = True
+        candidates = candidates[mask[candidates] & probed[self._lists[candidates]]]
+        if len(candidates) == 0:
+            return candidates, np.zeros(0, dtype=np.float32)
+
+        # Inner product of each sub-vector of the query with each codeword
+        lookup_table = np.einsum("mkd,md->mk", self.codebooks, query.reshape(m, dsub))
+        approximate = lookup_table[np.arange(m), self._codes[candidates]].sum(axis=1)
+        lists = self._lists[candidates]
+        if self.metric == "ip":
+            # <q, c + r> = <q, c> + <q, r>
+            scores = coarse[lists] + approximate
+        else:
+            # ||q - c - r||^2 = ||q - c||^2 - 2 <q, r> + 2 <c, r> + ||r||^2
+            scores = coarse[lists] + 2 * approximate - self._terms[candidates]
+
+        limit = min(limit, len(candidates))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        return candidates[top], scores[top]
+
+    def delete(self) -> None:
+        self._lists = self._codes = self._terms = None
+        self.centroids = self.codebooks = None
+        self.num_trained = 0
+        self._build_lists(0)
+        for path in (
+            self.params_path,
+            self._file("ivf_lists.i32"),
+            self._file("pq_codes.u8"),
+            self._file("pq_terms.f32"),
+        ):
+            if path.exists():
+                path.unlink()
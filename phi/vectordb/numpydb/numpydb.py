@@ -0,0 +1,585 @@
+import json
+import shutil
+import sqlite3
+from hashlib import md5
+from pathlib import Path
+from threading import RLock
+from typing import Optional, List, Dict, Any, Set, Union
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+from micro.document import Document
+from micro.embedder import Embedder
+from micro.vectordb.base import VectorDb
+from micro.vectordb.distance import Distance
+from micro.vectordb.numpydb.index import IvfPq
+from micro.vectordb.numpydb.ivfpq import IvfPqIndex
+from micro.utils.log import logger
+
+# Maximum number of scores computed at once by search_batch
+_BATCH_SCORES = 16 * 1024 * 1024
+
+
+class _Default:
+    """Marks an argument which was not passed, where None has a meaning of its own"""
+
+
+_DEFAULT = _Default()
+
+
+class NumpyDb(VectorDb):
+    """In-process vector db storing embeddings in a memory-mapped float32 matrix file.
+
+    Each document occupies a row (slot) of the matrix, payloads are stored in an sqlite index next to it.
+    Search is exact: a single matrix-vector product over all rows followed by `argpartition`, until
+    `optimize` trains the IVF-PQ index for collections of at least `index.min_rows` documents.
+    """
+
+    def __init__(
+        self,
+        collection: str = "phi",
+        path: Union[str, Path] = "/tmp/numpydb",
+        embedder: Optional[Embedder] = None,
+        distance: Distance = Distance.cosine,
+        grow_by: int = 4096,
+        index: Union[IvfPq, None, _Default] = _DEFAULT,
+    ):
+        # Collection attributes
+        self.collection: str = collection
+        self.path: Path = Path(path).joinpath(collection)
+
+        # Embedder for embedding the document contents
+        _embedder = embedder
+        if _embedder is None:
+            from micro.embedder.openai import OpenAIEmbedder
+
+            _embedder = OpenAIEmbedder()
+        self.embedder: Embedder = _embedder
+        self.dimensions: int = self.embedder.dimensions
+
+        # Distance metric
+        self.distance: Distance = distance
+
+        # Number of rows to grow the matrix file by
+        self.grow_by: int = grow_by
+
+        # Approximate nearest neighbour index, trained by `optimize`. Set to None to always search exactly
+        self.index: Optional[IvfPq] = IvfPq() if isinstance(index, _Default) else index
+        # Cosine similarity is indexed as the inner product of normalized vectors
+        self._ivfpq = IvfPqIndex(
+            path=self.path, dimensions=self.dimensions, metric="l2" if distance == Distance.l2 else "ip"
+        )
+
+        self._lock = RLock()
+        self._index: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[np.memmap] = None
+        self._capacity: int = 0
+        # Number of slots in use, including deleted slots not yet reclaimed by `optimize`
+        self._num_slots: int = 0
+        # Rows which hold a document and their norms, kept in memory
+        self._valid: np.ndarray = np.zeros(0, dtype=bool)
+        self._norms: np.ndarray = np.zeros(0, dtype=np.float32)
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.joinpath("index.db")
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path.joinpath("vectors.f32")
+
+    def create(self) -> None:
+        self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._index is not None:
+                return self._index
+
+            logger.debug(f"Opening collection: {self.path}")
+            self.path.mkdir(parents=True, exist_ok=True)
+            index = sqlite3.connect(str(self.index_path), check_same_thread=False)
+            index.execute(
+                "CREATE TABLE IF NOT EXISTS documents (slot INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, "
+                "name TEXT, content_hash TEXT NOT NULL, payload TEXT NOT NULL)"
+            )
+            index.execute("CREATE INDEX IF NOT EXISTS documents_name ON documents (name)")
+            index.execute("CREATE INDEX IF NOT EXISTS documents_content_hash ON documents (content_hash)")
+            index.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+            index.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+            row = index.execute("SELECT value FROM settings WHERE key = 'dimensions'").fetchone()
+            if row is None:
+                index.execute("INSERT INTO settings (key, value) VALUES ('dimensions', ?)", (str(self.dimensions),))
+            elif int(row[0]) != self.dimensions:
+                index.close()
+                raise ValueError(
+                    f"Collection {self.collection} has {row[0]} dimensions, the embedder has {self.dimensions}"
+                )
+            index.commit()
+
+            if not self.vectors_path.exists():
+                self.vectors_path.touch()
+            self._capacity = self.vectors_path.stat().st_size // (self.dimensions * 4)
+            self._map()
+
+            max_slot = index.execute(
+                "SELECT MAX(slot) FROM (SELECT slot FROM documents UNION ALL SELECT slot FROM free_slots)"
+            ).fetchone()[0]
+            self._num_slots = max_slot + 1 if max_slot is not None else 0
+            self._valid = np.zeros(self._capacity, dtype=bool)
+            slots = [row[0] for row in index.execute("SELECT slot FROM documents")]
+            self._valid[slots] = True
+            self._norms = np.zeros(self._capacity, dtype=np.float32)
+            if self._vectors is not None and self._num_slots > 0:
+                self._norms[: self._num_slots] = np.linalg.norm(self._vectors[: self._num_slots], axis=1)
+            if self.index is not None:
+                self._ivfpq.load(self._capacity, self._num_slots)
+            self._index = index
+            return index
+
+    def _map(self) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self.dimensions))
+            if self._capacity > 0
+            else None
+        )
+
+    def _grow(self, min_capacity: int) -> None:
+        new_capacity = max(min_capacity, self._capacity + self.grow_by)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with self.vectors_path.open("r+b") as f:
+            f.truncate(new_capacity * self.dimensions * 4)
+        self._valid = np.concatenate([self._valid, np.zeros(new_capacity - self._capacity, dtype=bool)])
+        self._norms = np.concatenate([self._norms, np.zeros(new_capacity - self._capacity, dtype=np.float32)])
+        self._capacity = new_capacity
+        self._map()
+        self._ivfpq.resize(new_capacity)
+
+    def _allocate_slot(self, index: sqlite3.Connection) -> int:
+        row = index.execute("SELECT slot FROM free_slots LIMIT 1").fetchone()
+        if row is not None:
+            index.execute("DELETE FROM free_slots WHERE slot = ?", (row[0],))
+            return row[0]
+        slot = self._num_slots
+        self._num_slots += 1
+        return slot
+
+    def _write(self, index: sqlite3.Connection, documents: List[Document], upsert: bool) -> int:
+        """Writes the documents, returns the number of documents written"""
+        Document.embed_documents(documents, embedder=self.embedder)
+        written_slots: List[int] = []
+        with self._lock:
+            for document in documents:
+                if document.embedding is None or len(document.embedding) != self.dimensions:
+                    logger.warning(f"Skipping document without embedding: {document.name}")
+                    continue
+                cleaned_content = document.content.replace("\x00", "\ufffd")
+                content_hash = md5(cleaned_content.encode()).hexdigest()
+                _id = document.id or content_hash
+                payload = json.dumps(
+                    {
+                        "name": document.name,
+                        "meta_data": document.meta_data,
+                        "content": cleaned_content,
+                        "usage": document.usage,
+                    }
+                )
+
+                row = index.execute("SELECT slot FROM documents WHERE id = ?", (_id,)).fetchone()
+                if row is not None:
+                    if not upsert:
+                        continue
+                    slot = row[0]
+                    index.execute(
+                        "UPDATE documents SET name = ?, content_hash = ?, payload = ? WHERE slot = ?",
+                        (document.name, content_hash, payload, slot),
+                    )
+                else:
+                    slot = self._allocate_slot(index)
+                    index.execute(
+                        "INSERT INTO documents (slot, id, name, content_hash, payload) VALUES (?, ?, ?, ?, ?)",
+                        (slot, _id, document.name, content_hash, payload),
+                    )
+
+                if slot >= self._capacity:
+                    self._grow(slot + 1)
+                assert self._vectors is not None
+                self._vectors[slot] = document.embedding
+                self._norms[slot] = np.linalg.norm(self._vectors[slot])
+                self._valid[slot] = True
+                written_slots.append(slot)
+
+            if self._ivfpq.trained and len(written_slots) > 0:
+                slots = np.array(written_slots)
+                self._ivfpq.add(slots, self._index_vectors(slots))
+                self._ivfpq.flush()
+            if self._vectors is not None:
+                self._vectors.flush()
+            index.commit()
+        return len(written_slots)
+
+    def _index_vectors(self, slots: np.ndarray) -> np.ndarray:
+        """Returns the vectors at the given slots as indexed, normalized for cosine similarity"""
+        assert self._vectors is not None
+        vectors = np.asarray(self._vectors[slots], dtype=np.float32)
+        if self.distance == Distance.cosine:
+            norms = self._norms[slots]
+            vectors = np.divide(vectors, norms[:, None], out=np.zeros_like(vectors), where=norms[:, None] > 0)
+        return vectors
+
+    def doc_exists(self, document: Document) -> bool:
+        """
+        Validating if the document exists or not
+
+        Args:
+            document (Document): Document to validate
+        """
+        return len(self.existing_hashes([self.get_content_hash(document)])) > 0
+
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Returns the content hashes which exist in the collection
+
+        Args:
+            hashes (List[str]): Content hashes to check
+        """
+        index = self._open()
+        existing: Set[str] = set()
+        unique_hashes = list(set(hashes))
+        with self._lock:
+            # Stay below the sqlite limit on the number of host parameters
+            for i in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                existing.update(
+                    row[0]
+                    for row in index.execute(
+                        f"SELECT content_hash FROM documents WHERE content_hash IN ({placeholders})", chunk
+                    )
+                )
+        return existing
+
+    def name_exists(self, name: str) -> bool:
+        """
+        Validate if a document with this name exists or not
+
+        Args:
+            name (str): Name to check
+        """
+        index = self._open()
+        with self._lock:
+            return index.execute("SELECT 1 FROM documents WHERE name = ? LIMIT 1", (name,)).fetchone() is not None
+
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """
+        Delete the documents with the given ids, their slots are reused by later inserts
+
+        Args:
+            ids (List[str]): Ids of the documents to delete
+        """
+        index = self._open()
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                slots = [
+                    row[0] for row in index.execute(f"SELECT slot FROM documents WHERE id IN ({placeholders})", chunk)
+                ]
+                index.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", chunk)
+                index.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", [(slot,) for slot in slots])
+                self._valid[slots] = False
+            index.commit()
+        logger.debug(f"Deleted {len(ids)} documents")
+
+    def insert(self, documents: List[Document]) -> None:
+        logger.debug(f"Inserting {len(documents)} documents")
+        count = self._write(self._open(), documents, upsert=False)
+        logger.debug(f"Inserted {count} documents")
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document]) -> None:
+        logger.debug(f"Upserting {len(documents)} documents")
+        count = self._write(self._open(), documents, upsert=True)
+        logger.debug(f"Upserted {count} documents")
+
+    def _scores(self, query: np.ndarray, slots: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns the exact similarity of the query to the given slots or all slots, higher is more similar"""
+        assert self._vectors is not None
+        if slots is None:
+            vectors, norms = self._vectors[: self._num_slots], self._norms[: self._num_slots]
+        else:
+            vectors, norms = self._vectors[slots], self._norms[slots]
+        scores = vectors @ query
+        if self.distance == Distance.cosine:
+            denominator = norms * np.linalg.norm(query)
+            scores = np.divide(scores, denominator, out=np.zeros_like(scores), where=denominator > 0)
+        elif self.distance == Distance.l2:
+            # ||v - q||^2 = ||v||^2 - 2 v.q + ||q||^2, the last term does not change the ranking
+            scores = 2 * scores - np.square(norms)
+        return scores
+
+    def _batch_scores(self, queries: np.ndarray) -> np.ndarray:
+        """Returns the exact similarity of each query to all slots, one row per query, using a single matrix product"""
+        assert self._vectors is not None
+        vectors, norms = self._vectors[: self._num_slots], self._norms[: self._num_slots]
+        scores = queries @ vectors.T
+        if self.distance == Distance.cosine:
+            denominator = np.outer(np.linalg.norm(queries, axis=1), norms)
+            scores = np.divide(scores, denominator, out=np.zeros_like(scores), where=denominator > 0)
+        elif self.distance == Distance.l2:
+            scores = 2 * scores - np.square(norms)
+        return scores
+
+    def _search_index(self, query: np.ndarray, mask: np.ndarray, limit: int) -> np.ndarray:
+        """Returns the slots of the top `limit` documents using the IVF-PQ index"""
+        assert self.index is not None
+        index_query = query
+        if self.distance == Distance.cosine and np.linalg.norm(query) > 0:
+            index_query = query / np.linalg.norm(query)
+        num_candidates = limit * self.index.refine_factor if self.index.refine_factor else limit
+        slots, scores = self._ivfpq.search(index_query, mask, num_candidates, self.index.nprobe)
+        if self.index.refine_factor and len(slots) > 0:
+            # Re-rank the candidates using the exact vectors
+            scores = self._scores(query, np.sort(slots))
+            slots = np.sort(slots)
+        return slots[np.argsort(-scores)[:limit]]
+
+    def _filter_mask(self, index: sqlite3.Connection, filters: Dict[str, Any]) -> np.ndarray:
+        """Returns the slots whose name or meta_data match the filters"""
+        conditions: List[str] = []
+        params: List[Any] = []
+        for key, value in filters.items():
+            if key == "name":
+                conditions.append("name = ?")
+                params.append(value)
+            else:
+                conditions.append("json_extract(payload, ?) = json_extract(?, '$')")
+                params.extend([f'$.meta_data."{key}"', json.dumps(value)])
+        mask = np.zeros(self._num_slots, dtype=bool)
+        slots = [
+            row[0] for row in index.execute(f"SELECT slot FROM documents WHERE {' AND '.join(conditions)}", params)
+        ]
+        mask[slots] = True
+        return mask
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        if query_embedding is None:
+            query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+
+        index = self._open()
+        with self._lock:
+            if self._vectors is None or self._num_slots == 0:
+                return []
+
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            mask = self._valid[: self._num_slots]
+            if filters:
+                mask = mask & self._filter_mask(index, filters)
+
+            k = min(limit, int(mask.sum()))
+            if k <= 0:
+                return []
+            if self.index is not None and self._ivfpq.trained:
+                top_k = self._search_index(query_vector, mask, k)
+            else:
+                top_k = self._top_k(np.where(mask, self._scores(query_vector), -np.inf), k)
+
+            return self._get_documents(index, [int(slot) for slot in top_k], include_embeddings)
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        # Select the top k without sorting all rows, then sort only those
+        top_k = np.argpartition(-scores, k - 1)[:k]
+        return top_k[np.argsort(-scores[top_k])]
+
+    def _get_documents(self, index: sqlite3.Connection, slots: List[int], include_embeddings: bool) -> List[Document]:
+        """Returns the documents stored at the given slots, in order. Must be called with the lock held."""
+        assert self._vectors is not None
+        placeholders = ",".join("?" * len(slots))
+        payloads = {
+            row[0]: json.loads(row[1])
+            for row in index.execute(f"SELECT slot, payload FROM documents WHERE slot IN ({placeholders})", slots)
+        }
+
+        # Build search results
+        search_results: List[Document] = []
+        for slot in slots:
+            payload = payloads.get(slot)
+            if payload is None:
+                continue
+            if not include_embeddings:
+                search_results.append(
+                    Document.model_construct(
+                        name=payload["name"], meta_data=payload["meta_data"], content=payload["content"]
+                    )
+                )
+                continue
+            search_results.append(
+                Document(
+                    name=payload["name"],
+                    meta_data=payload["meta_data"],
+                    content=payload["content"],
+                    embedder=self.embedder,
+                    embedding=self._vectors[slot].tolist(),
+                    usage=payload["usage"],
+                )
+            )
+        return search_results
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        *,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = True,
+    ) -> List[List[Document]]:
+        query_embeddings = self.get_query_embeddings(queries, query_embeddings)
+        if len(query_embeddings) == 0:
+            return [[] for _ in queries]
+
+        index = self._open()
+        with self._lock:
+            if self._vectors is None or self._num_slots == 0:
+                return [[] for _ in queries]
+
+            mask = self._valid[: self._num_slots]
+            if filters:
+                mask = mask & self._filter_mask(index, filters)
+            k = min(limit, int(mask.sum()))
+            if k <= 0:
+                return [[] for _ in queries]
+
+            search_results: List[List[Document]] = []
+            if self.index is not None and self._ivfpq.trained:
+                for query_embedding in query_embeddings:
+                    query = np.asarray(query_embedding, dtype=np.float32)
+                    slots = [int(slot) for slot in self._search_index(query, mask, k)]
+                    search_results.append(self._get_documents(index, slots, include_embeddings))
+                return search_results
+
+            # Score queries in chunks, bounding the score matrix to about _BATCH_SCORES floats
+            chunk_size = max(1, _BATCH_SCORES // self._num_slots)
+            for i in range(0, len(query_embeddings), chunk_size):
+                queries_chunk = np.asarray(query_embeddings[i : i + chunk_size], dtype=np.float32)
+                scores = np.where(mask, self._batch_scores(queries_chunk), -np.inf)
+                for row in scores:
+                    slots = [int(slot) for slot in self._top_k(row, k)]
+                    search_results.append(self._get_documents(index, slots, include_embeddings))
+            return search_results
+
+    def delete(self) -> None:
+        self.close()
+        self._ivfpq.delete()
+        if self.path.exists():
+            logger.debug(f"Deleting collection: {self.path}")
+            shutil.rmtree(self.path)
+
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    def get_count(self) -> int:
+        index = self._open()
+        with self._lock:
+            return index.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def optimize(self) -> None:
+        """Compacts the matrix file, moving documents into the slots freed by deletes, and trains the index
+        once the collection has `index.min_rows` documents or doubled in size since it was trained.
+        """
+        index = self._open()
+        with self._lock:
+            self._compact(index)
+            if self.index is None or self._num_slots < self.index.min_rows:
+                return
+            if self._ivfpq.trained and self._num_slots < 2 * self._ivfpq.num_trained:
+                return
+            self._train_index()
+
+    def _train_index(self) -> None:
+        assert self.index is not None
+        rng = np.random.default_rng(self.index.seed)
+        slots = np.arange(self._num_slots)
+        sample = np.sort(rng.choice(slots, size=min(self.index.train_size, len(slots)), replace=False))
+        self._ivfpq.train(self._index_vectors(sample), config=self.index, num_vectors=len(slots))
+        self._ivfpq.resize(self._capacity)
+        # Encode in batches to bound the memory used
+        for i in range(0, len(slots), self.index.train_size):
+            batch = slots[i : i + self.index.train_size]
+            self._ivfpq.add(batch, self._index_vectors(batch))
+        self._ivfpq.save()
+        logger.info(f"Trained index on {len(slots)} documents")
+
+    def _compact(self, index: sqlite3.Connection) -> None:
+        rows = index.execute("SELECT slot FROM documents ORDER BY slot").fetchall()
+        slots = [row[0] for row in rows]
+        if len(slots) == self._num_slots and len(slots) + self.grow_by >= self._capacity:
+            return
+
+        logger.debug(f"Compacting {self._num_slots} slots to {len(slots)} documents")
+        if len(slots) > 0:
+            if self._vectors is not None:
+                self._vectors[: len(slots)] = self._vectors[slots]
+                self._norms[: len(slots)] = self._norms[slots]
+            self._ivfpq.move(slots)
+        # Renumber the slots in two steps to avoid conflicts on the primary key
+        index.executemany("UPDATE documents SET slot = ? WHERE slot = ?", [(-1 - i, s) for i, s in enumerate(slots)])
+        index.execute("UPDATE documents SET slot = -1 - slot")
+        index.execute("DELETE FROM free_slots")
+
+        self._num_slots = len(slots)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        self._capacity = len(slots) + self.grow_by
+        with self.vectors_path.open("r+b") as f:
+            f.truncate(self._capacity * self.dimensions * 4)
+        self._valid = np.zeros(self._capacity, dtype=bool)
+        self._valid[: self._num_slots] = True
+        self._norms = np.concatenate(
+            [self._norms[: self._num_slots], np.zeros(self._capacity - self._num_slots, dtype=np.float32)]
+        )
+        self._map()
+        self._ivfpq.resize(self._capacity)
+        index.commit()
+
+    def clear(self) -> bool:
+        index = self._open()
+        with self._lock:
+            index.execute("DELETE FROM documents")
+            index.execute("DELETE FROM free_slots")
+            index.commit()
+            self._num_slots = 0
+            self._valid[:] = False
+            self._ivfpq.delete()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            self._ivfpq.flush()
+            if self._index is not None:
+                self._index.close()
+                self._index = None
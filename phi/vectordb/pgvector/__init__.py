@@ -1,4 +1,5 @@
 from micro.vectordb.distance import Distance
+from micro.vectordb.search import SearchType
 from micro.vectordb.pgvector.index import Ivfflat, HNSW
 from micro.vectordb.pgvector.pgvector import PgVector
 from micro.vectordb.pgvector.pgvector2 import PgVector2
@@ -0,0 +1,93 @@
+import json
+import struct
+from typing import Any, Iterable, Iterator, List, Optional
+
+# Header of the Postgres binary COPY format: signature, flags and header extension length
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+_NULL = struct.pack("!i", -1)
+
+
+def encode_text(value: Optional[str]) -> Optional[bytes]:
+    """Binary representation of a text or varchar value"""
+    return value.encode() if value is not None else None
+
+
+def encode_jsonb(value: Any) -> Optional[bytes]:
+    """Binary representation of a jsonb value: the version byte followed by the json text"""
+    return b"\x01" + json.dumps(value).encode() if value is not None else None
+
+
+def encode_vector(value: Optional[List[float]]) -> Optional[bytes]:
+    """Binary representation of a pgvector vector: dimensions, an unused int16 and the float4 values"""
+    if value is None:
+        return None
+    return struct.pack(f"!hh{len(value)}f", len(value), 0, *value)
+
+
+def encode_row(values: List[Optional[bytes]]) -> bytes:
+    """Binary representation of a row of encoded values"""
+    row = [struct.pack("!h", len(values))]
+    for value in values:
+        if value is None:
+            row.append(_NULL)
+        else:
+            row.append(struct.pack("!i", len(value)))
+            row.append(value)
+    return b"".join(row)
+
+
+def copy_chunks(rows: Iterable[bytes], max_buffer_bytes: int) -> Iterator[bytes]:
+    """Yields the binary COPY stream for the encoded rows in chunks of up to `max_buffer_bytes`"""
+    buffer = [COPY_HEADER]
+    buffer_size = len(COPY_HEADER)
+    for row in rows:
+        if buffer_size + len(row) > max_buffer_bytes and buffer_size > 0:
+            yield b"".join(buffer)
+            buffer, buffer_size = [], 0
+        buffer.append(row)
+        buffer_size += len(row)
+    buffer.append(COPY_TRAILER)
+    yield b"".join(buffer)
+
+
+class _ChunkReader:
+    """File-like object reading from an iterator of chunks, used for psycopg2 `copy_expert`"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        # Current chunk and the offset of its first unread byte, so each byte is copied once
+        self.chunk = memoryview(b"")
+        self.offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        parts: List[memoryview] = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            if self.offset >= len(self.chunk):
+                chunk = next(self.chunks, None)
+                if chunk is None:
+                    break
+                self.chunk, self.offset = memoryview(chunk), 0
+                continue
+            end = len(self.chunk) if size < 0 else min(self.offset + remaining, len(self.chunk))
+            parts.append(self.chunk[self.offset : end])
+            remaining -= end - self.offset
+            self.offset = end
+        return b"".join(parts)
+
+
+def copy_from(dbapi_connection: Any, sql: str, chunks: Iterator[bytes]) -> None:
+    """Streams the chunks to a `COPY ... FROM STDIN` statement using psycopg 3 or psycopg2"""
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                for chunk in chunks:
+                    copy.write(chunk)
+        elif hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(sql, _ChunkReader(chunks))
+        else:
+            raise ValueError(f"COPY is not supported by the database driver: {type(dbapi_connection)}")
+    finally:
+        cursor.close()
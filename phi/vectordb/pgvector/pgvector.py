@@ -1,4 +1,4 @@
-from typing import Optional, List, Union
+from typing import Optional, List, Set, Union
 from hashlib import md5
 
 try:
@@ -7,7 +7,7 @@ try:
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
+    from sqlalchemy.sql.expression import any_, bindparam, text, func, select
     from sqlalchemy.types import DateTime, String
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
@@ -123,6 +123,22 @@ class PgVector(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Returns the content hashes which exist in the table, in a single query
+
+        Args:
+            hashes (List[str]): Content hashes to check
+        """
+        if len(hashes) == 0:
+            return set()
+        # Bind the hashes as a single array parameter: content_hash = ANY(:hashes)
+        _hashes = bindparam("hashes", value=list(set(hashes)), type_=postgresql.ARRAY(String))
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = select(self.table.c.content_hash).where(self.table.c.content_hash == any_(_hashes)).distinct()
+                return {row[0] for row in sess.execute(stmt)}
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -197,19 +213,23 @@ class PgVector(VectorDb):
                     sess.execute(stmt)
                     logger.debug(f"Upserted document: {document.name} ({document.meta_data})")
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        if query_embedding is None:
+            query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        columns = [
-            self.table.c.name,
-            self.table.c.meta_data,
-            self.table.c.content,
-            self.table.c.embedding,
-            self.table.c.usage,
-        ]
+        columns = [self.table.c.name, self.table.c.meta_data, self.table.c.content]
+        if include_embeddings:
+            columns.extend([self.table.c.embedding, self.table.c.usage])
 
         stmt = select(*columns)
         if self.distance == Distance.l2:
@@ -235,6 +255,12 @@ class PgVector(VectorDb):
         # Build search results
         search_results: List[Document] = []
         for neighbor in neighbors:
+            if not include_embeddings:
+                # Skip validation, the values come from typed columns
+                search_results.append(
+                    Document.model_construct(name=neighbor.name, meta_data=neighbor.meta_data, content=neighbor.content)
+                )
+                continue
             search_results.append(
                 Document(
                     name=neighbor.name,
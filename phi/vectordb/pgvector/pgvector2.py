@@ -1,4 +1,6 @@
-from typing import Optional, List, Union, Dict, Any
+import json
+import re
+from typing import Optional, List, Set, Union, Dict, Any
 from hashlib import md5
 
 try:
@@ -6,9 +8,10 @@ try:
     from sqlalchemy.engine import create_engine, Engine
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
-    from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
-    from sqlalchemy.types import DateTime, String
+    from sqlalchemy.schema import MetaData, Table, Column, Computed
+    from sqlalchemy.sql.expression import any_, bindparam, text, func, select, literal_column, literal, cast
+    from sqlalchemy.sql.expression import and_, or_, not_, false, true, values, column
+    from sqlalchemy.types import DateTime, Integer, String
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
 
@@ -21,6 +24,9 @@ from micro.document import Document
 from micro.embedder import Embedder
 from micro.vectordb.base import VectorDb
 from micro.vectordb.distance import Distance
+from micro.vectordb.filters import FilterCondition, compare, parse_filters
+from micro.vectordb.search import SearchType
+from micro.vectordb.pgvector.copy import copy_chunks, copy_from, encode_jsonb, encode_row, encode_text, encode_vector
 from micro.vectordb.pgvector.index import Ivfflat, HNSW
 from micro.utils.log import logger
 
@@ -35,6 +41,19 @@ class PgVector2(VectorDb):
         embedder: Optional[Embedder] = None,
         distance: Distance = Distance.cosine,
         index: Optional[Union[Ivfflat, HNSW]] = HNSW(),
+        bulk_load: bool = False,
+        copy_batch_size: int = 10000,
+        copy_buffer_mb: float = 64,
+        rebuild_index_threshold: Optional[int] = 100000,
+        search_type: SearchType = SearchType.vector,
+        full_text_search: Optional[bool] = None,
+        text_search_config: str = "english",
+        vector_weight: float = 1.0,
+        keyword_weight: float = 1.0,
+        rrf_k: int = 60,
+        hybrid_candidates: int = 40,
+        meta_data_index: bool = False,
+        meta_data_indexed_keys: Optional[List[str]] = None,
     ):
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
@@ -67,6 +86,42 @@ class PgVector2(VectorDb):
         # Index for the collection
         self.index: Optional[Union[Ivfflat, HNSW]] = index
 
+        # Bulk load settings, if bulk_load is True insert and upsert stream documents using binary COPY
+        self.bulk_load: bool = bulk_load
+        # Number of documents copied and merged per transaction
+        self.copy_batch_size: int = copy_batch_size
+        # Maximum size of the COPY data buffered in memory
+        self.copy_buffer_mb: float = copy_buffer_mb
+        # Drop the index and rebuild it after loading at least this many documents, disabled if None
+        self.rebuild_index_threshold: Optional[int] = rebuild_index_threshold
+
+        # Search settings
+        self.search_type: SearchType = search_type
+        # Adds a generated tsvector column with a GIN index, required for keyword and hybrid search
+        self.full_text_search: bool = (
+            full_text_search if full_text_search is not None else search_type != SearchType.vector
+        )
+        if not self.full_text_search and search_type != SearchType.vector:
+            raise ValueError(f"{search_type.value} search requires full_text_search")
+        # Text search configuration used to build the tsvector and parse queries, e.g. "english" or "simple"
+        self.text_search_config: str = text_search_config
+        # Hybrid search scores each row by reciprocal rank fusion:
+        # vector_weight / (rrf_k + vector rank) + keyword_weight / (rrf_k + keyword rank)
+        self.vector_weight: float = vector_weight
+        self.keyword_weight: float = keyword_weight
+        self.rrf_k: int = rrf_k
+        # Number of candidates ranked by each of the vector and keyword searches before fusion
+        self.hybrid_candidates: int = hybrid_candidates
+
+        # Metadata indexes created by optimize()
+        # GIN index on meta_data, used by equality and IN filters
+        self.meta_data_index: bool = meta_data_index
+        # Btree indexes on the value of these keys, e.g. ["tenant", "source.type"], used by all filters on them
+        self.meta_data_indexed_keys: List[str] = meta_data_indexed_keys or []
+        for key in self.meta_data_indexed_keys:
+            if not all(re.fullmatch(r"[\w\-]+", part) for part in key.split(".")):
+                raise ValueError(f"Invalid meta_data key: {key}")
+
         # Database session
         self.Session: sessionmaker[Session] = sessionmaker(bind=self.db_engine)
 
@@ -74,9 +129,7 @@ class PgVector2(VectorDb):
         self.table: Table = self.get_table()
 
     def get_table(self) -> Table:
-        return Table(
-            self.collection,
-            self.metadata,
+        columns = [
             Column("id", String, primary_key=True),
             Column("name", String),
             Column("meta_data", postgresql.JSONB, server_default=text("'{}'::jsonb")),
@@ -86,8 +139,41 @@ class PgVector2(VectorDb):
             Column("created_at", DateTime(timezone=True), server_default=text("now()")),
             Column("updated_at", DateTime(timezone=True), onupdate=text("now()")),
             Column("content_hash", String),
-            extend_existing=True,
-        )
+        ]
+        if self.full_text_search:
+            columns.append(
+                Column("content_tsv", postgresql.TSVECTOR, Computed(self.get_tsvector_expression(), persisted=True))
+            )
+        return Table(self.collection, self.metadata, *columns, extend_existing=True)
+
+    def get_tsvector_expression(self) -> str:
+        return f"to_tsvector('{self.text_search_config}'::regconfig, coalesce(content, ''))"
+
+    def get_full_text_index_name(self) -> str:
+        return f"{self.collection}_content_tsv_index"
+
+    def create_full_text_index(self) -> None:
+        """Adds the generated tsvector column to an existing table if missing, and creates its GIN index"""
+        if not self.full_text_search:
+            return
+        inspector = inspect(self.db_engine)
+        index_name = self.get_full_text_index_name()
+        if any(
+            column["name"] == "content_tsv" for column in inspector.get_columns(self.table.name, schema=self.schema)
+        ):
+            if any(index["name"] == index_name for index in inspector.get_indexes(self.table.name, schema=self.schema)):
+                return
+
+        logger.debug(f"Creating full text index: {index_name}")
+        with self.Session() as sess:
+            with sess.begin():
+                sess.execute(
+                    text(
+                        f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+                        f"GENERATED ALWAYS AS ({self.get_tsvector_expression()}) STORED;"
+                    )
+                )
+                sess.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} USING gin (content_tsv);"))
 
     def table_exists(self) -> bool:
         logger.debug(f"Checking if table exists: {self.table.name}")
@@ -108,6 +194,7 @@ class PgVector2(VectorDb):
                         sess.execute(text(f"create schema if not exists {self.schema};"))
             logger.debug(f"Creating table: {self.collection}")
             self.table.create(self.db_engine)
+        self.create_full_text_index()
 
     def doc_exists(self, document: Document) -> bool:
         """
@@ -124,6 +211,22 @@ class PgVector2(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Returns the content hashes which exist in the table, in a single query
+
+        Args:
+            hashes (List[str]): Content hashes to check
+        """
+        if len(hashes) == 0:
+            return set()
+        # Bind the hashes as a single array parameter: content_hash = ANY(:hashes)
+        _hashes = bindparam("hashes", value=list(set(hashes)), type_=postgresql.ARRAY(String))
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = select(self.table.c.content_hash).where(self.table.c.content_hash == any_(_hashes)).distinct()
+                return {row[0] for row in sess.execute(stmt)}
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -151,10 +254,14 @@ class PgVector2(VectorDb):
                 return result is not None
 
     def insert(self, documents: List[Document], batch_size: int = 10) -> None:
+        if self.bulk_load:
+            self.copy_documents(documents, upsert=False)
+            return
+
+        Document.embed_documents(documents, embedder=self.embedder)
         with self.Session() as sess:
             counter = 0
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 content_hash = md5(cleaned_content.encode()).hexdigest()
                 _id = document.id or content_hash
@@ -182,6 +289,23 @@ class PgVector2(VectorDb):
                 sess.commit()
                 logger.info(f"Committed {counter} documents")
 
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """
+        Delete the rows with the given ids
+
+        Args:
+            ids (List[str]): Ids of the rows to delete
+        """
+        from sqlalchemy import delete
+
+        if len(ids) == 0:
+            return
+        with self.Session() as sess:
+            with sess.begin():
+                stmt = delete(self.table).where(self.table.c.id.in_(ids))
+                sess.execute(stmt)
+                logger.debug(f"Deleted {len(ids)} documents")
+
     def upsert_available(self) -> bool:
         return True
 
@@ -193,10 +317,14 @@ class PgVector2(VectorDb):
             documents (List[Document]): List of documents to upsert
             batch_size (int): Batch size for upserting documents
         """
+        if self.bulk_load:
+            self.copy_documents(documents, upsert=True)
+            return
+
+        Document.embed_documents(documents, embedder=self.embedder)
         with self.Session() as sess:
             counter = 0
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 content_hash = md5(cleaned_content.encode()).hexdigest()
                 _id = document.id or content_hash
@@ -236,33 +364,141 @@ class PgVector2(VectorDb):
                 sess.commit()
                 logger.info(f"Committed {counter} documents")
 
-    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
-        if query_embedding is None:
-            logger.error(f"Error getting embedding for Query: {query}")
-            return []
+    def copy_documents(self, documents: List[Document], upsert: bool = True) -> None:
+        """
+        Bulk load documents using binary COPY into a staging table, merged into the collection table
+        with a single INSERT ... ON CONFLICT per batch.
 
-        columns = [
-            self.table.c.name,
-            self.table.c.meta_data,
-            self.table.c.content,
-            self.table.c.embedding,
-            self.table.c.usage,
-        ]
+        Args:
+            documents (List[Document]): List of documents to load
+            upsert (bool): If True, update rows with the same id, otherwise keep the existing rows
+        """
+        if len(documents) == 0:
+            return
 
-        stmt = select(*columns)
+        # Maintaining the index row by row is slower than rebuilding it after a large load
+        rebuild_index = (
+            self.rebuild_index_threshold is not None
+            and len(documents) >= self.rebuild_index_threshold
+            and self.drop_index()
+        )
+        try:
+            for i in range(0, len(documents), self.copy_batch_size):
+                batch = documents[i : i + self.copy_batch_size]
+                Document.embed_documents(batch, embedder=self.embedder)
+                self._copy_batch(batch, upsert=upsert)
+                logger.info(f"Copied {len(batch)} documents")
+        finally:
+            if rebuild_index:
+                logger.info("Rebuilding index")
+                self.optimize()
+
+    def _copy_batch(self, documents: List[Document], upsert: bool) -> None:
+        staging_table = f"{self.collection}_staging"
+        columns = "id, name, meta_data, content, embedding, usage, content_hash"
+
+        def rows():
+            for document in documents:
+                cleaned_content = document.content.replace("\x00", "\ufffd")
+                content_hash = md5(cleaned_content.encode()).hexdigest()
+                yield encode_row(
+                    [
+                        encode_text(document.id or content_hash),
+                        encode_text(document.name),
+                        encode_jsonb(document.meta_data),
+                        encode_text(cleaned_content),
+                        encode_vector(document.embedding),
+                        encode_jsonb(document.usage),
+                        encode_text(content_hash),
+                    ]
+                )
 
-        if filters is not None:
-            for key, value in filters.items():
-                if hasattr(self.table.c, key):
-                    stmt = stmt.where(getattr(self.table.c, key) == value)
+        if upsert:
+            on_conflict = (
+                "DO UPDATE SET name = EXCLUDED.name, meta_data = EXCLUDED.meta_data, content = EXCLUDED.content, "
+                "embedding = EXCLUDED.embedding, usage = EXCLUDED.usage, content_hash = EXCLUDED.content_hash, "
+                "updated_at = now()"
+            )
+        else:
+            on_conflict = "DO NOTHING"
 
-        if self.distance == Distance.l2:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
-        if self.distance == Distance.cosine:
-            stmt = stmt.order_by(self.table.c.embedding.cosine_distance(query_embedding))
-        if self.distance == Distance.max_inner_product:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+        with self.Session() as sess:
+            with sess.begin():
+                sess.execute(
+                    text(
+                        f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} (id varchar, name varchar, meta_data jsonb, "
+                        f"content text, embedding vector({self.dimensions}), usage jsonb, content_hash varchar) "
+                        "ON COMMIT DROP;"
+                    )
+                )
+                copy_from(
+                    sess.connection().connection.driver_connection,
+                    f"COPY {staging_table} ({columns}) FROM STDIN WITH (FORMAT BINARY)",
+                    copy_chunks(rows(), max_buffer_bytes=int(self.copy_buffer_mb * 1024 * 1024)),
+                )
+                # DISTINCT ON because a row cannot be updated twice by the same statement
+                sess.execute(
+                    text(
+                        f"INSERT INTO {self.table} ({columns}) "
+                        f"SELECT DISTINCT ON (id) {columns} FROM {staging_table} "
+                        f"ON CONFLICT (id) {on_conflict};"
+                    )
+                )
+
+    def get_index_name(self) -> Optional[str]:
+        if self.index is None:
+            return None
+        if self.index.name is None:
+            _type = "ivfflat" if isinstance(self.index, Ivfflat) else "hnsw"
+            self.index.name = f"{self.collection}_{_type}_index"
+        return self.index.name
+
+    def drop_index(self) -> bool:
+        """Drops the vector index if it exists, returns True if it was dropped"""
+        index_name = self.get_index_name()
+        if index_name is None or not self.table_exists():
+            return False
+        existing_indexes = inspect(self.db_engine).get_indexes(self.table.name, schema=self.schema)
+        if not any(index["name"] == index_name for index in existing_indexes):
+            return False
+
+        logger.debug(f"Dropping index: {index_name}")
+        _index_name = f"{self.schema}.{index_name}" if self.schema is not None else index_name
+        with self.Session() as sess:
+            with sess.begin():
+                sess.execute(text(f"DROP INDEX IF EXISTS {_index_name};"))
+        return True
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        if self.search_type != SearchType.keyword:
+            if query_embedding is None:
+                query_embedding = self.embedder.get_embedding(query)
+            if query_embedding is None:
+                logger.error(f"Error getting embedding for Query: {query}")
+                return []
+
+        columns = [self.table.c.name, self.table.c.meta_data, self.table.c.content]
+        if include_embeddings:
+            columns.extend([self.table.c.embedding, self.table.c.usage])
+
+        if self.search_type == SearchType.vector:
+            stmt = self.apply_filters(select(*columns), filters)
+            stmt = stmt.order_by(self.get_distance(query_embedding))  # type: ignore
+        elif self.search_type == SearchType.keyword:
+            ts_query = self.get_ts_query(query)
+            stmt = self.apply_filters(select(*columns), filters)
+            stmt = stmt.where(self.table.c.content_tsv.op("@@")(ts_query))
+            stmt = stmt.order_by(func.ts_rank_cd(self.table.c.content_tsv, ts_query).desc())
+        else:
+            stmt = self.get_hybrid_search_statement(query, query_embedding, filters, columns, limit)  # type: ignore
 
         stmt = stmt.limit(limit=limit)
         logger.debug(f"Query: {stmt}")
@@ -271,11 +507,7 @@ class PgVector2(VectorDb):
         try:
             with self.Session() as sess:
                 with sess.begin():
-                    if self.index is not None:
-                        if isinstance(self.index, Ivfflat):
-                            sess.execute(text(f"SET LOCAL ivfflat.probes = {self.index.probes}"))
-                        elif isinstance(self.index, HNSW):
-                            sess.execute(text(f"SET LOCAL hnsw.ef_search  = {self.index.ef_search}"))
+                    self.set_search_parameters(sess, limit)
                     neighbors = sess.execute(stmt).fetchall() or []
         except Exception as e:
             logger.error(f"Error searching for documentsss: {e}")
@@ -284,21 +516,237 @@ class PgVector2(VectorDb):
             return []
 
         # Build search results
-        search_results: List[Document] = []
-        for neighbor in neighbors:
-            search_results.append(
-                Document(
-                    name=neighbor.name,
-                    meta_data=neighbor.meta_data,
-                    content=neighbor.content,
-                    embedder=self.embedder,
-                    embedding=neighbor.embedding,
-                    usage=neighbor.usage,
+        return [self.get_document(neighbor, include_embeddings) for neighbor in neighbors]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        *,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = True,
+    ) -> List[List[Document]]:
+        """
+        Returns the documents most similar to each query, in the same order as `queries`.
+        Vector searches run in a single statement: a LATERAL join of the nearest neighbor query over a VALUES list
+        of the query embeddings. Keyword and hybrid searches run one after another.
+        """
+        if self.search_type == SearchType.keyword:
+            return [
+                self.search(query=query, limit=limit, filters=filters, include_embeddings=include_embeddings)
+                for query in queries
+            ]
+        query_embeddings = self.get_query_embeddings(queries, query_embeddings)
+        if self.search_type == SearchType.hybrid:
+            return [
+                self.search(
+                    query=query,
+                    limit=limit,
+                    filters=filters,
+                    query_embedding=query_embedding,
+                    include_embeddings=include_embeddings,
                 )
-            )
+                for query, query_embedding in zip(queries, query_embeddings)
+            ]
+        if len(query_embeddings) == 0:
+            return []
+
+        queries_table = values(
+            column("query_index", Integer), column("query_embedding", Vector(self.dimensions)), name="queries"
+        ).data([(i, query_embedding) for i, query_embedding in enumerate(query_embeddings)])
+        distance = self.get_distance(cast(queries_table.c.query_embedding, Vector(self.dimensions)))
+
+        columns = [self.table.c.name, self.table.c.meta_data, self.table.c.content]
+        if include_embeddings:
+            columns.extend([self.table.c.embedding, self.table.c.usage])
+        neighbors_query = self.apply_filters(select(*columns, distance.label("distance")), filters)
+        neighbors_query = neighbors_query.order_by(distance).limit(limit).lateral("neighbors")
+        stmt = (
+            select(queries_table.c.query_index, neighbors_query)
+            .select_from(queries_table.join(neighbors_query, true()))
+            .order_by(queries_table.c.query_index, neighbors_query.c.distance)
+        )
+        logger.debug(f"Query: {stmt}")
 
+        try:
+            with self.Session() as sess:
+                with sess.begin():
+                    self.set_search_parameters(sess, limit)
+                    neighbors = sess.execute(stmt).fetchall() or []
+        except Exception as e:
+            logger.error(f"Error searching for documents: {e}")
+            logger.error("Table might not exist, creating for future use")
+            self.create()
+            return [[] for _ in queries]
+
+        search_results: List[List[Document]] = [[] for _ in queries]
+        for neighbor in neighbors:
+            search_results[neighbor.query_index].append(self.get_document(neighbor, include_embeddings))
         return search_results
 
+    def set_search_parameters(self, sess: Session, limit: int) -> None:
+        """Sets the index search parameters for the current transaction"""
+        if self.index is None:
+            return
+        if isinstance(self.index, Ivfflat):
+            sess.execute(text(f"SET LOCAL ivfflat.probes = {self.index.probes}"))
+        elif isinstance(self.index, HNSW):
+            ef_search = self.index.ef_search
+            if self.search_type == SearchType.hybrid:
+                # HNSW returns at most ef_search rows
+                ef_search = max(ef_search, self.get_num_candidates(limit))
+            sess.execute(text(f"SET LOCAL hnsw.ef_search  = {ef_search}"))
+
+    def get_document(self, neighbor: Any, include_embeddings: bool) -> Document:
+        if not include_embeddings:
+            # Skip validation, the values come from typed columns
+            return Document.model_construct(name=neighbor.name, meta_data=neighbor.meta_data, content=neighbor.content)
+        return Document(
+            name=neighbor.name,
+            meta_data=neighbor.meta_data,
+            content=neighbor.content,
+            embedder=self.embedder,
+            embedding=neighbor.embedding,
+            usage=neighbor.usage,
+        )
+
+    def apply_filters(self, stmt, filters: Optional[Dict[str, Any]]):
+        """Adds the filters to the WHERE clause, see `parse_filters` for the filter syntax.
+        Keys which are table columns filter the column, other keys filter meta_data.
+        """
+        if filters:
+            stmt = stmt.where(and_(*[self.get_filter_clause(condition) for condition in parse_filters(filters)]))
+        return stmt
+
+    def get_filter_clause(self, condition: FilterCondition):
+        operator, value = condition.operator, condition.value
+        if len(condition.path) == 1 and condition.key != "meta_data" and condition.key in self.table.c:
+            return compare(self.table.c[condition.key], operator, value)
+
+        meta_data = self.table.c.meta_data
+        values = value if operator in ("$in", "$nin") else [value]
+        if condition.key in self.meta_data_indexed_keys or operator in ("$gt", "$gte", "$lt", "$lte"):
+            # Compare the jsonb value at the path, which uses the expression index on (meta_data #> path)
+            target = self.get_meta_data_path(condition)
+            if operator in ("$gt", "$gte", "$lt", "$lte"):
+                _value = self.to_jsonb(value)
+                sql_operator = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}[operator]
+                # jsonb orders values of different types, e.g. strings before numbers, so only compare the same type
+                return and_(target.op(sql_operator)(_value), func.jsonb_typeof(target) == func.jsonb_typeof(_value))
+            clause = or_(false(), *[target == self.to_jsonb(v) for v in values])
+        else:
+            # Containment uses the GIN index on meta_data
+            clause = or_(
+                false(),
+                *[meta_data.op("@>")(self.to_jsonb(self.nest(condition.path, v))) for v in values],
+            )
+        return not_(clause) if operator in ("$ne", "$nin") else clause
+
+    def get_meta_data_path(self, condition: FilterCondition):
+        if condition.key in self.meta_data_indexed_keys:
+            # Keys are validated in __init__, the literal path lets the planner match the expression index
+            return self.table.c.meta_data.op("#>")(literal_column(f"'{{{','.join(condition.path)}}}'::text[]"))
+        return self.table.c.meta_data.op("#>")(cast(condition.path, postgresql.ARRAY(postgresql.TEXT)))
+
+    @staticmethod
+    def to_jsonb(value: Any):
+        # Bound as text, a JSONB bind parameter would serialize the string again
+        return cast(literal(json.dumps(value), String), postgresql.JSONB)
+
+    @staticmethod
+    def nest(path: List[str], value: Any) -> Dict[str, Any]:
+        for key in reversed(path[1:]):
+            value = {key: value}
+        return {path[0]: value}
+
+    def get_meta_data_index_name(self, key: Optional[str] = None) -> str:
+        if key is None:
+            return f"{self.collection}_meta_data_index"
+        return f"{self.collection}_meta_data_{key.replace('.', '_').replace('-', '_')}_index"
+
+    def create_meta_data_indexes(self) -> None:
+        if not self.meta_data_index and len(self.meta_data_indexed_keys) == 0:
+            return
+        with self.Session() as sess:
+            with sess.begin():
+                if self.meta_data_index:
+                    logger.debug(f"Creating meta_data index: {self.get_meta_data_index_name()}")
+                    sess.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS {self.get_meta_data_index_name()} ON {self.table} "
+                            "USING gin (meta_data jsonb_path_ops);"
+                        )
+                    )
+                for key in self.meta_data_indexed_keys:
+                    logger.debug(f"Creating meta_data index: {self.get_meta_data_index_name(key)}")
+                    sess.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS {self.get_meta_data_index_name(key)} ON {self.table} "
+                            f"((meta_data #> '{{{','.join(key.split('.'))}}}'::text[]));"
+                        )
+                    )
+
+    def get_distance(self, query_embedding: Any):
+        if self.distance == Distance.l2:
+            return self.table.c.embedding.max_inner_product(query_embedding)
+        if self.distance == Distance.cosine:
+            return self.table.c.embedding.cosine_distance(query_embedding)
+        return self.table.c.embedding.max_inner_product(query_embedding)
+
+    def get_ts_query(self, query: str):
+        # websearch_to_tsquery accepts any user input, e.g. quoted phrases, "or" and "-" exclusions
+        return func.websearch_to_tsquery(literal_column(f"'{self.text_search_config}'::regconfig"), query)
+
+    def get_num_candidates(self, limit: int) -> int:
+        return max(limit, self.hybrid_candidates)
+
+    def get_hybrid_search_statement(
+        self,
+        query: str,
+        query_embedding: List[float],
+        filters: Optional[Dict[str, Any]],
+        columns: List[Any],
+        limit: int,
+    ):
+        """
+        Builds a single statement ranking the top `get_num_candidates(limit)` rows by vector distance and by full text rank,
+        and ordering the union of both by their reciprocal rank fusion score.
+        Only the fused top rows are returned, so the candidates never leave the database.
+        """
+        num_candidates = self.get_num_candidates(limit)
+        distance = self.get_distance(query_embedding)
+        vector_search = self.apply_filters(
+            select(self.table.c.id, func.row_number().over(order_by=distance).label("rank")), filters
+        )
+        vector_search = vector_search.order_by(distance).limit(num_candidates).cte("vector_search")
+
+        ts_query = self.get_ts_query(query)
+        ts_rank = func.ts_rank_cd(self.table.c.content_tsv, ts_query)
+        keyword_search = self.apply_filters(
+            select(self.table.c.id, func.row_number().over(order_by=ts_rank.desc()).label("rank")), filters
+        )
+        keyword_search = (
+            keyword_search.where(self.table.c.content_tsv.op("@@")(ts_query))
+            .order_by(ts_rank.desc())
+            .limit(num_candidates)
+            .cte("keyword_search")
+        )
+
+        score = func.coalesce(self.vector_weight / (self.rrf_k + vector_search.c.rank), 0.0) + func.coalesce(
+            self.keyword_weight / (self.rrf_k + keyword_search.c.rank), 0.0
+        )
+        fused = (
+            select(func.coalesce(vector_search.c.id, keyword_search.c.id).label("id"), score.label("score"))
+            .select_from(vector_search.join(keyword_search, vector_search.c.id == keyword_search.c.id, full=True))
+            .cte("fused")
+        )
+        return (
+            select(*columns)
+            .select_from(self.table.join(fused, self.table.c.id == fused.c.id))
+            .order_by(fused.c.score.desc())
+        )
+
     def delete(self) -> None:
         if self.table_exists():
             logger.debug(f"Deleting table: {self.collection}")
@@ -320,12 +768,11 @@ class PgVector2(VectorDb):
         from math import sqrt
 
         logger.debug("==== Optimizing Vector DB ====")
+        self.create_meta_data_indexes()
         if self.index is None:
             return
 
-        if self.index.name is None:
-            _type = "ivfflat" if isinstance(self.index, Ivfflat) else "hnsw"
-            self.index.name = f"{self.collection}_{_type}_index"
+        self.get_index_name()
 
         index_distance = "vector_cosine_ops"
         if self.distance == Distance.l2:
@@ -1,4 +1,5 @@
-from typing import Optional, Dict, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Union, List, Set
 
 try:
     from pinecone import Pinecone
@@ -167,6 +168,28 @@ class PineconeDB(VectorDb):
         response = self.index.fetch(ids=[document.id])
         return len(response.vectors) > 0
 
+    def get_content_hash(self, document: Document) -> str:
+        # Documents are checked for existence by id
+        return self.get_document_id(document)
+
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """Return the ids which exist in the index.
+
+        Args:
+            hashes (List[str]): The ids of the documents to check.
+
+        Returns:
+            Set[str]: The ids which exist in the index.
+
+        """
+        existing: Set[str] = set()
+        ids = [_id for _id in set(hashes) if _id]
+        # Fetch accepts up to 1000 ids per request
+        for i in range(0, len(ids), 1000):
+            response = self.index.fetch(ids=ids[i : i + 1000], namespace=self.namespace)
+            existing.update(response.vectors.keys())
+        return existing
+
     def name_exists(self, name: str) -> bool:
         """Check if an index with the given name exists.
 
@@ -183,6 +206,20 @@ class PineconeDB(VectorDb):
         except Exception:
             return False
 
+    def get_document_id(self, document: Document) -> str:
+        return document.id  # type: ignore
+
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """Delete the vectors with the given ids.
+
+        Args:
+            ids (List[str]): The ids of the vectors to delete.
+
+        """
+        if len(ids) == 0:
+            return
+        self.index.delete(ids=ids, namespace=self.namespace)
+
     def upsert(
         self,
         documents: List[Document],
@@ -201,8 +238,8 @@ class PineconeDB(VectorDb):
         """
 
         vectors = []
+        Document.embed_documents(documents, embedder=self.embedder)
         for document in documents:
-            document.embed(embedder=self.embedder)
             document.meta_data["text"] = document.content
             vectors.append(
                 Vector(
@@ -248,6 +285,9 @@ class PineconeDB(VectorDb):
         namespace: Optional[str] = None,
         filter: Optional[Dict[str, Union[str, float, int, bool, List, dict]]] = None,
         include_values: Optional[bool] = None,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
     ) -> List[Document]:
         """Search for similar documents in the index.
 
@@ -258,17 +298,23 @@ class PineconeDB(VectorDb):
             filter (Optional[Dict[str, Union[str, float, int, bool, List, dict]]], optional): The filter for the search. Defaults to None.
             include_values (Optional[bool], optional): Whether to include values in the search results. Defaults to None.
             include_metadata (Optional[bool], optional): Whether to include metadata in the search results. Defaults to None.
+            query_embedding (Optional[List[float]], optional): Embedding of the query, if already computed. Defaults to None.
+            include_embeddings (bool, optional): If False, values are never included. Defaults to True.
 
         Returns:
             List[Document]: The list of matching documents.
 
         """
-        query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None:
+            query_embedding = self.embedder.get_embedding(query)
 
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
+        if not include_embeddings:
+            include_values = False
+
         response = self.index.query(
             vector=query_embedding,
             top_k=limit,
@@ -287,6 +333,53 @@ class PineconeDB(VectorDb):
             for result in response.matches
         ]
 
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict[str, Union[str, float, int, bool, List, dict]]] = None,
+        include_values: Optional[bool] = None,
+        *,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = True,
+        max_concurrency: int = 8,
+    ) -> List[List[Document]]:
+        """Search for similar documents for each query, sending the queries concurrently.
+
+        Args:
+            queries (List[str]): The queries to search for.
+            limit (int, optional): The maximum number of results per query. Defaults to 5.
+            namespace (Optional[str], optional): The namespace to search in. Defaults to None.
+            filter (Optional[Dict[str, Union[str, float, int, bool, List, dict]]], optional): The filter for the search. Defaults to None.
+            include_values (Optional[bool], optional): Whether to include values in the search results. Defaults to None.
+            query_embeddings (Optional[List[List[float]]], optional): Embeddings of the queries, if already computed. Defaults to None.
+            include_embeddings (bool, optional): If False, values are never included. Defaults to True.
+            max_concurrency (int, optional): The maximum number of concurrent queries. Defaults to 8.
+
+        Returns:
+            List[List[Document]]: The matching documents for each query, in the same order as the queries.
+
+        """
+        query_embeddings = self.get_query_embeddings(queries, query_embeddings)
+        if len(query_embeddings) == 0:
+            return []
+
+        def _search(query_and_embedding):
+            query, query_embedding = query_and_embedding
+            return self.search(
+                query=query,
+                limit=limit,
+                namespace=namespace,
+                filter=filter,
+                include_values=include_values,
+                query_embedding=query_embedding,
+                include_embeddings=include_embeddings,
+            )
+
+        with ThreadPoolExecutor(max_workers=max(min(max_concurrency, len(queries)), 1)) as executor:
+            return list(executor.map(_search, zip(queries, query_embeddings)))
+
     def optimize(self) -> None:
         """Optimize the index.
 
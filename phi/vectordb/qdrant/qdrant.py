@@ -1,12 +1,12 @@
 from hashlib import md5
-from typing import List, Optional
+from typing import List, Optional, Set
 
 try:
     from qdrant_client import QdrantClient  # noqa: F401
     from qdrant_client.http import models
 except ImportError:
     raise ImportError(
-        "The `qdrant-client` package is not installed. " "Please install it via `pip install qdrant-client`."
+        "The `qdrant-client` package is not installed. Please install it via `pip install qdrant-client`."
     )
 
 from micro.document import Document
@@ -117,6 +117,24 @@ class Qdrant(VectorDb):
             return len(collection_points) > 0
         return False
 
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Returns the content hashes which exist in the collection, retrieving the points by id in a single request
+
+        Args:
+            hashes (List[str]): Content hashes to check, the points are stored under their content hash
+        """
+        if len(hashes) == 0 or not self.client:
+            return set()
+        points = self.client.retrieve(
+            collection_name=self.collection,
+            ids=list(set(hashes)),  # type: ignore
+            with_payload=False,
+            with_vectors=False,
+        )
+        # Qdrant returns the ids of hex string points formatted as UUIDs
+        return {str(point.id).replace("-", "") for point in points}
+
     def name_exists(self, name: str) -> bool:
         """
         Validates if a document with the given name exists in the collection.
@@ -138,11 +156,30 @@ class Qdrant(VectorDb):
             return len(scroll_result[0]) > 0
         return False
 
+    def get_document_id(self, document: Document) -> str:
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        return md5(cleaned_content.encode()).hexdigest()
+
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """
+        Delete the points with the given ids
+
+        Args:
+            ids (List[str]): Ids of the points to delete
+        """
+        if len(ids) == 0:
+            return
+        self.client.delete(
+            collection_name=self.collection,
+            points_selector=models.PointIdsList(points=ids),  # type: ignore
+        )
+        logger.debug(f"Deleted {len(ids)} documents")
+
     def insert(self, documents: List[Document], batch_size: int = 10) -> None:
         logger.debug(f"Inserting {len(documents)} documents")
         points = []
+        Document.embed_documents(documents, embedder=self.embedder)
         for document in documents:
-            document.embed(embedder=self.embedder)
             cleaned_content = document.content.replace("\x00", "\ufffd")
             doc_id = md5(cleaned_content.encode()).hexdigest()
             points.append(
@@ -175,8 +212,16 @@ class Qdrant(VectorDb):
         logger.debug("Redirecting the request to insert")
         self.insert(documents)
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        if query_embedding is None:
+            query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
@@ -184,8 +229,8 @@ class Qdrant(VectorDb):
         results = self.client.search(
             collection_name=self.collection,
             query_vector=query_embedding,
-            with_vectors=True,
-            with_payload=True,
+            with_vectors=include_embeddings,
+            with_payload=True if include_embeddings else ["name", "meta_data", "content"],
             limit=limit,
         )
 
@@ -194,6 +239,15 @@ class Qdrant(VectorDb):
         for result in results:
             if result.payload is None:
                 continue
+            if not include_embeddings:
+                search_results.append(
+                    Document.model_construct(
+                        name=result.payload["name"],
+                        meta_data=result.payload["meta_data"],
+                        content=result.payload["content"],
+                    )
+                )
+                continue
             search_results.append(
                 Document(
                     name=result.payload["name"],
@@ -207,6 +261,60 @@ class Qdrant(VectorDb):
         logger.debug("---------- Qdrant Response End ----------")
         return search_results
 
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        *,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = True,
+    ) -> List[List[Document]]:
+        query_embeddings = self.get_query_embeddings(queries, query_embeddings)
+        if len(query_embeddings) == 0:
+            return []
+
+        # All queries are sent in a single request
+        batch_results = self.client.search_batch(
+            collection_name=self.collection,
+            requests=[
+                models.SearchRequest(
+                    vector=query_embedding,
+                    limit=limit,
+                    with_vector=include_embeddings,
+                    with_payload=True if include_embeddings else ["name", "meta_data", "content"],
+                )
+                for query_embedding in query_embeddings
+            ],
+        )
+
+        search_results: List[List[Document]] = []
+        for results in batch_results:
+            documents: List[Document] = []
+            for result in results:
+                if result.payload is None:
+                    continue
+                if not include_embeddings:
+                    documents.append(
+                        Document.model_construct(
+                            name=result.payload["name"],
+                            meta_data=result.payload["meta_data"],
+                            content=result.payload["content"],
+                        )
+                    )
+                    continue
+                documents.append(
+                    Document(
+                        name=result.payload["name"],
+                        meta_data=result.payload["meta_data"],
+                        content=result.payload["content"],
+                        embedder=self.embedder,
+                        embedding=result.vector,
+                        usage=result.payload["usage"],
+                    )
+                )
+            search_results.append(documents)
+        return search_results
+
     def delete(self) -> None:
         if self.exists():
             logger.debug(f"Deleting collection: {self.collection}")
@@ -1,5 +1,6 @@
 import json
-from typing import Optional, List, Dict, Any
+import re
+from typing import Optional, List, Dict, Any, Set
 from hashlib import md5
 
 try:
@@ -8,7 +9,7 @@ try:
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
+    from sqlalchemy.sql.expression import text, func, select, literal_column, and_, or_, false
     from sqlalchemy.types import DateTime
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
@@ -19,6 +20,7 @@ from micro.embedder import Embedder
 from micro.embedder.openai import OpenAIEmbedder
 from micro.vectordb.base import VectorDb
 from micro.vectordb.distance import Distance
+from micro.vectordb.filters import FilterCondition, compare, parse_filters
 from micro.utils.log import logger
 
 
@@ -31,6 +33,7 @@ class S2VectorDb(VectorDb):
         db_engine: Optional[Engine] = None,
         embedder: Embedder = OpenAIEmbedder(),
         distance: Distance = Distance.cosine,
+        meta_data_indexed_keys: Optional[List[str]] = None,
     ):
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
@@ -50,6 +53,14 @@ class S2VectorDb(VectorDb):
         self.Session: sessionmaker[Session] = sessionmaker(bind=self.db_engine)
         self.table: Table = self.get_table()
 
+        # meta_data keys with string values, e.g. ["tenant"], indexed by optimize() using a persisted computed column
+        self.meta_data_indexed_keys: List[str] = meta_data_indexed_keys or []
+        for key in self.meta_data_indexed_keys:
+            if not all(re.fullmatch(r"[\w\-]+", part) for part in key.split(".")):
+                raise ValueError(f"Invalid meta_data key: {key}")
+        # Names of the computed columns which exist, loaded on first use
+        self._indexed_columns: Optional[Set[str]] = None
+
     def get_table(self) -> Table:
         return Table(
             self.collection,
@@ -98,6 +109,26 @@ class S2VectorDb(VectorDb):
             result = sess.execute(stmt).first()
             return result is not None
 
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        Returns the content hashes which exist in the table
+
+        Args:
+            hashes (List[str]): Content hashes to check
+        """
+        existing: Set[str] = set()
+        unique_hashes = list(set(hashes))
+        with self.Session.begin() as sess:
+            # Limit the size of the IN list for very large batches
+            for i in range(0, len(unique_hashes), 1000):
+                stmt = (
+                    select(self.table.c.content_hash)
+                    .where(self.table.c.content_hash.in_(unique_hashes[i : i + 1000]))
+                    .distinct()
+                )
+                existing.update(row[0] for row in sess.execute(stmt))
+        return existing
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -123,10 +154,10 @@ class S2VectorDb(VectorDb):
             return result is not None
 
     def insert(self, documents: List[Document], batch_size: int = 10) -> None:
+        Document.embed_documents(documents, embedder=self.embedder)
         with self.Session.begin() as sess:
             counter = 0
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 content_hash = md5(cleaned_content.encode()).hexdigest()
                 _id = document.id or content_hash
@@ -153,6 +184,20 @@ class S2VectorDb(VectorDb):
             sess.commit()
             logger.debug(f"Committed {counter} documents")
 
+    def delete_by_ids(self, ids: List[str]) -> None:
+        """
+        Delete the rows with the given ids
+
+        Args:
+            ids (List[str]): Ids of the rows to delete
+        """
+        if len(ids) == 0:
+            return
+        with self.Session.begin() as sess:
+            stmt = self.table.delete().where(self.table.c.id.in_(ids))
+            sess.execute(stmt)
+            logger.debug(f"Deleted {len(ids)} documents")
+
     def upsert_available(self) -> bool:
         return False
 
@@ -164,10 +209,10 @@ class S2VectorDb(VectorDb):
             documents (List[Document]): List of documents to upsert
             batch_size (int): Batch size for upserting documents
         """
+        Document.embed_documents(documents, embedder=self.embedder)
         with self.Session.begin() as sess:
             counter = 0
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 content_hash = md5(cleaned_content.encode()).hexdigest()
                 _id = document.id or content_hash
@@ -194,28 +239,30 @@ class S2VectorDb(VectorDb):
             sess.commit()
             logger.debug(f"Committed {counter} documents")
 
-    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        *,
+        query_embedding: Optional[List[float]] = None,
+        include_embeddings: bool = True,
+    ) -> List[Document]:
+        if query_embedding is None:
+            query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        columns = [
-            self.table.c.name,
-            self.table.c.meta_data,
-            self.table.c.content,
-            func.json_array_unpack(self.table.c.embedding).label(
-                "embedding"
-            ),  # Unpack embedding here # self.table.c.embedding,
-            self.table.c.usage,
-        ]
+        columns = [self.table.c.name, self.table.c.meta_data, self.table.c.content]
+        if include_embeddings:
+            # Unpack embedding here
+            columns.extend([func.json_array_unpack(self.table.c.embedding).label("embedding"), self.table.c.usage])
 
         stmt = select(*columns)
 
-        if filters is not None:
-            for key, value in filters.items():
-                if hasattr(self.table.c, key):
-                    stmt = stmt.where(getattr(self.table.c, key) == value)
+        if filters:
+            stmt = stmt.where(and_(*[self.get_filter_clause(condition) for condition in parse_filters(filters)]))
 
         if self.distance == Distance.l2:
             stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
@@ -249,6 +296,11 @@ class S2VectorDb(VectorDb):
         search_results: List[Document] = []
         for neighbor in neighbors:
             meta_data_dict = json.loads(neighbor.meta_data) if neighbor.meta_data else {}
+            if not include_embeddings:
+                search_results.append(
+                    Document.model_construct(name=neighbor.name, meta_data=meta_data_dict, content=neighbor.content)
+                )
+                continue
             usage_dict = json.loads(neighbor.usage) if neighbor.usage else {}
             # Convert the embedding mysql.TEXT back into a list
             embedding_list = json.loads(neighbor.embedding) if neighbor.embedding else []
@@ -266,6 +318,82 @@ class S2VectorDb(VectorDb):
 
         return search_results
 
+    def get_filter_clause(self, condition: FilterCondition):
+        """Returns the WHERE clause for a filter condition, see `parse_filters` for the filter syntax.
+        Keys which are table columns filter the column, other keys filter meta_data using JSON functions.
+        """
+        operator, value = condition.operator, condition.value
+        if len(condition.path) == 1 and condition.key != "meta_data" and condition.key in self.table.c:
+            return compare(self.table.c[condition.key], operator, value)
+
+        values = value if operator in ("$in", "$nin") else [value]
+        if any(isinstance(v, (dict, list)) for v in values):
+            raise ValueError(f"Filtering on JSON objects and arrays is not supported: {condition.key}")
+
+        indexed_column = self.get_indexed_column(condition.key)
+        if indexed_column is not None and all(isinstance(v, str) for v in values):
+            clause = compare(literal_column(indexed_column), operator, value)
+        elif operator in ("$in", "$nin"):
+            clause = or_(false(), *[self.compare_meta_data(condition.path, "$eq", v) for v in values])
+            if operator == "$nin":
+                clause = ~clause
+        else:
+            clause = self.compare_meta_data(condition.path, operator, value)
+
+        if operator in ("$ne", "$nin"):
+            # Rows without the key do not match the value, as with the other vector dbs
+            return or_(func.JSON_EXTRACT_JSON(self.table.c.meta_data, *condition.path).is_(None), clause)
+        return clause
+
+    def compare_meta_data(self, path: List[str], operator: str, value: Any):
+        meta_data = self.table.c.meta_data
+        if isinstance(value, bool) or value is None:
+            return compare(func.JSON_EXTRACT_JSON(meta_data, *path), operator, json.dumps(value))
+        if isinstance(value, (int, float)):
+            return compare(func.JSON_EXTRACT_DOUBLE(meta_data, *path), operator, value)
+        return compare(func.JSON_EXTRACT_STRING(meta_data, *path), operator, value)
+
+    def get_indexed_column_name(self, key: str) -> str:
+        return f"meta_data_{key.replace('.', '_').replace('-', '_')}"
+
+    def get_indexed_column(self, key: str) -> Optional[str]:
+        """Returns the computed column for a meta_data key if it is indexed and the column exists"""
+        if key not in self.meta_data_indexed_keys:
+            return None
+        if self._indexed_columns is None:
+            try:
+                columns = inspect(self.db_engine).get_columns(self.table.name, schema=self.schema)
+                self._indexed_columns = {column["name"] for column in columns}
+            except Exception as e:
+                logger.debug(f"Error getting columns: {e}")
+                return None
+        column_name = self.get_indexed_column_name(key)
+        return column_name if column_name in self._indexed_columns else None
+
+    def create_meta_data_indexes(self) -> None:
+        if len(self.meta_data_indexed_keys) == 0 or not self.table_exists():
+            return
+        existing_columns = {
+            column["name"] for column in inspect(self.db_engine).get_columns(self.table.name, schema=self.schema)
+        }
+        with self.Session.begin() as sess:
+            for key in self.meta_data_indexed_keys:
+                column_name = self.get_indexed_column_name(key)
+                if column_name in existing_columns:
+                    continue
+                logger.debug(f"Creating meta_data index: {column_name}")
+                json_path = ", ".join(f"'{part}'" for part in key.split("."))
+                sess.execute(
+                    text(
+                        f"ALTER TABLE {self.table} ADD COLUMN {column_name} "
+                        f"AS JSON_EXTRACT_STRING(meta_data, {json_path}) PERSISTED TEXT;"
+                    )
+                )
+                sess.execute(
+                    text(f"ALTER TABLE {self.table} ADD INDEX {column_name}_index ({column_name}) USING HASH;")
+                )
+        self._indexed_columns = None
+
     def delete(self) -> None:
         if self.table_exists():
             logger.debug(f"Deleting table: {self.collection}")
@@ -283,7 +411,7 @@ class S2VectorDb(VectorDb):
             return 0
 
     def optimize(self) -> None:
-        pass
+        self.create_meta_data_indexes()
 
     def clear(self) -> bool:
         logger.info(f"Deleting table: {self.collection}")
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from micro.document.reader import pdf as pdf_reader
+from micro.document.reader.pdf import PDFImageReader, PDFUrlImageReader
+from micro.utils.download import DownloadedFile
+
+
+def make_pdf(path) -> bytes:
+    """Returns a PDF with one page of text and one image"""
+    fpdf = pytest.importorskip("fpdf")
+    image = pytest.importorskip("PIL.Image")
+
+    image_path = path / "image.png"
+    image.new("RGB", (40, 40), (200, 50, 50)).save(image_path)
+    pdf = fpdf.FPDF()
+    pdf.set_font("helvetica", size=10)
+    pdf.add_page()
+    pdf.multi_cell(0, 5, "Page text")
+    pdf.image(str(image_path), x=10, y=50, w=10)
+    return bytes(pdf.output())
+
+
+@pytest.fixture
+def ocr_calls(monkeypatch) -> Iterator[List[int]]:
+    """Runs the OCR pool in threads with a fake OCR engine and records the number of images of each task"""
+    pytest.importorskip("pypdf")
+    calls: List[int] = []
+
+    def ocr_images(images: List[bytes]) -> List[Tuple[List[str], None]]:
+        calls.append(len(images))
+        return [(["Image text"], None) for _ in images]
+
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(pdf_reader, "ocr_images", ocr_images)
+    monkeypatch.setattr(pdf_reader, "get_process_pool", lambda num_workers, initializer=None: pool)
+    yield calls
+    pool.shutdown()
+
+
+class BytesUrlImageReader(PDFUrlImageReader):
+    """Returns the same downloaded PDF for every URL"""
+
+    data: bytes = b""
+
+    def get_source(self, url: str) -> Tuple[str, DownloadedFile]:
+        return url.split("/")[-1].split(".")[0], DownloadedFile(data=self.data)
+
+
+@pytest.mark.parametrize("num_workers", [None, 2])
+def test_url_image_reader_runs_ocr(tmp_path, ocr_calls, num_workers):
+    reader = BytesUrlImageReader(data=make_pdf(tmp_path), chunk=False, cache_ocr=False, num_workers=num_workers)
+    documents = reader.read_source(*reader.get_source("https://example.com/doc.pdf"))
+
+    assert ocr_calls == [1]
+    assert len(documents) == 1
+    assert "Page text" in documents[0].content
+    assert "Image text" in documents[0].content
+
+
+def test_image_readers_share_ocr_pool_and_cache(tmp_path, ocr_calls):
+    data = make_pdf(tmp_path)
+    pdf_path = tmp_path / "doc.pdf"
+    pdf_path.write_bytes(data)
+    pdf_reader.ocr_cache.clear()
+
+    url_reader = BytesUrlImageReader(data=data, chunk=False, num_workers=2)
+    url_documents = list(url_reader.read_many(["https://example.com/doc.pdf"]))
+    file_reader = PDFImageReader(chunk=False, num_workers=2)
+    file_documents = file_reader.read_source(*file_reader.get_source(str(pdf_path)))
+
+    # The file reader finds the text of the image in the cache filled by the URL reader
+    assert ocr_calls == [1]
+    assert [document.content for document in url_documents[0]] == [document.content for document in file_documents]
+    pdf_reader.ocr_cache.clear()